@@ -1,31 +1,40 @@
 import datetime
-from zoneinfo import ZoneInfo
 from google.adk.agents import LlmAgent
-from google.adk.tools.mcp_tool.mcp_toolset import (
-    MCPToolset, 
-    StdioServerParameters,
-    SseConnectionParams,
-)
-from google.adk.models.lite_llm import LiteLlm
-import requests
 import os
 from dotenv import load_dotenv
 
+from . import (
+    context_compactor, deferred, fast_router, llm_cache, local_tools, mcp_pool, timezone_index,
+)
+
 # -------------------------------------------------------------
 # 🌍 Initialize environment
 # -------------------------------------------------------------
 load_dotenv()
+# keep WEATHER_HOT_CITIES / WEATHER_HOT_CITIES_FILE warm in the background; the
+# weather client (and requests with it) is otherwise imported by the first weather call
+if os.getenv("WEATHER_HOT_CITIES") or os.getenv("WEATHER_HOT_CITIES_FILE"):
+    from . import weather_prefetch
+
+    weather_prefetch.start_from_env()
+
+# 📈 per-tool counts, latency, payload sizes and errors; one registry with the
+# MCP server tools when they run in-process. Off unless TOOL_METRICS=1;
+# TOOL_METRICS_PORT serves /metrics.
+tool_metrics = local_tools.load("shared", "tool_metrics")
+tool_metrics.serve_from_env()
 
 # -------------------------------------------------------------
 # 🌦️ Weather Tool
 # -------------------------------------------------------------
+@tool_metrics.instrument
 def get_weather(city: str) -> dict:
     """Retrieves the current weather report for a specified city.
     Args:
         city (str): The name of the city for which to retrieve the weather report.
         The city name must be in English.
     Returns:
-        dict: status and result or error msg.
+        dict: status, city, description, temperature (°C) and a prose report, or an error msg.
     """
     api_key = os.getenv("OPEN_WEATHER_MAP_API_KEY")
     if not api_key:
@@ -33,23 +42,30 @@ def get_weather(city: str) -> dict:
             "status": "error",
             "error_message": "API key for OpenWeatherMap is not set.",
         }
-    url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric"
+    import requests
+
+    from . import weather_client
+
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-        if data["cod"] != 200:
-            return {
-                "status": "error",
-                "error_message": f"Weather information for '{city}' is not available.",
-            }
+        data = weather_client.get_client().get(city)
         weather_description = data["weather"][0]["description"]
         temperature = data["main"]["temp"]
         report = (
             f"The weather in {city} is {weather_description} with a temperature of "
             f"{temperature} degrees Celsius."
         )
-        return {"status": "success", "report": report}
+        return {
+            "status": "success",
+            "city": city,
+            "description": weather_description,
+            "temperature": temperature,
+            "report": report,
+        }
+    except weather_client.WeatherLookupError:
+        return {
+            "status": "error",
+            "error_message": f"Weather information for '{city}' is not available.",
+        }
     except requests.exceptions.RequestException as e:
         return {
             "status": "error",
@@ -57,21 +73,100 @@ def get_weather(city: str) -> dict:
         }
 
 
+@tool_metrics.instrument
+def get_weather_mood(city: str, landmark: str | None = None) -> dict:
+    """Retrieves the current weather for a city and turns it into a mood message in one step.
+    Use this instead of calling get_weather and then get_mood.
+    Args:
+        city (str): City name in English, e.g. "Taipei".
+        landmark (str, optional): A place in the city to mention in the message.
+    Returns:
+        dict: status, city, description, temperature (°C) and mood text, or an error msg.
+    """
+    weather = get_weather(city)
+    if weather["status"] != "success":
+        return weather
+    mood_generator = local_tools.load("weather2mood", "mood_generator")
+    return {
+        "status": "success",
+        "city": city,
+        "description": weather["description"],
+        "temperature": weather["temperature"],
+        "mood": mood_generator.compose_mood(weather["description"], city, landmark, weather["temperature"]),
+    }
+
+
+@tool_metrics.instrument
+def get_weather_many(cities: list[str]) -> dict:
+    """Retrieves the current weather for several cities at once.
+    Use this instead of calling get_weather repeatedly when the user asks about more than one city.
+    Args:
+        cities (list[str]): City names in English, e.g. ["Taipei", "Tokyo"].
+    Returns:
+        dict: status and a per-city list of results (description and temperature, or an error msg).
+    """
+    if not os.getenv("OPEN_WEATHER_MAP_API_KEY"):
+        return {
+            "status": "error",
+            "error_message": "API key for OpenWeatherMap is not set.",
+        }
+    from . import weather_client
+
+    deadline = float(os.getenv("WEATHER_MANY_DEADLINE", "10"))
+    lookups = weather_client.get_client().get_many(cities, deadline=deadline)
+
+    results = []
+    for city, outcome in lookups.items():
+        if isinstance(outcome, weather_client.WeatherLookupError):
+            results.append({
+                "city": city,
+                "status": "error",
+                "error_message": f"Weather information for '{city}' is not available.",
+            })
+        elif isinstance(outcome, Exception):
+            results.append({
+                "city": city,
+                "status": "error",
+                "error_message": f"An error occurred while fetching the weather data: {str(outcome)}",
+            })
+        else:
+            weather_description = outcome["weather"][0]["description"]
+            temperature = outcome["main"]["temp"]
+            results.append({
+                "city": city,
+                "status": "success",
+                "description": weather_description,
+                "temperature": temperature,
+                "report": (
+                    f"The weather in {city} is {weather_description} with a temperature of "
+                    f"{temperature} degrees Celsius."
+                ),
+            })
+    return {"status": "success", "results": results}
+
+
 # -------------------------------------------------------------
 # 🕒 Time Tool
 # -------------------------------------------------------------
+@tool_metrics.instrument
 def get_current_time(tz_identifier: str) -> dict:
     """Returns the current time in a specified time zone identifier.
     Args:
-        tz_identifier (str): The time zone identifier for which to retrieve the current time.
+        tz_identifier (str): An IANA time zone identifier (e.g. "Asia/Taipei"), or simply a
+            city or country name in English or Traditional Chinese (e.g. "new york", "台北").
     Returns:
-        dict: status and result or error msg.
+        dict: status, report, timezone and ISO datetime, or error msg.
     """
     try:
-        tz = ZoneInfo(tz_identifier)
+        tz = timezone_index.lookup_zone(tz_identifier)
         now = datetime.datetime.now(tz)
         report = f'The current time is {now.strftime("%Y-%m-%d %H:%M:%S %Z%z")}'
-        return {"status": "success", "report": report}
+        return {
+            "status": "success",
+            "report": report,
+            "timezone": timezone_index.zone_label(tz),
+            "datetime": now.isoformat(timespec="seconds"),
+        }
     except Exception as e:
         return {
             "status": "error",
@@ -79,50 +174,142 @@ def get_current_time(tz_identifier: str) -> dict:
         }
 
 
+# -------------------------------------------------------------
+# 🚦 Fast path: answer plain time / weather / budget questions
+# without a model call (FAST_ROUTER=0 disables it)
+# -------------------------------------------------------------
+router = fast_router.FastRouter(get_current_time, get_weather)
+
+# -------------------------------------------------------------
+# 💾 Replay identical model turns (same question, same tool results)
+# LLM_CACHE=0 disables it; LLM_CACHE_PATH keeps it across restarts
+# -------------------------------------------------------------
+response_cache = llm_cache.from_env()
+
+# -------------------------------------------------------------
+# 🗜️ Keep prompts under CONTEXT_TOKEN_BUDGET in long sessions
+# (CONTEXT_COMPACTION=0 disables it)
+# -------------------------------------------------------------
+compactor = context_compactor.from_env()
+
+
+# -------------------------------------------------------------
+# 🔌 Where the MCP server tools run (MCP_MODE)
+#   remote    -> separate server processes, called over MCP (default)
+#   inprocess -> the server modules are imported here and their tool
+#                functions registered as native tools: no subprocess,
+#                no socket, no JSON round trip
+# -------------------------------------------------------------
+MCP_MODE = os.getenv("MCP_MODE", "remote").strip().lower()
+if MCP_MODE not in ("remote", "inprocess"):
+    raise ValueError(f"MCP_MODE must be 'remote' or 'inprocess', not {MCP_MODE!r}")
+
+# -------------------------------------------------------------
+# 🔥 Warm MCP servers (opt-in, MCP_POOL=1): started once here and shared by
+# all sessions; otherwise one private stdio process per connection.
+# ⚠️ Pooled servers listen on 127.0.0.1 (a free port, see mcp_pool.stats())
+# without authentication: any local user can call read_file / write_file.
+# Not waited for here: the MCP toolset waits when it is first built.
+# -------------------------------------------------------------
+mcp_servers = mcp_pool.start_from_env(wait=False) if MCP_MODE == "remote" else None
+if mcp_servers is not None:
+    # ADK otherwise probes Google mTLS credentials (~3 s where none exist) before
+    # every SSE connection; pointless for a loopback server. An explicit value wins.
+    os.environ.setdefault("GOOGLE_API_USE_CLIENT_CERTIFICATE", "false")
+
+
+def weather2mood_connection():
+    from google.adk.tools.mcp_tool.mcp_toolset import SseConnectionParams, StdioServerParameters
+
+    if mcp_servers is not None and mcp_servers.healthy("weather2mood"):
+        return SseConnectionParams(url=mcp_servers.url("weather2mood"))
+    return StdioServerParameters(
+        command="/Users/tsaichengyu/.local/bin/uv",
+        args=[
+            "--directory",
+            "/Users/tsaichengyu/Documents/Projects/ai/20251013-weather2mood",
+            "run",
+            "server.py",
+        ]
+    )
+
+
+def mcp_tools() -> list:
+    """weather2mood and budget tools: native functions in-process, else MCP toolsets."""
+    if MCP_MODE == "inprocess":
+        return [*local_tools.mcp_tools("weather2mood"), *local_tools.mcp_tools("budget")]
+    from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset, SseConnectionParams
+
+    if mcp_servers is not None:
+        mcp_servers.wait_ready()
+    toolsets = [
+        # -------------------------------------------------------------
+        # 🌤️ Local MCP server: weather2mood
+        # 提供 get_mood、read_file、write_file、list_directory、search_files
+        # -------------------------------------------------------------
+        MCPToolset(
+            connection_params=weather2mood_connection(),
+            tool_filter=[
+                "get_mood",          # 💬 心情生成工具
+                "read_file",         # 📂 讀取檔案
+                "write_file",        # ✍️ 寫入檔案
+                "list_directory",    # 📁 列出資料夾檔案
+                "search_files",      # 🔎 全文搜尋共享資料夾
+            ],
+        ),
+    ]
+    if mcp_servers is not None and mcp_servers.healthy("budget"):
+        # 🪙 budget server, when the pool runs it (MCP_POOL_SERVERS=weather2mood,budget)
+        toolsets.append(MCPToolset(
+            connection_params=SseConnectionParams(url=mcp_servers.url("budget")),
+            tool_filter=list(local_tools.MCP_TOOLS["budget"][1]),
+        ))
+    return toolsets
+
+
+# built on the first request (or by the prewarm below), not at import
+mcp_toolset = deferred.DeferredToolset(mcp_tools, name="mcp_servers")
+
+
 # -------------------------------------------------------------
 # 🤖 Agent Definition
 # -------------------------------------------------------------
 root_agent = LlmAgent(
     name="weather_time_agent",
     #model="gemini-2.5-flash",
-    model=LiteLlm("ollama_chat/qwen3:0.6b"),
+    model=deferred.DeferredLiteLlm(model="ollama_chat/qwen3:0.6b"),
     description=("Agent to answer questions about weather, time, mood, and manage shared files."),
     instruction=(
         """
         你是一個能回答時間、天氣與心情問題，也能操作指定資料夾檔案的智慧代理。
         檔案操作範圍限於 /Users/tsaichengyu/Documents/Projects/ai/test_file_share_20250922。
         當你呼叫工具時，若涉及城市名稱請使用英文。
+        使用者問某城市的天氣帶來什麼心情時，直接呼叫 get_weather_mood，不必先查天氣再呼叫 get_mood。
+        要找哪個檔案提到某個關鍵字時，先呼叫 search_files，不必逐一列出並讀取檔案。
         請用繁體中文回答問題。
         """
     ),
+    # compaction first, so the cache keys on the prompt actually sent;
+    # the router's timer last, so replayed / routed turns are not timed as model calls
+    before_model_callback=[
+        compactor.before_model,
+        router.before_model,
+        response_cache.before_model,
+        router.time_model_call,
+    ],
+    after_model_callback=[router.after_model, response_cache.after_model],
+    on_model_error_callback=[response_cache.on_model_error],
     tools=[
         # --- Local Python Tools ---
 
         get_weather,
+        get_weather_many,
+        get_weather_mood,
         get_current_time,
 
-        # -------------------------------------------------------------
-        # 🌤️ Local MCP server: weather2mood
-        # 提供 get_mood、read_file、write_file、list_directory
-        # -------------------------------------------------------------
+        # --- MCP server tools (weather2mood, budget), see MCP_MODE ---
 
-         MCPToolset(
-             connection_params=StdioServerParameters(
-                 command="/Users/tsaichengyu/.local/bin/uv",
-                 args=[
-                     "--directory",
-                     "/Users/tsaichengyu/Documents/Projects/ai/20251013-weather2mood",
-                     "run",
-                     "server.py",
-                 ]
-             ),
-             tool_filter=[
-                 "get_mood",          # 💬 心情生成工具
-                 "read_file",         # 📂 讀取檔案
-                 "write_file",        # ✍️ 寫入檔案
-                 "list_directory",    # 📁 列出資料夾檔案
-             ],
-         ),
+        mcp_toolset,
 
         # -------------------------------------------------------------
         # 🌐 Remote SSE MCP server (CoinGecko or others)
@@ -144,4 +331,10 @@ root_agent = LlmAgent(
         #     ),
         # ),
     ],
-)
\ No newline at end of file
+)
+
+# -------------------------------------------------------------
+# ⏩ Load in the background what the first request would wait for
+# (STARTUP_PREWARM=0 disables it)
+# -------------------------------------------------------------
+deferred.prewarm_from_env({"model": root_agent.model.load, "mcp_tools": mcp_toolset.load})
@@ -0,0 +1,227 @@
+"""
+Runs a JSONL file of user queries through root_agent without the web UI.
+
+    python batch_runner.py queries.jsonl -o results.jsonl --concurrency 8 --timeout 60
+    python batch_runner.py queries.jsonl --model stub --no-mcp      # offline, deterministic
+
+Input lines are {"id": ..., "query": "..."} objects (a bare JSON string also
+works; the id defaults to the line number). Every query runs in its own
+session; results are written in input order as soon as they are ready:
+
+    {"id", "query", "status": "ok"|"timeout"|"error", "latency_ms", "tool_calls",
+     "tools", "cached_turns", "prompt_tokens", "completion_tokens", "total_tokens", "response", "error"}
+
+A summary (throughput, latency percentiles, totals) is printed to stderr.
+For offline weather answers run `python weather_stub.py` and set
+OPEN_WEATHER_MAP_BASE_URL=http://127.0.0.1:8765/data/2.5.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+APP_NAME = "batch_runner"
+USER_ID = "batch"
+WARMUP_QUERY = "hi"
+
+
+def _package_module(name: str):
+    """Imports a sibling module through the package, so agent.py's relative imports work."""
+    if __package__:
+        return importlib.import_module(f"{__package__}.{name}")
+    folder = Path(__file__).resolve().parent
+    if str(folder.parent) not in sys.path:
+        sys.path.insert(0, str(folder.parent))
+    return importlib.import_module(f"{folder.name}.{name}")
+
+
+def load_agent(
+    model: str | None = None, mcp: bool = True, fast_router: bool = True, llm_cache: bool = True,
+    stub_latency: float = 0.0,
+):
+    """root_agent, optionally with another model, without MCP toolsets, the fast path or the response cache.
+
+    Args:
+        model: "stub" for the offline StubLlm, any other value is passed to LiteLlm,
+            None keeps the agent's own model.
+    """
+    if not mcp:
+        # no toolsets, so no reason to start the server pool on import
+        os.environ.setdefault("MCP_POOL", "0")
+    if model:
+        # the agent's own model is replaced, so do not load it in the background
+        os.environ.setdefault("STARTUP_PREWARM", "0")
+    agent = _package_module("agent").root_agent
+    DeferredToolset = _package_module("deferred").DeferredToolset
+    FastRouter = _package_module("fast_router").FastRouter
+    ResponseCache = _package_module("llm_cache").ResponseCache
+    update = {}
+    if model == "stub":
+        update["model"] = _package_module("stub_llm").StubLlm(latency=stub_latency)
+    elif model:
+        from google.adk.models.lite_llm import LiteLlm
+
+        update["model"] = LiteLlm(model)
+    if not mcp:
+        update["tools"] = [t for t in agent.tools if not isinstance(t, DeferredToolset)]
+    dropped = tuple(cls for cls, keep in ((FastRouter, fast_router), (ResponseCache, llm_cache)) if not keep)
+    if dropped:
+        update["before_model_callback"] = _without(agent.before_model_callback, dropped)
+        update["after_model_callback"] = _without(agent.after_model_callback, dropped)
+        update["on_model_error_callback"] = _without(agent.on_model_error_callback, dropped)
+    return agent.clone(update=update) if update else agent
+
+
+def _without(callbacks, owner_types: tuple) -> list:
+    """Callbacks that are not methods of an instance of owner_types."""
+    if callbacks is None:
+        return []
+    callbacks = callbacks if isinstance(callbacks, list) else [callbacks]
+    return [cb for cb in callbacks if not isinstance(getattr(cb, "__self__", None), owner_types)]
+
+
+def read_queries(path: str | Path) -> list[dict]:
+    queries = []
+    for i, line in enumerate(Path(path).read_text(encoding="utf-8").splitlines(), 1):
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        if isinstance(item, str):
+            item = {"query": item}
+        queries.append({"id": item.get("id", i), "query": item["query"]})
+    return queries
+
+
+async def run_query(runner: InMemoryRunner, item: dict, timeout: float) -> dict:
+    result = {
+        "id": item["id"], "query": item["query"], "status": "ok", "latency_ms": None,
+        "tool_calls": 0, "tools": [], "cached_turns": 0, "prompt_tokens": 0, "completion_tokens": 0,
+        "total_tokens": 0, "response": None, "error": None,
+    }
+
+    async def consume():
+        session = await runner.session_service.create_session(app_name=runner.app_name, user_id=USER_ID)
+        message = types.Content(role="user", parts=[types.Part(text=item["query"])])
+        async for event in runner.run_async(user_id=USER_ID, session_id=session.id, new_message=message):
+            calls = event.get_function_calls()
+            result["tool_calls"] += len(calls)
+            result["tools"] += [c.name for c in calls]
+            if (event.custom_metadata or {}).get("llm_cache") == "hit":
+                result["cached_turns"] += 1
+            usage = event.usage_metadata
+            if usage is not None:
+                result["prompt_tokens"] += usage.prompt_token_count or 0
+                result["completion_tokens"] += usage.candidates_token_count or 0
+                result["total_tokens"] += usage.total_token_count or 0
+            if event.is_final_response() and event.content and event.content.parts:
+                result["response"] = "".join(p.text or "" for p in event.content.parts)
+
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(consume(), timeout)
+    except asyncio.TimeoutError:
+        result["status"] = "timeout"
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return result
+
+
+async def run_batch(
+    agent, queries: list[dict], concurrency: int = 4, timeout: float = 60.0, on_result=None, warmup: bool = True,
+) -> tuple[list[dict], dict]:
+    """Runs every query with at most `concurrency` in flight; returns (results, summary).
+
+    on_result(result) is called in input order as results become available.
+    With warmup, one untimed query runs first: ADK's first invocation imports
+    and builds a lot lazily (over a second, blocking the event loop), which
+    would otherwise be charged to whichever queries start first.
+    """
+    runner = InMemoryRunner(agent=agent, app_name=APP_NAME)
+    if warmup:
+        await run_query(runner, {"id": "warmup", "query": WARMUP_QUERY}, timeout)
+    start = time.perf_counter()
+    gate = asyncio.Semaphore(concurrency)
+    results: list[dict | None] = [None] * len(queries)
+    next_out = 0
+
+    async def worker(i: int, item: dict):
+        nonlocal next_out
+        async with gate:
+            results[i] = await run_query(runner, item, timeout)
+        while next_out < len(results) and results[next_out] is not None:
+            if on_result is not None:
+                on_result(results[next_out])
+            next_out += 1
+
+    try:
+        await asyncio.gather(*(worker(i, item) for i, item in enumerate(queries)))
+    finally:
+        await runner.close()
+    return results, summarize(results, time.perf_counter() - start)
+
+
+def summarize(results: list[dict], wall_seconds: float) -> dict:
+    latencies = sorted(r["latency_ms"] for r in results)
+
+    def pct(q):
+        return latencies[min(len(latencies) - 1, int(q / 100 * len(latencies)))] if latencies else None
+
+    return {
+        "queries": len(results),
+        "ok": sum(r["status"] == "ok" for r in results),
+        "timeout": sum(r["status"] == "timeout" for r in results),
+        "error": sum(r["status"] == "error" for r in results),
+        "wall_seconds": round(wall_seconds, 2),
+        "queries_per_second": round(len(results) / wall_seconds, 2) if wall_seconds else None,
+        "latency_ms": {"p50": pct(50), "p95": pct(95), "p99": pct(99), "max": latencies[-1] if latencies else None},
+        "tool_calls": sum(r["tool_calls"] for r in results),
+        "total_tokens": sum(r["total_tokens"] for r in results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a JSONL file of queries through root_agent.")
+    parser.add_argument("queries", help="JSONL input, one query per line")
+    parser.add_argument("-o", "--output", help="JSONL results (default: stdout)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds per query")
+    parser.add_argument("--model", help='"stub" for the offline model, or a LiteLLM model name')
+    parser.add_argument("--stub-latency", type=float, default=0.0, help="seconds per stub model call")
+    parser.add_argument("--no-mcp", action="store_true", help="drop the MCP server tools (no server processes)")
+    parser.add_argument("--no-fast-router", action="store_true", help="send every query to the model")
+    parser.add_argument("--no-llm-cache", action="store_true", help="do not replay cached model turns")
+    parser.add_argument("--no-warmup", action="store_true", help="skip the untimed warm-up query")
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+
+    agent = load_agent(args.model, mcp=not args.no_mcp, fast_router=not args.no_fast_router,
+                       llm_cache=not args.no_llm_cache, stub_latency=args.stub_latency)
+    queries = read_queries(args.queries)
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+
+    def write(result):
+        out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        out.flush()
+
+    try:
+        _, summary = asyncio.run(run_batch(
+            agent, queries, args.concurrency, args.timeout, on_result=write, warmup=not args.no_warmup,
+        ))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(json.dumps(summary, ensure_ascii=False), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Median turn latency for repeated questions with and without the response cache.
+
+    python bench_llm_cache.py --latency 0.3 --repeat 10
+
+Runs offline: the stub model (fixed delay per model call) and the stub
+weather API. Every question is asked `repeat` times in a row, one at a
+time; "repeat" rows are all askings after the first.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+
+import batch_runner
+from weather_stub import StubWeatherServer
+
+QUESTIONS = ["台北天氣如何", "What's the weather in Tokyo?", "曼谷天氣", "現在東京幾點", "幫我列出檔案"]
+
+
+def run(agent, queries):
+    results, _ = asyncio.run(batch_runner.run_batch(agent, queries, concurrency=1))
+    return results
+
+
+def report(label: str, results: list[dict], repeat: int) -> None:
+    first = [r["latency_ms"] for i, r in enumerate(results) if i % repeat == 0]
+    again = [r["latency_ms"] for i, r in enumerate(results) if i % repeat]
+    print(
+        f"{label:10} first p50 {statistics.median(first):8.1f} ms   "
+        f"repeat p50 {statistics.median(again):8.1f} ms   "
+        f"cached turns {sum(r['cached_turns'] for r in results):4}   "
+        f"tokens {sum(r['total_tokens'] for r in results):7}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds per stub model call")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    if args.repeat < 2:
+        parser.error("--repeat must be at least 2")
+
+    with StubWeatherServer() as server:
+        os.environ.update(
+            OPEN_WEATHER_MAP_API_KEY="stub", OPEN_WEATHER_MAP_BASE_URL=server.base_url, WEATHER_STORE_PATH=""
+        )
+        queries = [{"id": f"{q}#{n}", "query": q} for q in QUESTIONS for n in range(args.repeat)]
+        for label, cached in (("no cache", False), ("cache", True)):
+            agent = batch_runner.load_agent("stub", mcp=False, fast_router=False, llm_cache=cached,
+                                            stub_latency=args.latency)
+            report(label, run(agent, queries), args.repeat)
+        print(batch_runner._package_module("agent").response_cache.stats())
+
+
+if __name__ == "__main__":
+    main()
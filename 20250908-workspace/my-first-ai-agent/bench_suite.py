@@ -0,0 +1,318 @@
+"""
+Benchmark suite for every tool and the agent dispatch path, compared with a stored baseline.
+
+    python bench_suite.py                      # run all cases, print a table against the baseline
+    python bench_suite.py -o results.json      # also write the results as JSON
+    python bench_suite.py --check              # exit 1 when a case regressed
+    python bench_suite.py --update-baseline    # store this run in bench_baseline.json
+    python bench_suite.py --filter budget.     # only cases whose name starts with budget.
+
+Runs offline. The tools are called in-process (calculate_budget with
+BUDGET_EXECUTOR=inline), get_weather talks to the local stub server and
+agent turns use the stub model. Each case runs `--rounds` rounds of a loop
+sized to take at least `--min-time` seconds; the median time per operation
+is compared. A case regresses when that median is above
+baseline x (1 + tolerance). Timings only compare on the same machine: the
+baseline records where it was taken, and the report says when that differs.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+FOLDER = Path(__file__).resolve().parent
+BASELINE_PATH = FOLDER / "bench_baseline.json"
+
+# budget scenarios: the daily budget per person is swept over this grid for one
+# country per price level, keeping the first row of every budget level / branch
+DAYS, PEOPLE = 5, 2
+DAILY_GRID = [round(100 * 1.25 ** i) for i in range(30)]
+BRANCH_FLAGS = ("used_rescue", "used_normalize_down", "used_normalize_up")
+BATCH_BUDGETS = [5000, 20000, 60000, 150000, 400000]
+BATCH_DAYS = [3, 5, 7, 10]
+
+MOOD_ZH = ["晴", "晴時多雲", "陰天", "小雨", "雷陣雨", "大雪", "濃霧", "陰雲密布"]
+MOOD_EN = ["clear sky", "few clouds", "broken clouds", "light rain", "thunderstorm with light rain",
+           "light snow", "mist", "overcast clouds"]
+STUB_CITIES = ["Taipei", "Tokyo", "Bangkok", "New York"]
+
+AGENT_TURNS = {
+    "weather": "台北天氣如何",
+    "time": "現在東京幾點",
+    "chat": "hello",
+}
+AGENT_BATCH = [*AGENT_TURNS.values(), "What's the weather in Tokyo?", "曼谷天氣", "紐約現在幾點"] * 4
+
+
+def _setup_env(weather_base_url: str) -> None:
+    os.environ.update(
+        OPEN_WEATHER_MAP_API_KEY="stub", OPEN_WEATHER_MAP_BASE_URL=weather_base_url, WEATHER_STORE_PATH="",
+        BUDGET_EXECUTOR="inline", MCP_POOL="0", STARTUP_PREWARM="0",
+    )
+
+
+# ---- 🏷️ Cases: (name, kind, operations per call, call) ----
+def budget_scenarios(app) -> tuple[dict[str, list[tuple]], dict[str, tuple]]:
+    """Rows (total_budget, days, country, num_people) per price level, and one row per edge branch."""
+    profiles = app.price_registry.current()
+    country_for_price = {}
+    for country, price in profiles.price_of.items():
+        country_for_price.setdefault(price, country)
+
+    by_price, branches = {}, {}
+    for price, country in country_for_price.items():
+        per_level = {}
+        for daily in DAILY_GRID:
+            row = (daily * DAYS * PEOPLE, DAYS, country, PEOPLE)
+            _, level, _, _, flags, _ = app._compute_budget(profiles, country, *row[:2], PEOPLE)
+            per_level.setdefault(level, row)
+            if level == "extreme_low":
+                branches.setdefault("extreme_low", row)
+            for flag in BRANCH_FLAGS:
+                if flags[flag]:
+                    branches.setdefault(flag.removeprefix("used_"), row)
+        by_price[price] = list(per_level.values())
+    return by_price, branches
+
+
+def budget_cases(local_tools) -> list[tuple]:
+    app = local_tools.load("budget", "app")
+    profiles = app.price_registry.current()
+    by_price, branches = budget_scenarios(app)
+
+    def compute(rows):
+        def call():
+            for total, days, country, people in rows:
+                app._compute_budget(profiles, country, total, days, people)
+        return call
+
+    def tool(rows, mode):
+        def call():
+            for row in rows:
+                app.calculate_budget(*row, mode=mode)
+        return call
+
+    all_rows = [row for rows in by_price.values() for row in rows]
+    grid = {
+        "total_budgets": BATCH_BUDGETS, "days": BATCH_DAYS, "countries": [rows[0][2] for rows in by_price.values()],
+    }
+    grid_size = len(BATCH_BUDGETS) * len(BATCH_DAYS) * len(by_price)
+    return [
+        *((f"budget.compute.{price}", "scalar", len(rows), compute(rows)) for price, rows in by_price.items()),
+        *((f"budget.compute.{branch}", "scalar", 1, compute([row])) for branch, row in branches.items()),
+        ("budget.calculate_budget.full", "scalar", len(all_rows), tool(all_rows, "full")),
+        ("budget.calculate_budget.compact", "scalar", len(all_rows), tool(all_rows, "compact")),
+        ("budget.calculate_budgets.grid", "batch", grid_size, lambda: app.calculate_budgets(**grid)),
+    ]
+
+
+def mood_cases(local_tools) -> list[tuple]:
+    get_mood = local_tools.mcp_tools("weather2mood", ["get_mood"])[0]
+
+    def moods(statuses):
+        def call():
+            for status in statuses:
+                get_mood(status, "Taipei", temperature=25.0)
+        return call
+
+    return [
+        ("mood.get_mood.zh", "scalar", len(MOOD_ZH), moods(MOOD_ZH)),
+        ("mood.get_mood.en", "scalar", len(MOOD_EN), moods(MOOD_EN)),
+    ]
+
+
+def weather_time_cases(agent, weather_client) -> list[tuple]:
+    client = weather_client.get_client()
+
+    def uncached(call):
+        def run():
+            client.clear()
+            return call()
+        return run
+
+    return [
+        ("weather.get_weather.cached", "scalar", 1, lambda: agent.get_weather("Taipei")),
+        ("weather.get_weather.http", "scalar", 1, uncached(lambda: agent.get_weather("Taipei"))),
+        ("weather.get_weather_many.http", "batch", len(STUB_CITIES),
+         uncached(lambda: agent.get_weather_many(STUB_CITIES))),
+        ("time.get_current_time.iana", "scalar", 1, lambda: agent.get_current_time("Asia/Taipei")),
+        ("time.get_current_time.city_en", "scalar", 1, lambda: agent.get_current_time("new york")),
+        ("time.get_current_time.city_zh", "scalar", 1, lambda: agent.get_current_time("台北")),
+    ]
+
+
+def agent_cases(batch_runner, loop) -> list[tuple]:
+    from google.adk.runners import InMemoryRunner
+
+    # model -> tool -> model, every turn reaching the (stub) model
+    plain = InMemoryRunner(agent=batch_runner.load_agent("stub", mcp=False, fast_router=False, llm_cache=False),
+                           app_name=batch_runner.APP_NAME)
+    routed = InMemoryRunner(agent=batch_runner.load_agent("stub", mcp=False, llm_cache=False),
+                            app_name=batch_runner.APP_NAME)
+
+    def turn(runner, query):
+        def call():
+            result = loop.run_until_complete(batch_runner.run_query(runner, {"id": 0, "query": query}, 30))
+            if result["status"] != "ok":
+                raise RuntimeError(f"{query!r}: {result['status']} {result['error']}")
+        return call
+
+    def batch():
+        queries = [{"id": i, "query": q} for i, q in enumerate(AGENT_BATCH)]
+        loop.run_until_complete(batch_runner.run_batch(plain.agent, queries, concurrency=8, warmup=False))
+
+    return [
+        *((f"agent.turn.{name}", "scalar", 1, turn(plain, query)) for name, query in AGENT_TURNS.items()),
+        ("agent.turn.fast_router", "scalar", 1, turn(routed, AGENT_TURNS["time"])),
+        ("agent.run_batch.mixed", "batch", len(AGENT_BATCH), batch),
+    ]
+
+
+# ---- ⏱️ Timing ----
+def measure(call, ops: int, rounds: int, min_time: float) -> dict:
+    call()  # warm-up: caches, lazy imports, first connection
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            call()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1 << 20:
+            break
+        loops = max(loops * 2, int(loops * min_time / max(elapsed, 1e-9)))
+    samples = [elapsed]
+    for _ in range(rounds - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            call()
+        samples.append(time.perf_counter() - start)
+    per_op = sorted(s / (loops * ops) * 1e6 for s in samples)
+    return {
+        "median_us": round(statistics.median(per_op), 3),
+        "min_us": round(per_op[0], 3),
+        "max_us": round(per_op[-1], 3),
+        "ops_per_call": ops,
+        "loops": loops,
+        "rounds": rounds,
+    }
+
+
+def machine() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=FOLDER, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def run_suite(prefix: str = "", rounds: int = 5, min_time: float = 0.05) -> dict:
+    sys.path.insert(0, str(FOLDER))
+    from weather_stub import StubWeatherServer
+
+    random.seed(0)
+    with StubWeatherServer() as server:
+        _setup_env(server.base_url)
+        # imported after the environment is set, so the weather client and agent pick it up
+        import batch_runner
+
+        agent = batch_runner._package_module("agent")
+        local_tools = batch_runner._package_module("local_tools")
+        weather_client = batch_runner._package_module("weather_client")
+        loop = asyncio.new_event_loop()
+        try:
+            cases = [
+                *budget_cases(local_tools),
+                *mood_cases(local_tools),
+                *weather_time_cases(agent, weather_client),
+                *agent_cases(batch_runner, loop),
+            ]
+            results = {}
+            for name, kind, ops, call in cases:
+                if name.startswith(prefix):
+                    results[name] = {"kind": kind, **measure(call, ops, rounds, min_time)}
+        finally:
+            loop.close()
+    return {"machine": machine(), "cases": results}
+
+
+# ---- 📊 Baseline comparison ----
+def compare(results: dict, baseline: dict, tolerance: float) -> dict:
+    """name -> {"status": ok | regression | improved | new, "ratio"} for every measured case."""
+    old = baseline.get("cases", {})
+    verdicts = {}
+    for name, case in results["cases"].items():
+        if name not in old:
+            verdicts[name] = {"status": "new", "ratio": None}
+            continue
+        ratio = case["median_us"] / old[name]["median_us"]
+        status = "regression" if ratio > 1 + tolerance else "improved" if ratio < 1 / (1 + tolerance) else "ok"
+        verdicts[name] = {"status": status, "ratio": round(ratio, 3)}
+    return verdicts
+
+
+def same_machine(a: dict, b: dict) -> bool:
+    keys = ("python", "platform", "machine", "cpu_count")
+    return all(a.get(k) == b.get(k) for k in keys)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-o", "--output", help="write results + comparison as JSON")
+    parser.add_argument("--filter", default="", help="only cases whose name starts with this")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05, help="seconds per round (at least)")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed slowdown, 0.3 = 30%%")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--check", action="store_true", help="exit 1 when a case regressed")
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the baseline")
+    args = parser.parse_args()
+    if args.rounds < 1:
+        parser.error("--rounds must be at least 1")
+
+    results = run_suite(args.filter, args.rounds, args.min_time)
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8")) if baseline_path.exists() else {}
+    verdicts = compare(results, baseline, args.tolerance)
+
+    print(f"{'case':38}{'kind':>8}{'median µs/op':>15}{'baseline':>12}{'ratio':>8}  status")
+    for name, case in results["cases"].items():
+        old = baseline.get("cases", {}).get(name)
+        verdict = verdicts[name]
+        print(
+            f"{name:38}{case['kind']:>8}{case['median_us']:>15.3f}"
+            f"{old['median_us'] if old else float('nan'):>12.3f}"
+            f"{verdict['ratio'] if verdict['ratio'] is not None else float('nan'):>8.2f}  {verdict['status']}"
+        )
+    if baseline and not same_machine(results["machine"], baseline.get("machine", {})):
+        print("note: the baseline was taken on a different machine / Python; ratios are indicative only")
+
+    if args.output:
+        report = {**results, "baseline_machine": baseline.get("machine"), "tolerance": args.tolerance,
+                  "comparison": verdicts}
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    if args.update_baseline:
+        # a filtered run only replaces its own cases
+        merged = {"machine": results["machine"], "cases": {**baseline.get("cases", {}), **results["cases"]}}
+        baseline_path.write_text(json.dumps(merged, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    if args.check and any(v["status"] == "regression" for v in verdicts.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Per-call overhead of the MCP server tools for each way the agent can reach them.
+
+    python bench_tool_transports.py --calls 200
+
+For get_mood (weather2mood) and calculate_budget (budget), median and p95 of:
+  direct     the Python function itself (the tool's own work)
+  inprocess  ADK FunctionTool.run_async, i.e. MCP_MODE=inprocess
+  stdio      MCP call_tool on an open stdio session (one server subprocess)
+  sse        MCP call_tool on an open SSE session to a pooled server (MCP_MODE=remote)
+Connections are opened once and warmed up, so the numbers are the cost per
+call; transport overhead is roughly each row minus "direct".
+"""
+import argparse
+import asyncio
+import inspect
+import os
+import statistics
+import time
+
+from google.adk.tools import FunctionTool
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.sse import sse_client
+from mcp.client.stdio import stdio_client
+
+import local_tools
+import mcp_pool
+
+CASES = {
+    "weather2mood": ("get_mood", {"weather_status": "clear sky", "city": "Taipei"}),
+    "budget": ("calculate_budget", {"total_budget": 30000, "days": 3, "country": "japan"}),
+}
+WARMUP_CALLS = 5
+
+
+async def timed(call, n: int) -> list[float]:
+    for _ in range(WARMUP_CALLS):
+        await call()
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        await call()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def bench_direct(project: str, n: int) -> list[float]:
+    name, args = CASES[project]
+    fn = local_tools.mcp_tools(project, [name])[0]
+
+    async def call():
+        result = fn(**args)
+        if inspect.isawaitable(result):
+            await result
+
+    return await timed(call, n)
+
+
+async def bench_inprocess(project: str, n: int) -> list[float]:
+    name, args = CASES[project]
+    tool = FunctionTool(local_tools.mcp_tools(project, [name])[0])
+    return await timed(lambda: tool.run_async(args=args, tool_context=None), n)
+
+
+async def _bench_session(read, write, project: str, n: int) -> list[float]:
+    name, args = CASES[project]
+    async with ClientSession(read, write) as session:
+        await session.initialize()
+        return await timed(lambda: session.call_tool(name, args), n)
+
+
+async def bench_stdio(project: str, n: int) -> list[float]:
+    _, script, _ = mcp_pool.SERVERS[project]
+    command = mcp_pool.server_command(project, script)
+    params = StdioServerParameters(
+        command=command[0], args=command[1:], cwd=str(local_tools.project_dir(project)),
+        env={"FASTMCP_SHOW_SERVER_BANNER": "false", "FASTMCP_LOG_LEVEL": "WARNING", **os.environ,
+             "MCP_TRANSPORT": "stdio"},
+    )
+    async with stdio_client(params) as (read, write):
+        return await _bench_session(read, write, project, n)
+
+
+async def bench_sse(url: str, project: str, n: int) -> list[float]:
+    async with sse_client(url) as (read, write):
+        return await _bench_session(read, write, project, n)
+
+
+def report(project: str, label: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(0.95 * len(samples)))]
+    print(f"{project:12} {label:10} p50 {statistics.median(samples):8.3f} ms   p95 {p95:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200, help="timed calls per transport")
+    args = parser.parse_args()
+    if args.calls < 1:
+        parser.error("--calls must be at least 1")
+
+    pool = mcp_pool.ServerPool(list(CASES)).start()
+    try:
+        for project in CASES:
+            report(project, "direct", asyncio.run(bench_direct(project, args.calls)))
+            report(project, "inprocess", asyncio.run(bench_inprocess(project, args.calls)))
+            report(project, "stdio", asyncio.run(bench_stdio(project, args.calls)))
+            if pool.healthy(project):
+                report(project, "sse", asyncio.run(bench_sse(pool.url(project), project, args.calls)))
+            else:
+                print(f"{project:12} sse        server not ready: {pool.servers[project].last_error}")
+    finally:
+        pool.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Runs the weather client's resilience features against the fault-injecting stub.
+
+    python check_resilience.py
+
+Every scenario starts a fresh FaultyWeatherServer and client, then prints
+PASS/FAIL with the elapsed time and the upstream actions it saw.
+"""
+import time
+
+import requests
+
+import resilience
+import weather_client
+from weather_stub import FaultyWeatherServer
+
+
+def make_client(server: FaultyWeatherServer, **kwargs) -> weather_client.WeatherClient:
+    options = {"api_key": "test", "timeout": 1.0, "deadline": 3.0, "retries": 2}
+    options.update(kwargs)
+    return weather_client.WeatherClient(base_url=server.base_url, **options)
+
+
+def transient_errors_are_retried():
+    with FaultyWeatherServer(script=["error", "drop", "ok"]) as server:
+        data = make_client(server).get("Taipei")
+        return data["main"]["temp"] == 29.02 and server.request_count == 3, server.actions
+
+
+def unknown_city_is_not_retried():
+    with FaultyWeatherServer() as server:
+        try:
+            make_client(server).get("Atlantis")
+        except weather_client.WeatherLookupError:
+            return server.request_count == 1, server.actions
+        return False, server.actions
+
+
+def deadline_bounds_a_hanging_upstream():
+    with FaultyWeatherServer(delay=5.0, delay_rate=1.0) as server:
+        start = time.monotonic()
+        try:
+            make_client(server, timeout=0.5, deadline=1.5).get("Tokyo")
+        except requests.exceptions.Timeout:
+            return time.monotonic() - start < 2.0, server.actions
+        return False, server.actions
+
+
+def hedge_beats_a_slow_first_request():
+    with FaultyWeatherServer(delay=2.0, script=["slow", "ok"]) as server:
+        start = time.monotonic()
+        make_client(server, hedge=True, hedge_after=0.2).get("Bangkok")
+        return time.monotonic() - start < 1.0, server.actions
+
+
+def breaker_fails_fast_and_serves_stale():
+    with FaultyWeatherServer() as server:
+        breaker = resilience.CircuitBreaker(failure_threshold=2, cooldown=0.5)
+        client = make_client(server, ttl=0.0, stale_ttl=0.0, retries=0, breaker=breaker)
+        client.get("New York")  # warm the cache
+        server.down = True
+        for _ in range(2):
+            client.get("New York")  # fails upstream, answered from cache
+        seen = server.request_count
+        start = time.monotonic()
+        data = client.get("New York")  # circuit open: no request at all
+        fast = time.monotonic() - start < 0.05 and server.request_count == seen
+        try:
+            client.get("Tokyo")  # nothing cached: error without a request
+            return False, server.actions
+        except weather_client.WeatherUnavailableError:
+            pass
+        return fast and data["main"]["temp"] == 13.24 and breaker.state == "open", server.actions
+
+
+def breaker_recovers_after_cooldown():
+    with FaultyWeatherServer() as server:
+        breaker = resilience.CircuitBreaker(failure_threshold=1, cooldown=0.3)
+        client = make_client(server, retries=0, breaker=breaker)
+        server.down = True
+        try:
+            client.get("Taipei")
+        except requests.exceptions.RequestException:
+            pass
+        server.down = False
+        time.sleep(0.35)
+        client.get("Taipei")  # half-open probe succeeds
+        return breaker.state == "closed", server.actions
+
+
+SCENARIOS = [
+    transient_errors_are_retried,
+    unknown_city_is_not_retried,
+    deadline_bounds_a_hanging_upstream,
+    hedge_beats_a_slow_first_request,
+    breaker_fails_fast_and_serves_stale,
+    breaker_recovers_after_cooldown,
+]
+
+
+def main():
+    failed = 0
+    for scenario in SCENARIOS:
+        start = time.monotonic()
+        try:
+            ok, actions = scenario()
+        except Exception as e:
+            ok, actions = False, [f"{type(e).__name__}: {e}"]
+        failed += not ok
+        elapsed = (time.monotonic() - start) * 1000
+        print(f"{'PASS' if ok else 'FAIL'}  {scenario.__name__:40}{elapsed:>8.0f} ms  {actions}")
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Checks get_current_time's place / offset resolution (timezone_index).
+
+    python check_timezones.py
+
+Each scenario resolves a few queries and prints PASS/FAIL with what came
+back. Queries that used to resolve to a confidently wrong zone must now
+resolve correctly or fail with suggestions.
+"""
+import datetime
+
+import timezone_index
+
+
+def resolved(queries: dict) -> tuple[bool, dict]:
+    got = {q: timezone_index.resolve(q) for q in queries}
+    return got == queries, got
+
+
+def names_and_identifiers_resolve():
+    return resolved({
+        "Asia/Taipei": "Asia/Taipei",
+        "new york": "America/New_York",
+        "台北": "Asia/Taipei",
+        "台北市": "Asia/Taipei",
+        "東京都": "Asia/Tokyo",
+        "tokyo, japan": "Asia/Tokyo",
+        "日本東京": "Asia/Tokyo",
+        "台北現在時間": "Asia/Taipei",
+        "los ang": "America/Los_Angeles",
+        "bankok": "Asia/Bangkok",
+        "Europe/Londn": "Europe/London",
+    })
+
+
+def utc_offsets_are_fixed_offsets():
+    ok, got = resolved({
+        "UTC+8": "UTC+08:00",
+        "utc+08:00": "UTC+08:00",
+        "GMT+8": "UTC+08:00",
+        "gmt-3:30": "UTC-03:30",
+        "UTC": "UTC",
+    })
+    taipei = datetime.datetime(2026, 1, 1, 12, tzinfo=timezone_index.lookup_zone("Asia/Taipei"))
+    offset = timezone_index.lookup_zone("UTC+8").utcoffset(None)
+    return ok and offset == taipei.utcoffset(), {**got, "utc+8 offset": str(offset)}
+
+
+def invalid_offsets_are_errors():
+    return resolved({"UTC+15": None, "UTC+8abc": None, "gmt+5:75": None})
+
+
+def etc_zones_are_not_place_names():
+    # Etc/GMT+8 is UTC-8; only the exact identifier may select it
+    return resolved({"gmt+8": "UTC+08:00", "Etc/GMT+8": "Etc/GMT+8"})
+
+
+def other_places_around_a_name_are_not_ignored():
+    return resolved({"Paris, Texas": None, "美國德州": None})
+
+
+def unrelated_words_are_not_fuzzy_matched():
+    return resolved({"Atlantis": None, "pacific": None})
+
+
+def errors_come_with_suggestions():
+    try:
+        timezone_index.lookup_zone("Paris, Texas")
+    except timezone_index.ZoneInfoNotFoundError as e:
+        return "paris (Europe/Paris)" in str(e), str(e)
+    return False, "resolved"
+
+
+SCENARIOS = [
+    names_and_identifiers_resolve,
+    utc_offsets_are_fixed_offsets,
+    invalid_offsets_are_errors,
+    etc_zones_are_not_place_names,
+    other_places_around_a_name_are_not_ignored,
+    unrelated_words_are_not_fuzzy_matched,
+    errors_come_with_suggestions,
+]
+
+
+def main():
+    failed = 0
+    for scenario in SCENARIOS:
+        try:
+            ok, detail = scenario()
+        except Exception as e:
+            ok, detail = False, f"{type(e).__name__}: {e}"
+        failed += not ok
+        print(f"{'PASS' if ok else 'FAIL'}  {scenario.__name__:45} {detail}")
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import json
+import math
+import os
+import re
+import threading
+
+from google.adk.models import LlmRequest
+from google.genai import types
+
+# -------------------------------------------------------------
+# 🗜️ Context compaction for long sessions
+# Runs first in before_model_callback and rewrites the request (never
+# the stored session):
+#   1. always: tool responses from earlier turns keep their short fields;
+#      long strings (formatted_result, mood text, file contents) are cut
+#      to a preview and long lists to their first items
+#   2. over the token budget: model / user text from earlier turns is
+#      cut the same way
+#   3. still over: the oldest turns are dropped
+# The current turn (latest user message and its tool calls) is never
+# touched, so the model always sees the data it is answering from.
+#
+# CONTEXT_COMPACTION=0 disables it; CONTEXT_TOKEN_BUDGET sets the budget.
+# -------------------------------------------------------------
+
+_CJK = re.compile(r"[⺀-鿿가-힯豈-﫿＀-￯]")
+
+# Items kept from a long list in an old tool response
+LIST_PREVIEW_ITEMS = 3
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count: one per CJK character, one per four other characters."""
+    cjk = len(_CJK.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+def _part_text(part: types.Part) -> str:
+    if part.text:
+        return part.text
+    if part.function_call:
+        return json.dumps(part.function_call.args or {}, ensure_ascii=False)
+    if part.function_response:
+        return json.dumps(part.function_response.response or {}, ensure_ascii=False, default=str)
+    return ""
+
+
+def content_tokens(content: types.Content) -> int:
+    return sum(estimate_tokens(_part_text(p)) for p in content.parts or [])
+
+
+def shorten(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    return f"{text[:max_chars]}…(+{len(text) - max_chars} chars)"
+
+
+def compact_value(value, max_chars: int):
+    """Short scalars unchanged, long strings cut, containers compacted recursively."""
+    if isinstance(value, str):
+        return shorten(value, max_chars)
+    if isinstance(value, dict):
+        return {k: compact_value(v, max_chars) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        items = [compact_value(v, max_chars) for v in value[:LIST_PREVIEW_ITEMS]]
+        if len(value) > LIST_PREVIEW_ITEMS:
+            items.append(f"…(+{len(value) - LIST_PREVIEW_ITEMS} items)")
+        return items
+    return value
+
+
+def _is_user_message(content: types.Content) -> bool:
+    return content.role == "user" and any(p.text for p in content.parts or []) and not any(
+        p.function_response for p in content.parts or []
+    )
+
+
+def split_turns(contents: list[types.Content]) -> list[list[types.Content]]:
+    """Groups contents into turns, each starting at a user message."""
+    turns: list[list[types.Content]] = []
+    for content in contents:
+        if not turns or _is_user_message(content):
+            turns.append([])
+        turns[-1].append(content)
+    return turns
+
+
+def _rewrite(content: types.Content, max_chars: int, texts: bool) -> types.Content:
+    """Copy of content with its tool responses compacted, or with texts, its text parts.
+
+    Parts are copied with only that field replaced, so function calls, ids and
+    thought signatures stay intact; every other part is kept as is.
+    """
+    parts = []
+    for part in content.parts or []:
+        if part.function_response and not texts:
+            response = part.function_response.model_copy(
+                update={"response": compact_value(part.function_response.response or {}, max_chars)}
+            )
+            part = part.model_copy(update={"function_response": response})
+        elif texts and part.text and not part.thought:
+            part = part.model_copy(update={"text": shorten(part.text, max_chars)})
+        parts.append(part)
+    return content.model_copy(update={"parts": parts})
+
+
+class ContextCompactor:
+    def __init__(self, token_budget: int = 3000, max_field_chars: int = 120, enabled: bool = True):
+        """
+        Args:
+            token_budget: Estimated prompt tokens (instruction + messages) to stay under.
+            max_field_chars: Characters kept from a long string in an earlier turn.
+            enabled: When False the callback does nothing.
+        """
+        self.token_budget = token_budget
+        self.max_field_chars = max_field_chars
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.compacted_calls = 0
+        self.dropped_turns = 0
+        self.over_budget = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self.last: dict | None = None
+
+    # ---- 🗜️ ADK callback ----
+    def before_model(self, callback_context, llm_request: LlmRequest) -> None:
+        if self.enabled and llm_request.contents:
+            instruction = llm_request.config.system_instruction if llm_request.config else None
+            llm_request.contents = self.compact(llm_request.contents, estimate_tokens(str(instruction or "")))
+        return None
+
+    def compact(self, contents: list[types.Content], fixed_tokens: int = 0) -> list[types.Content]:
+        """New contents list within the budget where possible; the input is not modified."""
+        turns = split_turns(contents)
+        current, earlier = turns[-1], turns[:-1]
+        before = fixed_tokens + sum(content_tokens(c) for c in contents)
+        size = before
+
+        # old tool output is always compacted; old texts only when over budget
+        for texts in (False, True):
+            if not earlier or texts and size <= self.token_budget:
+                break
+            earlier = [[_rewrite(c, self.max_field_chars, texts) for c in turn] for turn in earlier]
+            size = fixed_tokens + sum(content_tokens(c) for turn in (*earlier, current) for c in turn)
+
+        dropped = 0
+        while size > self.token_budget and earlier:
+            size -= sum(content_tokens(c) for c in earlier.pop(0))
+            dropped += 1
+
+        with self._lock:
+            self.calls += 1
+            self.tokens_before += before
+            self.tokens_after += size
+            self.dropped_turns += dropped
+            self.compacted_calls += size < before
+            self.over_budget += size > self.token_budget
+            self.last = {"tokens_before": before, "tokens_after": size, "dropped_turns": dropped}
+        if size == before:
+            return contents
+        return [c for turn in (*earlier, current) for c in turn]
+
+    # ---- 🗜️ Metrics ----
+    def stats(self) -> dict:
+        with self._lock:
+            saved = self.tokens_before - self.tokens_after
+            return {
+                "enabled": self.enabled,
+                "token_budget": self.token_budget,
+                "calls": self.calls,
+                "compacted_calls": self.compacted_calls,
+                "dropped_turns": self.dropped_turns,
+                "over_budget_calls": self.over_budget,
+                "tokens_saved": saved,
+                "tokens_saved_per_call": round(saved / self.calls, 1) if self.calls else 0.0,
+                "avg_prompt_tokens": round(self.tokens_after / self.calls, 1) if self.calls else 0.0,
+                "last": dict(self.last) if self.last else None,
+            }
+
+
+def from_env() -> ContextCompactor:
+    return ContextCompactor(
+        token_budget=int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000")),
+        max_field_chars=int(os.getenv("CONTEXT_FIELD_CHARS", "120")),
+        enabled=os.getenv("CONTEXT_COMPACTION", "1").strip().lower() not in ("0", "false", "no", "off"),
+    )
@@ -0,0 +1,130 @@
+import asyncio
+import os
+import threading
+import time
+from typing import AsyncGenerator, Callable
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.base_toolset import BaseToolset
+from google.adk.tools.function_tool import FunctionTool
+from pydantic import PrivateAttr
+
+# -------------------------------------------------------------
+# 🐢 Cold start: heavy imports are paid when first needed
+# Importing agent.py used to pull in LiteLlm (~0.6 s), the mcp package
+# (~1 s) and both servers' FastMCP (~1.3 s), and blocked until the MCP
+# server pool answered; litellm itself (~4.5 s) then arrived with the
+# first model call. Here:
+# - DeferredLiteLlm imports and builds LiteLlm on its first call
+# - DeferredToolset builds its tools (MCPToolset or in-process server
+#   functions) on the first get_tools, in a worker thread
+# - prewarm() runs those loads in a background thread right after
+#   startup, so a worker is ready quickly and the first request usually
+#   finds them done (STARTUP_PREWARM=0 disables it)
+# -------------------------------------------------------------
+
+_stats_lock = threading.Lock()
+_prewarm: dict[str, dict] = {}
+
+
+class DeferredLiteLlm(BaseLlm):
+    """LiteLlm(model), imported and built on the first model call (or by load())."""
+
+    _llm: BaseLlm | None = PrivateAttr(default=None)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def load(self) -> BaseLlm:
+        with self._lock:
+            if self._llm is None:
+                # litellm otherwise downloads its model price map from GitHub while
+                # importing (and retries for seconds without network); an explicit value wins
+                os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+                from google.adk.models.lite_llm import LiteLlm
+
+                self._llm = LiteLlm(model=self.model)
+            return self._llm
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        llm = self._llm or await asyncio.to_thread(self.load)
+        async for response in llm.generate_content_async(llm_request, stream):
+            yield response
+
+
+class DeferredToolset(BaseToolset):
+    def __init__(self, factory: Callable[[], list], name: str):
+        """
+        Args:
+            factory: Returns the tools: BaseTool / BaseToolset objects or plain
+                functions (wrapped in FunctionTool). Called once, off the event loop.
+            name: Label for stats().
+        """
+        super().__init__()
+        self.name = name
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._items: list | None = None
+        self.build_seconds: float | None = None
+
+    def load(self) -> list:
+        """Builds the tools on the first call (thread-safe, blocking)."""
+        with self._lock:
+            if self._items is None:
+                start = time.perf_counter()
+                self._items = [
+                    item if isinstance(item, (BaseTool, BaseToolset)) else FunctionTool(item)
+                    for item in self._factory()
+                ]
+                self.build_seconds = round(time.perf_counter() - start, 3)
+            return self._items
+
+    async def get_tools(self, readonly_context=None) -> list[BaseTool]:
+        items = self._items if self._items is not None else await asyncio.to_thread(self.load)
+        tools = []
+        for item in items:
+            if isinstance(item, BaseToolset):
+                tools.extend(await item.get_tools_with_prefix(readonly_context))
+            else:
+                tools.append(item)
+        return tools
+
+    async def close(self) -> None:
+        for item in self._items or []:
+            if isinstance(item, BaseToolset):
+                await item.close()
+
+    def stats(self) -> dict:
+        return {"name": self.name, "loaded": self._items is not None, "build_seconds": self.build_seconds}
+
+
+def prewarm(loads: dict[str, Callable]) -> threading.Thread:
+    """Runs each load in order in a daemon thread; timings and errors go to stats()."""
+
+    def run():
+        for name, load in loads.items():
+            start = time.perf_counter()
+            try:
+                load()
+                entry = {"seconds": round(time.perf_counter() - start, 3), "error": None}
+            except Exception as e:
+                # the real call will hit (and report) the same problem
+                entry = {"seconds": round(time.perf_counter() - start, 3), "error": f"{type(e).__name__}: {e}"}
+            with _stats_lock:
+                _prewarm[name] = entry
+
+    thread = threading.Thread(target=run, name="prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+def prewarm_from_env(loads: dict[str, Callable]) -> threading.Thread | None:
+    if os.getenv("STARTUP_PREWARM", "1").strip().lower() in ("0", "false", "no", "off"):
+        return None
+    return prewarm(loads)
+
+
+def stats() -> dict:
+    with _stats_lock:
+        return {name: dict(entry) for name, entry in _prewarm.items()}
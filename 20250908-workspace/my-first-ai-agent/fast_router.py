@@ -0,0 +1,294 @@
+import asyncio
+import datetime
+import inspect
+import os
+import re
+import threading
+import time
+
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+try:
+    from . import local_tools, timezone_index
+except ImportError:  # imported standalone (benchmarks, scripts)
+    import local_tools
+    import timezone_index
+
+# -------------------------------------------------------------
+# 🚦 Deterministic fast path in front of the LLM
+# Plugged in as before_model_callback: when the user's latest message
+# is an unambiguous time, weather or budget question, the matching tool
+# is called directly and a formatted answer is returned in place of the
+# model call. Anything else (several places, unknown names, follow-up
+# questions, mood requests, tool errors) falls through to the LLM.
+# time_model_call / after_model time the model calls that do happen,
+# which gives the latency-saved estimate in stats().
+#
+# Set FAST_ROUTER=0 to send everything to the model.
+# -------------------------------------------------------------
+
+# Traditional Chinese place names -> English names understood by
+# OpenWeatherMap and the budget calculator
+PLACE_NAMES = {
+    "台北": "Taipei", "臺北": "Taipei", "新北": "New Taipei", "桃園": "Taoyuan", "中壢": "Zhongli",
+    "新竹": "Hsinchu", "台中": "Taichung", "臺中": "Taichung", "台南": "Tainan", "臺南": "Tainan",
+    "高雄": "Kaohsiung", "台灣": "Taiwan", "臺灣": "Taiwan",
+    "東京": "Tokyo", "大阪": "Osaka", "京都": "Kyoto", "札幌": "Sapporo", "名古屋": "Nagoya",
+    "福岡": "Fukuoka", "沖繩": "Okinawa", "日本": "Japan",
+    "首爾": "Seoul", "釜山": "Busan", "仁川": "Incheon", "韓國": "Korea", "南韓": "Korea",
+    "北京": "Beijing", "上海": "Shanghai", "廣州": "Guangzhou", "深圳": "Shenzhen", "中國": "China",
+    "香港": "Hong Kong", "澳門": "Macau",
+    "曼谷": "Bangkok", "清邁": "Chiang Mai", "普吉島": "Phuket", "泰國": "Thailand",
+    "新加坡": "Singapore", "吉隆坡": "Kuala Lumpur", "馬來西亞": "Malaysia",
+    "馬尼拉": "Manila", "菲律賓": "Philippines", "雅加達": "Jakarta", "印尼": "Indonesia",
+    "河內": "Hanoi", "胡志明市": "Ho Chi Minh City", "越南": "Vietnam",
+    "金邊": "Phnom Penh", "柬埔寨": "Cambodia",
+    "倫敦": "London", "英國": "UK", "巴黎": "Paris", "法國": "France", "柏林": "Berlin",
+    "慕尼黑": "Munich", "德國": "Germany", "羅馬": "Rome", "米蘭": "Milan", "義大利": "Italy",
+    "馬德里": "Madrid", "巴塞隆納": "Barcelona", "西班牙": "Spain",
+    "阿姆斯特丹": "Amsterdam", "荷蘭": "Netherlands", "蘇黎世": "Zurich", "瑞士": "Switzerland",
+    "伊斯坦堡": "Istanbul", "土耳其": "Turkey",
+    "紐約": "New York", "波士頓": "Boston", "芝加哥": "Chicago", "洛杉磯": "Los Angeles",
+    "舊金山": "San Francisco", "西雅圖": "Seattle", "拉斯維加斯": "Las Vegas", "美國": "USA",
+    "多倫多": "Toronto", "溫哥華": "Vancouver", "加拿大": "Canada",
+    "雪梨": "Sydney", "悉尼": "Sydney", "墨爾本": "Melbourne", "布里斯本": "Brisbane",
+    "澳洲": "Australia", "奧克蘭": "Auckland", "紐西蘭": "New Zealand",
+}
+_PLACES_BY_LENGTH = sorted(PLACE_NAMES, key=len, reverse=True)
+
+# Typical LLM calls for a tool question: one to pick the tool, one to phrase the answer
+LLM_CALLS_PER_TOOL_TURN = 2
+
+_MOOD = re.compile(r"心情|感覺|mood|feel", re.I)
+_TIME = re.compile(r"幾點|時間|what time|current time|time is it|time in\b|local time", re.I)
+_WEATHER = re.compile(r"天氣|氣溫|溫度|幾度|weather|temperature", re.I)
+_BUDGET = re.compile(r"預算|budget", re.I)
+_INTENTS = {"time": _TIME, "weather": _WEATHER, "budget": _BUDGET}
+
+# words around the place name in a time / weather question
+_FILLER_ZH = re.compile(
+    r"請問|現在|目前|今天|今日|幾點|時間|天氣|氣溫|溫度|幾度|如何|怎麼樣|怎樣|好嗎|多少|是|了|呢|嗎|啊|的"
+)
+_FILLER_EN = re.compile(
+    r"\b(what's|what|is|it|the|current|local|time|now|right|in|at|for|weather|temperature|"
+    r"like|today|how's|how|please|tell|me)\b",
+    re.I,
+)
+_PUNCT = re.compile(r"[\s,.!?;:，。！？、；：~～]+")
+
+_DAYS = re.compile(r"(\d+)\s*(?:天|日|days?\b)", re.I)
+_PEOPLE = re.compile(r"(\d+)\s*(?:個人|人|位|people\b|persons?\b|pax\b)", re.I)
+_AMOUNT = re.compile(r"(\d+(?:\.\d+)?)\s*(萬|千|k\b)?", re.I)
+_AMOUNT_UNITS = {None: 1, "萬": 10_000, "千": 1_000, "k": 1_000}
+
+
+def enabled_from_env() -> bool:
+    return os.getenv("FAST_ROUTER", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def latest_user_text(llm_request: LlmRequest) -> str | None:
+    """Text of the newest user turn, or None when the model is continuing after tool calls."""
+    if not llm_request.contents:
+        return None
+    last = llm_request.contents[-1]
+    if last.role != "user" or not last.parts:
+        return None
+    if any(p.function_response or p.function_call for p in last.parts):
+        return None
+    text = "".join(p.text or "" for p in last.parts).strip()
+    return text or None
+
+
+def place_in(text: str) -> str | None:
+    """The single place a short time / weather question is about, as typed by the user."""
+    rest = _FILLER_EN.sub(" ", _FILLER_ZH.sub(" ", text))
+    rest = _PUNCT.sub(" ", rest).strip()
+    if rest.endswith("市") and len(rest) > 2:
+        rest = rest[:-1]
+    if not rest or timezone_index.resolve_exact(rest) is None and rest not in PLACE_NAMES:
+        return None
+    return rest
+
+
+def intent_of(text: str) -> str | None:
+    """"time", "weather" or "budget" when exactly one of them is asked about (mood questions excluded)."""
+    if _MOOD.search(text):
+        return None
+    matched = [name for name, pattern in _INTENTS.items() if pattern.search(text)]
+    return matched[0] if len(matched) == 1 else None
+
+
+def english_name(place: str) -> str:
+    # all-caps input is an abbreviation ("LA", "NYC"); title-casing would turn it into a word
+    return PLACE_NAMES.get(place) or (place if place.isupper() else place.title())
+
+
+def answer(text: str) -> LlmResponse:
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+
+class FastRouter:
+    def __init__(self, get_current_time, get_weather, calculate_budget=None, enabled: bool | None = None):
+        """
+        Args:
+            get_current_time: The agent's time tool.
+            get_weather: The agent's weather tool.
+            calculate_budget: Budget tool; loaded from the budget MCP project on first use when omitted.
+            enabled: Defaults to the FAST_ROUTER environment variable.
+        """
+        self.get_current_time = get_current_time
+        self.get_weather = get_weather
+        self._calculate_budget = calculate_budget
+        self._budget_module = None
+        self.enabled = enabled_from_env() if enabled is None else enabled
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._hits = {"time": 0, "weather": 0, "budget": 0}
+        self._fast_seconds = 0.0
+        self._llm_calls = 0
+        self._llm_seconds = 0.0
+        self._pending: dict[str, float] = {}
+
+    # ---- 🌦️ ADK callbacks ----
+    async def before_model(self, callback_context, llm_request: LlmRequest) -> LlmResponse | None:
+        text = latest_user_text(llm_request) if self.enabled else None
+        if text is not None:
+            start = time.perf_counter()
+            routed = await self.route(text)
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._requests += 1
+                if routed is not None:
+                    self._hits[routed[0]] += 1
+                    self._fast_seconds += elapsed
+            if routed is not None:
+                return answer(routed[1])
+        return None
+
+    def time_model_call(self, callback_context, llm_request: LlmRequest) -> None:
+        """Starts the model-call timer; must be the last before_model_callback so that
+        calls answered by another callback (e.g. the response cache) are not timed."""
+        with self._lock:
+            self._pending[callback_context.invocation_id] = time.perf_counter()
+        return None
+
+    def after_model(self, callback_context, llm_response: LlmResponse) -> None:
+        if llm_response.partial:  # streaming chunk; wait for the final response
+            return None
+        with self._lock:
+            start = self._pending.pop(callback_context.invocation_id, None)
+            if start is not None:
+                self._llm_calls += 1
+                self._llm_seconds += time.perf_counter() - start
+        return None
+
+    # ---- 🌦️ Intent rules ----
+    async def route(self, text: str) -> tuple[str, str] | None:
+        """Returns (intent, answer text) for a high-confidence question, else None."""
+        intent = intent_of(text)
+        if intent is None:
+            return None
+        reply = await {"time": self._time, "weather": self._weather, "budget": self._budget}[intent](text)
+        return (intent, reply) if reply else None
+
+    @staticmethod
+    async def _call(tool, *args, **kwargs):
+        # tools may be async, e.g. calculate_budget under BUDGET_EXECUTOR=thread/process;
+        # sync tools (HTTP weather lookups, the inline budget model) run in a worker
+        # thread so they don't block the event loop for every other session
+        if inspect.iscoroutinefunction(tool):
+            return await tool(*args, **kwargs)
+        result = await asyncio.to_thread(tool, *args, **kwargs)
+        return await result if inspect.isawaitable(result) else result
+
+    async def _time(self, text: str) -> str | None:
+        place = place_in(text)
+        if place is None:
+            return None
+        result = await self._call(self.get_current_time, place)
+        if result["status"] != "success":
+            return None
+        now = datetime.datetime.fromisoformat(result["datetime"])
+        return f"{place}現在時間是 {now:%Y-%m-%d %H:%M}（{result['timezone']}）。"
+
+    async def _weather(self, text: str) -> str | None:
+        place = place_in(text)
+        if place is None:
+            return None
+        result = await self._call(self.get_weather, english_name(place))
+        if result["status"] != "success":
+            return None
+        return f"{place}目前天氣：{result['description']}，氣溫 {result['temperature']}°C。"
+
+    async def _budget(self, text: str) -> str | None:
+        calculate_budget = self._budget_tool()
+        if calculate_budget is None:
+            return None
+        days = _DAYS.findall(text)
+        people = _PEOPLE.findall(text)
+        rest = _PEOPLE.sub(" ", _DAYS.sub(" ", text))
+        amounts = _AMOUNT.findall(rest)
+        if len(days) != 1 or len(people) > 1 or len(amounts) != 1:
+            return None
+        num_days, num_people = int(days[0]), int(people[0]) if people else 1
+        if num_days <= 0 or num_people <= 0:
+            return None
+        destination = self._destination(text)
+        if destination is None:
+            return None
+        number, unit = amounts[0]
+        total = float(number) * _AMOUNT_UNITS[unit.lower() or None]
+        result = await self._call(
+            calculate_budget,
+            total_budget=total,
+            days=num_days,
+            country=destination,
+            num_people=num_people,
+        )
+        return result.get("formatted_result")
+
+    def _destination(self, text: str) -> str | None:
+        """The one known budget destination named in the text (Chinese or English)."""
+        known = self._budget_module.price_registry.current().country_of
+        found = set()
+        for name in _PLACES_BY_LENGTH:
+            if name in text:
+                found.add(PLACE_NAMES[name].lower())
+                text = text.replace(name, " ")
+        words = " " + _PUNCT.sub(" ", text.lower()) + " "
+        found.update(name for name in known if f" {name} " in words)
+        found = {name for name in found if name in known}
+        return found.pop() if len(found) == 1 else None
+
+    def _budget_tool(self):
+        if self._budget_module is None:
+            try:
+                self._budget_module = local_tools.load("budget", "app")
+            except ImportError:  # budget project or its dependencies not available here
+                self._budget_module = False
+        if not self._budget_module:
+            return None
+        tool = self._calculate_budget or self._budget_module.calculate_budget
+        return getattr(tool, "fn", tool)
+
+    # ---- 🌦️ Metrics ----
+    def stats(self) -> dict:
+        """Hit rate per intent and an estimate of the model latency the fast path avoided."""
+        with self._lock:
+            hits = sum(self._hits.values())
+            llm_avg = self._llm_seconds / self._llm_calls if self._llm_calls else None
+            fast_avg = self._fast_seconds / hits if hits else 0.0
+            saved = None
+            if llm_avg is not None:
+                saved = hits * LLM_CALLS_PER_TOOL_TURN * llm_avg - self._fast_seconds
+            return {
+                "enabled": self.enabled,
+                "requests": self._requests,
+                "hits": dict(self._hits),
+                "hit_rate": round(hits / self._requests, 3) if self._requests else 0.0,
+                "fast_path_avg_ms": round(fast_avg * 1000, 2),
+                "llm_calls": self._llm_calls,
+                "llm_call_avg_ms": round(llm_avg * 1000, 1) if llm_avg is not None else None,
+                "estimated_saved_ms": round(saved * 1000) if saved is not None else None,
+            }
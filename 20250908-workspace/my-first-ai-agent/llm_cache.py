@@ -0,0 +1,246 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+from google.adk.models import LlmRequest, LlmResponse
+
+# -------------------------------------------------------------
+# 💾 Exact-match cache for model turns
+# Plugged in as before/after_model_callback (and on_model_error_callback,
+# which forgets the pending key of a failed call). The key is a hash of the
+# normalized request: model, instruction, tool names and every message,
+# including function calls and tool responses. A repeated question
+# therefore hits on its first model call (which tool to call), and on
+# the answer call only when the tool returned exactly the same data
+# (e.g. weather still served from the weather cache); a time question
+# always reaches the model for its answer because the time differs.
+#
+# - LRU eviction above max_entries, entries expire after ttl seconds
+# - optional SQLite file (LLM_CACHE_PATH) shared across restarts
+# - LLM_CACHE=0 disables it
+# -------------------------------------------------------------
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key       TEXT PRIMARY KEY,
+    payload   TEXT NOT NULL,
+    latency   REAL NOT NULL,
+    stored_at REAL NOT NULL
+)
+"""
+
+
+def _normalize(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", text).split()).casefold()
+
+
+def request_key(llm_request: LlmRequest) -> str:
+    """Stable hash of everything that determines the model's reply (call ids excluded)."""
+    config = llm_request.config
+    messages = []
+    for content in llm_request.contents:
+        parts = []
+        for part in content.parts or []:
+            if part.text:
+                parts.append(["text", _normalize(part.text)])
+            elif part.function_call:
+                parts.append(["call", part.function_call.name, part.function_call.args or {}])
+            elif part.function_response:
+                parts.append(["result", part.function_response.name, part.function_response.response or {}])
+        messages.append([content.role, parts])
+    material = {
+        "model": llm_request.model,
+        "instruction": _normalize(str(config.system_instruction or "")) if config else "",
+        "tools": sorted(llm_request.tools_dict),
+        "messages": messages,
+    }
+    blob = json.dumps(material, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _cacheable(llm_response: LlmResponse) -> bool:
+    return not llm_response.partial and not llm_response.error_code and bool(
+        llm_response.content and llm_response.content.parts
+    )
+
+
+def _to_payload(llm_response: LlmResponse) -> str:
+    """Serialized reply without call ids and token usage (a replay costs no tokens)."""
+    stored = llm_response.model_copy(deep=True)
+    stored.usage_metadata = None
+    for part in stored.content.parts:
+        if part.function_call:
+            part.function_call.id = None
+    return stored.model_dump_json(exclude_none=True)
+
+
+class ResponseCache:
+    def __init__(self, ttl: float = 300.0, max_entries: int = 1000, path: str | Path | None = None, enabled: bool = True):
+        """
+        Args:
+            ttl: Seconds an entry is served after it was stored.
+            max_entries: Entries kept in memory (and on disk); least recently used go first.
+            path: SQLite file for persistence; None keeps the cache in memory only.
+            enabled: When False both callbacks do nothing.
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._data: OrderedDict[str, tuple[str, float, float]] = OrderedDict()
+        self._pending: dict[str, tuple[str, float]] = {}
+        self._conn = None
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(path, timeout=2.0, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(_SCHEMA)
+            self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.saved_seconds = 0.0
+
+    # ---- 💾 ADK callbacks ----
+    def before_model(self, callback_context, llm_request: LlmRequest) -> LlmResponse | None:
+        if not self.enabled:
+            return None
+        key = request_key(llm_request)
+        entry = self.get(key)
+        if entry is None:
+            now = time.perf_counter()
+            with self._lock:
+                self._drop_stale_pending(now)
+                self._pending[callback_context.invocation_id] = (key, now)
+            return None
+        payload, latency = entry
+        with self._lock:
+            self.saved_seconds += latency
+        response = LlmResponse.model_validate_json(payload)
+        response.custom_metadata = {**(response.custom_metadata or {}), "llm_cache": "hit"}
+        return response
+
+    def after_model(self, callback_context, llm_response: LlmResponse) -> None:
+        if not self.enabled or llm_response.partial:
+            return None
+        with self._lock:
+            pending = self._pending.pop(callback_context.invocation_id, None)
+        if pending is not None and _cacheable(llm_response):
+            key, start = pending
+            self.put(key, _to_payload(llm_response), time.perf_counter() - start)
+        return None
+
+    def on_model_error(self, callback_context, llm_request: LlmRequest, error: Exception) -> None:
+        # a failed call never reaches after_model; forget its key so it isn't kept forever
+        with self._lock:
+            self._pending.pop(callback_context.invocation_id, None)
+        return None
+
+    def _drop_stale_pending(self, now: float) -> None:
+        # cancelled calls (e.g. a batch timeout) skip both after_model and on_model_error
+        stale = [k for k, (_, start) in self._pending.items() if now - start >= self.ttl]
+        for k in stale:
+            del self._pending[k]
+
+    # ---- 💾 Storage ----
+    def get(self, key: str) -> tuple[str, float] | None:
+        """(serialized response, original model latency) for a fresh entry, else None."""
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None and self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT payload, latency, stored_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = self._data[key] = tuple(row)
+                    self._trim()
+            if entry is None:
+                self.misses += 1
+                return None
+            payload, latency, stored_at = entry
+            if now - stored_at >= self.ttl:
+                del self._data[key]
+                self._delete(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return payload, latency
+
+    def put(self, key: str, payload: str, latency: float) -> None:
+        stored_at = time.time()
+        with self._lock:
+            self._data[key] = (payload, latency, stored_at)
+            self._data.move_to_end(key)
+            self.stores += 1
+            self._trim()
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, payload, latency, stored_at) VALUES (?, ?, ?, ?)",
+                    (key, payload, latency, stored_at),
+                )
+                # keep the file within ttl / max_entries too (it outlives this process)
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE stored_at < ? OR key NOT IN "
+                    "(SELECT key FROM llm_cache ORDER BY stored_at DESC LIMIT ?)",
+                    (stored_at - self.ttl, self.max_entries),
+                )
+                self._conn.commit()
+
+    def _trim(self) -> None:
+        while len(self._data) > self.max_entries:
+            old, _ = self._data.popitem(last=False)
+            self._delete(old)
+            self.evictions += 1
+
+    def _delete(self, key: str) -> None:
+        if self._conn is not None:
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._pending.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM llm_cache")
+                self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "persistent": self._conn is not None,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "saved_ms": round(self.saved_seconds * 1000),
+            }
+
+
+def from_env() -> ResponseCache:
+    return ResponseCache(
+        ttl=float(os.getenv("LLM_CACHE_TTL", "300")),
+        max_entries=int(os.getenv("LLM_CACHE_SIZE", "1000")),
+        path=os.getenv("LLM_CACHE_PATH") or None,
+        enabled=os.getenv("LLM_CACHE", "1").strip().lower() not in ("0", "false", "no", "off"),
+    )
@@ -0,0 +1,60 @@
+import importlib
+import os
+import sys
+import threading
+from pathlib import Path
+
+# -------------------------------------------------------------
+# 🧩 In-process access to sibling projects in this repo
+# The MCP servers live in flat script folders whose modules import
+# each other by bare name (`import weather_classifier`), so the folder
+# is appended to sys.path and the module is imported normally.
+# Folder locations can be overridden with environment variables.
+# -------------------------------------------------------------
+
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+
+PROJECT_DIRS = {
+    "weather2mood": ("WEATHER2MOOD_DIR", _REPO_ROOT / "20251013-weather2mood"),
+    "budget": ("BUDGET_DIR", _REPO_ROOT / "20251027-ChengyuSaying"),
+    # modules shared by the agent and the servers (tool_metrics)
+    "shared": ("SHARED_DIR", _REPO_ROOT / "shared"),
+}
+
+_lock = threading.Lock()
+
+
+def project_dir(project: str) -> Path:
+    env, default = PROJECT_DIRS[project]
+    return Path(os.getenv(env, default)).resolve()
+
+
+def load(project: str, module: str):
+    """Imports `module` from a sibling project folder (cached after the first call)."""
+    with _lock:
+        folder = str(project_dir(project))
+        if folder not in sys.path:
+            # appended, so the agent's own modules always win on name clashes
+            sys.path.append(folder)
+        return importlib.import_module(module)
+
+
+# Tools each project's MCP server exposes: project -> (server module, tool names)
+MCP_TOOLS = {
+    "weather2mood": ("server", ("get_mood", "read_file", "write_file", "list_directory", "search_files")),
+    "budget": ("app", ("calculate_budget", "calculate_budgets", "required_budget", "plan_itinerary")),
+}
+
+
+def mcp_tools(project: str, names=None) -> list:
+    """The server's tool functions, for registering them as native agent tools.
+
+    Importing the server module only builds its FastMCP object; nothing is
+    started. The functions are the ones the server itself runs (docstrings
+    and signatures included), so the declarations the model sees match the
+    MCP schemas and the results are the same dicts, minus the JSON round trip.
+    """
+    module_name, default_names = MCP_TOOLS[project]
+    module = load(project, module_name)
+    # FastMCP 2.x wraps decorated functions in a Tool object; newer releases return them as-is
+    return [getattr(tool, "fn", tool) for tool in (getattr(module, name) for name in names or default_names)]
@@ -0,0 +1,353 @@
+"""
+Pool of long-running local MCP server processes.
+
+    python mcp_pool.py                  # start the pool, print startup / first-call latency
+    python mcp_pool.py --compare-stdio  # also time a cold stdio launch of the same server
+
+Started from agent.py when the agent loads, only with MCP_POOL=1.
+
+Exposure: each pooled server is an SSE service on 127.0.0.1, on a free
+port picked at startup (see stats()). It has no authentication, so any
+local process or user can call its tools, and weather2mood's include
+read_file / write_file on the shared folder. The default (no pool) talks
+to a private stdio pipe instead.
+"""
+import argparse
+import asyncio
+import atexit
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+try:
+    from . import local_tools
+except ImportError:  # run as a script: python mcp_pool.py
+    import local_tools
+
+# -------------------------------------------------------------
+# 🔥 Warm MCP servers shared by every agent session
+# Launching weather2mood over stdio costs uv environment resolution,
+# interpreter startup and the FastMCP import on every connection. The
+# pool instead starts each server once, as an SSE service on a fixed
+# local port, and the agent's MCPToolset connects over HTTP:
+# - startup waits until a probe (initialize + list_tools) succeeds, then
+#   makes one warm-up tool call so lazy imports are done before users come
+# - a monitor thread probes every server and restarts it (same port)
+#   when the process exits or stops answering
+# - stats() reports startup time, first-call latency and restarts
+# -------------------------------------------------------------
+
+# name -> (project in local_tools.PROJECT_DIRS, script, warm-up tool call)
+SERVERS = {
+    "weather2mood": ("weather2mood", "server.py", ("get_mood", {"weather_status": "clear sky"})),
+    "budget": ("budget", "app.py", ("calculate_budget", {"total_budget": 30000, "days": 3, "country": "japan"})),
+}
+# Started by start_from_env() unless MCP_POOL_SERVERS lists others
+DEFAULT_SERVERS = ("weather2mood",)
+
+# Consecutive failed probes before a running server is restarted
+FAILURE_THRESHOLD = 3
+# Upper bound on the delay between restarts of a crash-looping server
+MAX_RESTART_DELAY = 30.0
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def server_command(project: str, script: str) -> list[str]:
+    """`uv run` in the project folder when uv is installed, else this interpreter."""
+    uv = os.getenv("UV_BIN") or shutil.which("uv")
+    if uv:
+        return [uv, "--directory", str(local_tools.project_dir(project)), "run", script]
+    return [sys.executable, script]
+
+
+async def _session_call(read, write, warm_call=None, timeout: float = 10.0):
+    # mcp is imported on first use: it costs about a second, which agent.py's
+    # import (and MCP_MODE=inprocess) should not pay
+    from mcp import ClientSession
+
+    async with ClientSession(read, write) as session:
+        await asyncio.wait_for(session.initialize(), timeout)
+        await asyncio.wait_for(session.list_tools(), timeout)
+        if warm_call is not None:
+            result = await asyncio.wait_for(session.call_tool(*warm_call), timeout)
+            # the field was renamed isError -> is_error in newer mcp releases
+            if getattr(result, "is_error", None) or getattr(result, "isError", False):
+                raise RuntimeError(f"{warm_call[0]} failed")
+
+
+async def _probe_sse(url: str, warm_call=None, timeout: float = 10.0) -> None:
+    from mcp.client.sse import sse_client
+
+    async with sse_client(url, timeout=timeout) as (read, write):
+        await _session_call(read, write, warm_call, timeout)
+
+
+def probe(url: str, warm_call=None, timeout: float = 10.0) -> float:
+    """Seconds for connect + initialize + list_tools (+ the warm-up call); raises on failure."""
+    start = time.perf_counter()
+    asyncio.run(_probe_sse(url, warm_call, timeout))
+    return time.perf_counter() - start
+
+
+class ManagedServer:
+    def __init__(self, name: str, project: str, script: str, warm_call=None, port: int | None = None):
+        self.name = name
+        self.project = project
+        self.script = script
+        self.warm_call = warm_call
+        # fixed for the pool's lifetime so the agent's URL survives restarts
+        self.port = port or _free_port()
+        self.url = f"http://127.0.0.1:{self.port}/sse"
+        self.process: subprocess.Popen | None = None
+        self.state = "stopped"
+        self.restarts = 0
+        self.failures = 0
+        self.startup_seconds: float | None = None
+        self.first_call_ms: float | None = None
+        self.last_probe_ms: float | None = None
+        self.last_error: str | None = None
+
+    def spawn(self) -> None:
+        env = {
+            # no banner / per-request access log in the agent's console (overridable)
+            "FASTMCP_SHOW_SERVER_BANNER": "false",
+            "FASTMCP_LOG_LEVEL": "WARNING",
+            **os.environ,
+            "MCP_TRANSPORT": "sse",
+            "MCP_HOST": "127.0.0.1",
+            "MCP_PORT": str(self.port),
+        }
+        self.process = subprocess.Popen(
+            server_command(self.project, self.script),
+            cwd=local_tools.project_dir(self.project),
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+        )
+        self.state = "starting"
+
+    def wait_ready(self, timeout: float, stop: threading.Event) -> bool:
+        """Polls until the server answers, then runs the warm-up call; False on timeout or exit."""
+        start = time.perf_counter()
+        while time.perf_counter() - start < timeout:
+            if self.process.poll() is not None:
+                self.last_error = f"exited with code {self.process.returncode}"
+                self.state = "crashed"
+                return False
+            try:
+                probe(self.url, timeout=2.0)
+            except Exception:
+                if stop.wait(0.2):
+                    return False
+                continue
+            self.startup_seconds = round(time.perf_counter() - start, 3)
+            try:
+                self.first_call_ms = round(probe(self.url, self.warm_call) * 1000, 1)
+            except Exception as e:
+                self.last_error = f"warm-up call: {type(e).__name__}: {e}"
+            self.state = "ready"
+            self.failures = 0
+            return True
+        self.last_error = f"not ready after {timeout:.0f}s"
+        self.state = "unhealthy"
+        return False
+
+    def terminate(self) -> None:
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self.state = "stopped"
+
+    def stats(self) -> dict:
+        return {
+            "url": self.url,
+            "pid": self.process.pid if self.process else None,
+            "state": self.state,
+            "restarts": self.restarts,
+            "startup_seconds": self.startup_seconds,
+            "first_call_ms": self.first_call_ms,
+            "last_probe_ms": self.last_probe_ms,
+            "last_error": self.last_error,
+        }
+
+
+class ServerPool:
+    def __init__(self, names: list[str], health_interval: float = 15.0, startup_timeout: float = 30.0):
+        """
+        Args:
+            names: Keys of SERVERS to run.
+            health_interval: Seconds between health probes of each server.
+            startup_timeout: Seconds a (re)started server gets to answer its first probe.
+        """
+        self.servers = {name: ManagedServer(name, *SERVERS[name]) for name in names}
+        self.health_interval = health_interval
+        self.startup_timeout = startup_timeout
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self, wait: bool = True) -> "ServerPool":
+        """Spawns every server; a background thread waits for them in parallel, then monitors.
+
+        Args:
+            wait: Block until every server is ready or has failed to start.
+                With False the caller continues at once and calls wait_ready()
+                before it needs a server.
+        """
+        for server in self.servers.values():
+            server.spawn()
+        atexit.register(self.stop)
+        self._thread = threading.Thread(target=self._run, name="mcp-pool", daemon=True)
+        self._thread.start()
+        if wait:
+            self.wait_ready()
+        return self
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        """Blocks until startup is over (each server ready or failed); False on timeout."""
+        return self._ready.wait(timeout)
+
+    def healthy(self, name: str) -> bool:
+        server = self.servers.get(name)
+        return server is not None and server.state == "ready"
+
+    def url(self, name: str) -> str:
+        return self.servers[name].url
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._lock:
+            for server in self.servers.values():
+                server.terminate()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {name: server.stats() for name, server in self.servers.items()}
+
+    def _run(self) -> None:
+        waits = [
+            threading.Thread(target=s.wait_ready, args=(self.startup_timeout, self._stop), daemon=True)
+            for s in self.servers.values()
+        ]
+        for t in waits:
+            t.start()
+        for t in waits:
+            t.join()
+        self._ready.set()
+        self._monitor()
+
+    def _monitor(self) -> None:
+        crashes = {name: 0 for name in self.servers}
+        while not self._stop.wait(self.health_interval):
+            for name, server in self.servers.items():
+                if self._stop.is_set():
+                    return
+                if self._check(server):
+                    crashes[name] = 0
+                    continue
+                # crash loop: back off before the next attempt
+                crashes[name] += 1
+                if self._stop.wait(min(MAX_RESTART_DELAY, 2 ** (crashes[name] - 1) - 1)):
+                    return
+                with self._lock:
+                    server.terminate()
+                    server.restarts += 1
+                    server.spawn()
+                server.wait_ready(self.startup_timeout, self._stop)
+
+    def _check(self, server: ManagedServer) -> bool:
+        """True while the server is healthy enough to keep."""
+        if server.process.poll() is not None:
+            server.last_error = f"exited with code {server.process.returncode}"
+            server.state = "crashed"
+            return False
+        try:
+            server.last_probe_ms = round(probe(server.url, timeout=5.0) * 1000, 1)
+        except Exception as e:
+            server.failures += 1
+            server.last_error = f"probe: {type(e).__name__}"
+            return server.failures < FAILURE_THRESHOLD
+        server.failures = 0
+        server.state = "ready"
+        return True
+
+
+_pool: ServerPool | None = None
+
+
+def start_from_env(wait: bool = True) -> ServerPool | None:
+    """Starts the process-wide pool when MCP_POOL=1 (see ServerPool.start for wait)."""
+    global _pool
+    if os.getenv("MCP_POOL", "0").strip().lower() not in ("1", "true", "yes", "on"):
+        return None
+    if _pool is None:
+        names = [n.strip() for n in os.getenv("MCP_POOL_SERVERS", ",".join(DEFAULT_SERVERS)).split(",") if n.strip()]
+        _pool = ServerPool(
+            names,
+            health_interval=float(os.getenv("MCP_POOL_HEALTH_INTERVAL", "15")),
+            startup_timeout=float(os.getenv("MCP_POOL_STARTUP_TIMEOUT", "30")),
+        ).start(wait)
+    return _pool
+
+
+def stats() -> dict:
+    return _pool.stats() if _pool is not None else {}
+
+
+async def _cold_stdio_call(name: str) -> float:
+    from mcp import StdioServerParameters
+    from mcp.client.stdio import stdio_client
+
+    project, script, warm_call = SERVERS[name]
+    command = server_command(project, script)
+    params = StdioServerParameters(
+        command=command[0], args=command[1:], cwd=str(local_tools.project_dir(project)),
+        env={**os.environ, "MCP_TRANSPORT": "stdio"},
+    )
+    start = time.perf_counter()
+    async with stdio_client(params) as (read, write):
+        await _session_call(read, write, warm_call, timeout=60.0)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Start the MCP server pool and report its latency.")
+    parser.add_argument("--compare-stdio", action="store_true", help="also time a cold stdio launch per server")
+    parser.add_argument("--calls", type=int, default=5, help="warm calls timed per server")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    pool = ServerPool(list(SERVERS)).start()
+    print(f"pool ready in {time.perf_counter() - start:.2f}s")
+    try:
+        for name, server in pool.servers.items():
+            print(name, json.dumps(server.stats(), ensure_ascii=False))
+            if not pool.healthy(name):
+                continue
+            warm = sorted(probe(server.url, server.warm_call) * 1000 for _ in range(args.calls))
+            print(f"  pooled first call (connect + initialize + {server.warm_call[0]}): "
+                  f"median {warm[len(warm) // 2]:.1f} ms")
+            if args.compare_stdio:
+                cold = asyncio.run(_cold_stdio_call(name)) * 1000
+                print(f"  cold stdio launch + first call: {cold:.1f} ms")
+    finally:
+        pool.stop()
+
+
+if __name__ == "__main__":
+    main()
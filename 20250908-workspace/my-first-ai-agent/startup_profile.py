@@ -0,0 +1,174 @@
+"""
+Cold-start profile of the agent and the MCP servers, checked against a budget.
+
+    python startup_profile.py                 # import breakdown + time to first tool call
+    python startup_profile.py --check         # exit 1 when a metric is over startup_budget.json
+    python startup_profile.py --json          # machine-readable report on stdout
+
+Every number comes from a fresh interpreter (median of --runs):
+  import breakdown   `python -X importtime`, self time summed per top-level package
+  agent import       `import agent` with MCP_POOL=0 and STARTUP_PREWARM=0
+  first tool call    import agent -> tools listed -> first get_mood result, per MCP_MODE
+                     (remote runs with MCP_POOL=1: starting the server pool and waiting for it)
+  server import      `import server` / `import app` in the server's folder
+
+startup_budget.json holds the limits (ms), set at roughly 1.5x the values
+measured when they were last changed: lower them after an improvement,
+raise them only together with the change that needs it.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+FOLDER = Path(__file__).resolve().parent
+BUDGET_PATH = FOLDER / "startup_budget.json"
+FIRST_CALL = ("get_mood", {"weather_status": "clear sky"})
+# imports the agent package the way `adk web` does, from the folder above
+IMPORT_AGENT = (
+    f"import importlib, sys; sys.path.insert(0, {str(FOLDER.parent)!r}); "
+    f"importlib.import_module({FOLDER.name + '.agent'!r})"
+)
+# the measurements should not load anything in the background
+QUIET_ENV = {"STARTUP_PREWARM": "0", "FASTMCP_SHOW_SERVER_BANNER": "false", "FASTMCP_LOG_LEVEL": "WARNING"}
+
+
+def _python(code: str, env: dict | None = None, cwd: Path | None = None, importtime: bool = False):
+    args = [sys.executable, *(["-X", "importtime"] if importtime else []), "-c", code]
+    return subprocess.run(
+        args, capture_output=True, text=True, cwd=cwd, env={**os.environ, **QUIET_ENV, **(env or {})}, check=True,
+    )
+
+
+def import_breakdown(top: int = 12) -> dict:
+    """Self time (ms) of importing agent.py, grouped by top-level package."""
+    stderr = _python(IMPORT_AGENT, {"MCP_POOL": "0"}, importtime=True).stderr
+    groups: dict[str, float] = defaultdict(float)
+    total = 0.0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        package = FOLDER.name + "." + name.split(".")[1] if name.startswith(FOLDER.name + ".") else name.split(".")[0]
+        groups[package] += int(self_us) / 1000
+        total += int(self_us) / 1000
+    ranked = sorted(groups.items(), key=lambda kv: -kv[1])
+    return {"total_ms": round(total, 1), "top": {name: round(ms, 1) for name, ms in ranked[:top]}}
+
+
+def _timed_python(code: str, env: dict | None = None, cwd: Path | None = None) -> dict:
+    """Runs code that prints one JSON object as its last stdout line."""
+    return json.loads(_python(code, env, cwd).stdout.strip().splitlines()[-1])
+
+
+def agent_import_ms() -> float:
+    code = f"import json, time; t = time.perf_counter(); {IMPORT_AGENT}; print(json.dumps((time.perf_counter() - t) * 1000))"
+    return _timed_python(code, {"MCP_POOL": "0"})
+
+
+def first_tool_call(mode: str) -> dict:
+    return _timed_python(
+        f"import sys; sys.path.insert(0, {str(FOLDER)!r}); import startup_profile; startup_profile._child()",
+        {"MCP_MODE": mode, "MCP_POOL": "1" if mode == "remote" else "0"},
+    )
+
+
+def _child() -> None:
+    """Body of first_tool_call(), run in the fresh interpreter."""
+    start = time.perf_counter()
+    sys.path.insert(0, str(FOLDER.parent))
+    agent = importlib.import_module(FOLDER.name + ".agent")
+    imported = time.perf_counter()
+
+    async def first_call():
+        tools = {tool.name: tool for tool in await agent.root_agent.canonical_tools()}
+        listed = time.perf_counter()
+        await tools[FIRST_CALL[0]].run_async(args=FIRST_CALL[1], tool_context=None)
+        await agent.mcp_toolset.close()
+        return listed
+
+    listed = asyncio.run(first_call())
+    done = time.perf_counter()
+    if agent.mcp_servers is not None:
+        agent.mcp_servers.stop()
+    print(json.dumps({
+        "import_ms": (imported - start) * 1000,
+        "tools_ms": (listed - imported) * 1000,
+        "first_tool_call_ms": (done - start) * 1000,
+    }))
+
+
+def server_import_ms(project: str) -> float:
+    # imported here so that running the profile does not import the agent folder at module level
+    sys.path.insert(0, str(FOLDER))
+    import local_tools
+
+    module, _ = local_tools.MCP_TOOLS[project]
+    code = f"import json, time; t = time.perf_counter(); import {module}; print(json.dumps((time.perf_counter() - t) * 1000))"
+    return _timed_python(code, cwd=local_tools.project_dir(project))
+
+
+def _median(samples: list) -> float:
+    return round(statistics.median(samples), 1)
+
+
+def profile(runs: int = 3, modes: tuple = ("inprocess", "remote")) -> dict:
+    metrics = {"agent_import_ms": _median([agent_import_ms() for _ in range(runs)])}
+    for mode in modes:
+        calls = [first_tool_call(mode) for _ in range(runs)]
+        for key in ("import_ms", "tools_ms", "first_tool_call_ms"):
+            metrics[f"{mode}.{key}"] = _median([c[key] for c in calls])
+    for project in ("weather2mood", "budget"):
+        metrics[f"server.{project}.import_ms"] = _median([server_import_ms(project) for _ in range(runs)])
+    return {"metrics": metrics, "import_breakdown": import_breakdown()}
+
+
+def check(metrics: dict, budget: dict) -> list[str]:
+    """Metrics above their budget, as readable lines."""
+    return [
+        f"{name}: {metrics[name]:.1f} ms > budget {limit:.1f} ms"
+        for name, limit in budget.items()
+        if name in metrics and metrics[name] > limit
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters per metric")
+    parser.add_argument("--modes", default="inprocess,remote", help="MCP_MODE values to time")
+    parser.add_argument("--check", action="store_true", help="exit 1 when a metric is over budget")
+    parser.add_argument("--budget", default=str(BUDGET_PATH), help="JSON file of metric -> max ms")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+    if args.runs < 1:
+        parser.error("--runs must be at least 1")
+
+    report = profile(args.runs, tuple(m.strip() for m in args.modes.split(",") if m.strip()))
+    budget = json.loads(Path(args.budget).read_text(encoding="utf-8")) if Path(args.budget).exists() else {}
+    report["over_budget"] = check(report["metrics"], budget)
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        for name, ms in report["metrics"].items():
+            limit = budget.get(name)
+            print(f"{name:36} {ms:9.1f} ms" + (f"   (budget {limit:.0f})" if limit is not None else ""))
+        print(f"\nagent.py import, self time by package (total {report['import_breakdown']['total_ms']:.0f} ms):")
+        for name, ms in report["import_breakdown"]["top"].items():
+            print(f"  {name:40} {ms:8.1f} ms")
+        for line in report["over_budget"]:
+            print(f"OVER BUDGET  {line}")
+    if args.check and report["over_budget"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import asyncio
+import json
+import math
+from typing import AsyncGenerator
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.genai import types
+
+try:
+    from . import fast_router
+except ImportError:  # imported standalone (benchmarks, scripts)
+    import fast_router
+
+# -------------------------------------------------------------
+# 🧪 Deterministic stand-in model for offline runs
+# Behaves like a tiny tool-calling LLM without Ollama or Gemini:
+# - a time / weather question about one known place -> one call to
+#   get_current_time / get_weather (when the agent has that tool)
+# - after tool results -> a text answer built from their reports
+# - anything else -> a fixed echo reply
+# Token usage is estimated as ceil(characters / 4) so runs can be
+# compared, and `latency` adds a fixed delay per model call.
+# -------------------------------------------------------------
+
+CHARS_PER_TOKEN = 4
+
+_TOOL_FOR_INTENT = {"time": ("get_current_time", "tz_identifier"), "weather": ("get_weather", "city")}
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _request_text(llm_request: LlmRequest) -> str:
+    parts = [str(llm_request.config.system_instruction or "")] if llm_request.config else []
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            if part.text:
+                parts.append(part.text)
+            elif part.function_call:
+                parts.append(json.dumps(part.function_call.args or {}, ensure_ascii=False, sort_keys=True))
+            elif part.function_response:
+                parts.append(json.dumps(part.function_response.response or {}, ensure_ascii=False, sort_keys=True))
+    return "\n".join(parts)
+
+
+def _summary(response: dict) -> str:
+    return response.get("report") or response.get("error_message") or json.dumps(response, ensure_ascii=False)
+
+
+class StubLlm(BaseLlm):
+    model: str = "stub"
+    latency: float = 0.0
+    """Seconds to wait per call, to mimic a real model's response time."""
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        parts = self._reply(llm_request)
+        output = "".join(p.text or json.dumps(p.function_call.args, ensure_ascii=False) for p in parts)
+        prompt_tokens = estimate_tokens(_request_text(llm_request))
+        output_tokens = estimate_tokens(output)
+        yield LlmResponse(
+            content=types.Content(role="model", parts=parts),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=output_tokens,
+                total_token_count=prompt_tokens + output_tokens,
+            ),
+        )
+
+    def _reply(self, llm_request: LlmRequest) -> list[types.Part]:
+        last = llm_request.contents[-1] if llm_request.contents else None
+        responses = [p.function_response for p in (last.parts or []) if p.function_response] if last else []
+        if responses:
+            return [types.Part(text="\n".join(_summary(r.response or {}) for r in responses))]
+
+        text = fast_router.latest_user_text(llm_request) or ""
+        tool = _TOOL_FOR_INTENT.get(fast_router.intent_of(text))
+        place = fast_router.place_in(text) if tool else None
+        if place and tool[0] in llm_request.tools_dict:
+            name, arg = tool
+            value = fast_router.english_name(place) if name == "get_weather" else place
+            return [types.Part(function_call=types.FunctionCall(name=name, args={arg: value}))]
+        return [types.Part(text=f"（stub）收到：{text}")]
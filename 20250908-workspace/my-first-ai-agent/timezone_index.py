@@ -0,0 +1,271 @@
+import datetime
+import difflib
+import re
+from bisect import bisect_left
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError, available_timezones
+
+# -------------------------------------------------------------
+# 🕒 City / country -> IANA time zone index
+# Built once at import. Lookup order:
+#   1. exact IANA identifier (case-insensitive), e.g. "asia/taipei"
+#   2. fixed UTC / GMT offset ("UTC+8", "gmt-03:30"), as a fixed-offset zone
+#   3. exact city / country name, English or Traditional Chinese
+#   4. longest known name contained in the query ("台北市", "東京都"), as
+#      long as nothing but suffixes or names of the same zone is left over
+#      ("Paris, Texas" is not Paris)
+#   5. unique prefix ("los ang", "sing")
+#   6. fuzzy match for typos ("bankok", "londn"), when one zone clearly wins
+# Anything else is an error; suggestions() offers close names for it.
+# -------------------------------------------------------------
+
+# Curated names; every IANA zone in a geographic area also contributes its
+# own city name (e.g. "America/New_York" -> "new york") automatically.
+# Legacy links (US/*, Canada/*) and Etc/* are left out: "atlantic" is not
+# a city and Etc/GMT+8 is UTC-8 by POSIX convention.
+ALIASES = {
+    "Asia/Taipei": ["taipei", "taiwan", "台北", "臺北", "台灣", "臺灣", "新北", "桃園", "中壢",
+                    "kaohsiung", "高雄", "taichung", "台中", "臺中", "tainan", "台南", "臺南",
+                    "hsinchu", "新竹", "taoyuan"],
+    "Asia/Tokyo": ["tokyo", "japan", "東京", "日本", "osaka", "大阪", "kyoto", "京都",
+                   "sapporo", "札幌", "nagoya", "名古屋", "fukuoka", "福岡", "okinawa", "沖繩"],
+    "Asia/Seoul": ["seoul", "korea", "south korea", "首爾", "韓國", "南韓", "busan", "釜山",
+                   "incheon", "仁川"],
+    "Asia/Shanghai": ["china", "beijing", "shanghai", "中國", "北京", "上海", "廣州", "深圳"],
+    "Asia/Hong_Kong": ["hong kong", "香港"],
+    "Asia/Macau": ["macau", "macao", "澳門"],
+    "Asia/Bangkok": ["bangkok", "thailand", "曼谷", "泰國", "chiang mai", "清邁", "phuket", "普吉島"],
+    "Asia/Singapore": ["singapore", "新加坡"],
+    "Asia/Kuala_Lumpur": ["malaysia", "kuala lumpur", "馬來西亞", "吉隆坡"],
+    "Asia/Manila": ["philippines", "manila", "菲律賓", "馬尼拉"],
+    "Asia/Jakarta": ["indonesia", "jakarta", "印尼", "雅加達"],
+    "Asia/Makassar": ["bali", "峇里島"],
+    "Asia/Ho_Chi_Minh": ["vietnam", "hanoi", "ho chi minh city", "saigon", "越南", "河內", "胡志明市"],
+    "Asia/Phnom_Penh": ["cambodia", "phnom penh", "柬埔寨", "金邊"],
+    "Asia/Yangon": ["myanmar", "burma", "yangon", "緬甸", "仰光"],
+    "Asia/Kolkata": ["india", "new delhi", "delhi", "mumbai", "印度", "新德里", "孟買"],
+    "Asia/Dubai": ["dubai", "uae", "united arab emirates", "杜拜", "阿聯"],
+    "Europe/London": ["london", "uk", "united kingdom", "england", "英國", "倫敦"],
+    "Europe/Paris": ["paris", "france", "法國", "巴黎"],
+    "Europe/Berlin": ["berlin", "germany", "德國", "柏林", "munich", "慕尼黑"],
+    "Europe/Rome": ["rome", "italy", "義大利", "羅馬", "milan", "米蘭"],
+    "Europe/Madrid": ["madrid", "spain", "西班牙", "馬德里", "barcelona", "巴塞隆納"],
+    "Europe/Amsterdam": ["amsterdam", "netherlands", "荷蘭", "阿姆斯特丹"],
+    "Europe/Zurich": ["zurich", "switzerland", "瑞士", "蘇黎世"],
+    "Europe/Istanbul": ["istanbul", "turkey", "土耳其", "伊斯坦堡"],
+    "Europe/Moscow": ["moscow", "russia", "俄羅斯", "莫斯科"],
+    "America/New_York": ["new york", "nyc", "usa", "united states", "america", "美國", "紐約",
+                         "boston", "波士頓", "washington", "華盛頓"],
+    "America/Chicago": ["chicago", "芝加哥"],
+    "America/Los_Angeles": ["los angeles", "la", "洛杉磯", "san francisco", "舊金山",
+                            "seattle", "西雅圖", "las vegas", "拉斯維加斯"],
+    "America/Toronto": ["toronto", "canada", "加拿大", "多倫多"],
+    "America/Vancouver": ["vancouver", "溫哥華"],
+    "America/Mexico_City": ["mexico", "mexico city", "墨西哥"],
+    "America/Sao_Paulo": ["brazil", "sao paulo", "巴西", "聖保羅"],
+    "Pacific/Honolulu": ["hawaii", "honolulu", "夏威夷", "檀香山"],
+    "Australia/Sydney": ["sydney", "australia", "澳洲", "雪梨", "悉尼"],
+    "Australia/Melbourne": ["melbourne", "墨爾本"],
+    "Australia/Brisbane": ["brisbane", "布里斯本"],
+    "Pacific/Auckland": ["auckland", "new zealand", "紐西蘭", "奧克蘭"],
+    "Africa/Cairo": ["cairo", "egypt", "埃及", "開羅"],
+    "UTC": ["utc", "gmt", "格林威治"],
+}
+
+_AREAS = {"Africa", "America", "Antarctica", "Arctic", "Asia", "Atlantic", "Australia", "Europe", "Indian",
+          "Pacific"}
+
+# Minimum similarity for the fuzzy step (difflib ratio); a one-letter slip in a
+# six-letter name still passes, while a different eight-letter word does not.
+FUZZY_CUTOFF = 0.88
+# The runner-up (another zone) must trail the best match by at least this much.
+FUZZY_MARGIN = 0.05
+
+# Words that may surround a place name without making it a different place.
+_FILLER_WORDS = {"city", "the", "of", "in", "at", "time", "now", "current", "local", "downtown"}
+_FILLER_CJK = ("現在", "目前", "當地", "時間", "幾點", "的")
+_SUFFIX_CHARS = set("市縣县都府道區区省州")
+
+_NON_WORD = re.compile(r"[^\w]+")
+_OFFSET = re.compile(r"^(?:utc|gmt)\s*([+\-\u2212])\s*(\d{1,2})(?::?(\d{2}))?$")
+_OFFSET_NAME = re.compile(r"^UTC([+-])(\d{2}):(\d{2})$")
+
+
+def _normalize(name: str) -> str:
+    return " ".join(name.replace("_", " ").split()).casefold()
+
+
+def _build_index() -> tuple[dict[str, str], dict[str, str]]:
+    zones = available_timezones()
+    by_id = {z.casefold(): z for z in zones}
+    by_name: dict[str, str] = {}
+    # IANA city names first, curated aliases override them
+    for zone in sorted(zones):
+        if "/" in zone and zone.split("/", 1)[0] in _AREAS:
+            city = _normalize(zone.rsplit("/", 1)[1])
+            by_name.setdefault(city, zone)
+    for zone, names in ALIASES.items():
+        if zone not in zones and zone != "UTC":
+            continue
+        for name in names:
+            by_name[_normalize(name)] = zone
+    return by_id, by_name
+
+
+_BY_ID, _BY_NAME = _build_index()
+_NAMES_BY_LENGTH = sorted(_BY_NAME, key=len, reverse=True)
+_SORTED_NAMES = sorted(_BY_NAME)
+
+# fuzzy candidates bucketed by first character (typos rarely hit the first letter)
+_FUZZY_BUCKETS: dict[str, list[str]] = {}
+for _name in _SORTED_NAMES:
+    _FUZZY_BUCKETS.setdefault(_name[0], []).append(_name)
+
+
+def resolve(query: str) -> str | None:
+    """Resolves a city, country or IANA identifier to an IANA time zone name.
+
+    Returns None when nothing matches with enough confidence.
+    """
+    q = _normalize(query)
+    if not q:
+        return None
+
+    raw = query.strip().casefold()
+    if raw in _BY_ID:
+        return _BY_ID[raw]
+    if raw.startswith(("utc", "gmt")) and raw not in ("utc", "gmt"):
+        # "UTC+8" is never a place; an offset that does not parse is an error, not UTC
+        return _offset_name(raw)
+    if q in _BY_NAME:
+        return _BY_NAME[q]
+
+    # longest contained name: "台北市" -> "台北", "tokyo, japan" -> "tokyo"
+    # (Latin names must match whole words, so "indiana" is not "india")
+    words = " " + _NON_WORD.sub(" ", q) + " "
+    for name in _NAMES_BY_LENGTH:
+        if name.isascii():
+            if f" {name} " in words:
+                rest = words.replace(f" {name} ", " ")
+                return _BY_NAME[name] if _only_same_place(rest, _BY_NAME[name]) else None
+        elif name in q:
+            return _BY_NAME[name] if _only_same_place(q.replace(name, " "), _BY_NAME[name]) else None
+
+    # unique prefix: every name starting with the query points to one zone
+    zones = {_BY_NAME[n] for n in _prefixed(q)}
+    if len(zones) == 1:
+        return zones.pop()
+
+    zone = _fuzzy(q)
+    if zone is not None:
+        return zone
+
+    # "Europe/Londn": retry with the city part of an identifier-like query
+    if "/" in q:
+        return resolve(q.rsplit("/", 1)[1])
+    return None
+
+
+def _offset_name(raw: str) -> str | None:
+    """"utc+8" -> "UTC+08:00"; None when it is not a valid offset."""
+    m = _OFFSET.match(raw.replace(" ", ""))
+    if not m:
+        return None
+    hours, minutes = int(m.group(2)), int(m.group(3) or 0)
+    if hours > 14 or minutes >= 60 or hours == 14 and minutes:
+        return None
+    return f"UTC{'-' if m.group(1) != '+' else '+'}{hours:02d}:{minutes:02d}"
+
+
+def _only_same_place(rest: str, zone: str) -> bool:
+    """True when what is left besides the matched name is filler, a suffix or another name of zone."""
+    for token in _NON_WORD.sub(" ", rest).split():
+        if token in _FILLER_WORDS or _BY_NAME.get(token) == zone:
+            continue
+        if not token.isascii() and (set(token) <= _SUFFIX_CHARS or _cjk_names_only(token, zone)):
+            continue
+        return False
+    return True
+
+
+def _cjk_names_only(token: str, zone: str) -> bool:
+    # "日本東京" leaves "東京" after "日本"; suffix characters may follow ("東京都")
+    for word in _FILLER_CJK:
+        token = token.replace(word, "")
+    for name in _NAMES_BY_LENGTH:
+        if not name.isascii() and name in token and _BY_NAME[name] == zone:
+            token = token.replace(name, "")
+    return set(token) <= _SUFFIX_CHARS
+
+
+def _fuzzy(q: str) -> str | None:
+    close = difflib.get_close_matches(q, _FUZZY_BUCKETS.get(q[0], []), n=5, cutoff=FUZZY_CUTOFF - FUZZY_MARGIN)
+    if not close:
+        return None
+    scored = [(difflib.SequenceMatcher(None, q, name).ratio(), name) for name in close]
+    best_score, best = scored[0]
+    if best_score < FUZZY_CUTOFF:
+        return None
+    zone = _BY_NAME[best]
+    # another zone about as close means the typo is ambiguous
+    if any(_BY_NAME[name] != zone and best_score - score < FUZZY_MARGIN for score, name in scored[1:]):
+        return None
+    return zone
+
+
+def suggestions(query: str, n: int = 3) -> list[str]:
+    """Close or contained place names for an unresolved query, as "name (Zone/Id)"."""
+    q = _normalize(query)
+    if not q:
+        return []
+    words = " " + _NON_WORD.sub(" ", q) + " "
+    contained = [
+        name for name in _NAMES_BY_LENGTH
+        if (f" {name} " in words if name.isascii() else name in q)
+    ]
+    names = dict.fromkeys([*contained, *difflib.get_close_matches(q, _SORTED_NAMES, n=n, cutoff=0.6)])
+    return [f"{name} ({_BY_NAME[name]})" for name in list(names)[:n]]
+
+
+def resolve_exact(query: str) -> str | None:
+    """Like resolve(), but only an exact identifier or place name counts (no containment, prefix or fuzzy)."""
+    raw = query.strip().casefold()
+    return _BY_ID.get(raw) or _BY_NAME.get(_normalize(query))
+
+
+def _prefixed(prefix: str) -> list[str]:
+    i = bisect_left(_SORTED_NAMES, prefix)
+    out = []
+    while i < len(_SORTED_NAMES) and _SORTED_NAMES[i].startswith(prefix):
+        out.append(_SORTED_NAMES[i])
+        i += 1
+    return out
+
+
+@lru_cache(maxsize=None)
+def get_zone(zone_name: str) -> datetime.tzinfo:
+    """ZoneInfo for an IANA name; a fixed-offset timezone for "UTC+08:00"-style names."""
+    m = _OFFSET_NAME.match(zone_name)
+    if m:
+        offset = datetime.timedelta(hours=int(m.group(2)), minutes=int(m.group(3)))
+        return datetime.timezone(-offset if m.group(1) == "-" else offset, zone_name)
+    return ZoneInfo(zone_name)
+
+
+def zone_label(tz: datetime.tzinfo) -> str:
+    """The name a get_zone() result was built from ("Asia/Taipei", "UTC+08:00")."""
+    return getattr(tz, "key", None) or tz.tzname(None)
+
+
+def lookup_zone(query: str) -> datetime.tzinfo:
+    """Resolves the query and returns a cached ZoneInfo (or fixed-offset timezone).
+
+    Raises:
+        ZoneInfoNotFoundError: Nothing matched the query; the message lists close names.
+    """
+    zone_name = resolve(query)
+    if zone_name is None:
+        close = suggestions(query)
+        hint = f" Did you mean: {', '.join(close)}?" if close else ""
+        raise ZoneInfoNotFoundError(f"No time zone found for '{query}'.{hint}")
+    return get_zone(zone_name)
@@ -0,0 +1,338 @@
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from . import resilience, weather_store
+except ImportError:  # imported as a top-level module (python weather_prefetch.py)
+    import resilience
+    import weather_store
+
+# -------------------------------------------------------------
+# 🌦️ Shared OpenWeatherMap client
+# - one pooled requests.Session (keep-alive) for every tool call
+# - in-process TTL cache keyed by normalized city name
+# - stale-while-revalidate: a stale entry is returned immediately
+#   while a background refresh fetches the new value
+# - optional shared SQLite store (weather_store.py): entries fetched
+#   by another process (e.g. the hot-city prefetcher) are reused
+# - resilience: overall deadline per lookup, bounded retries with
+#   jittered backoff, optional hedged request once the first one is
+#   slower than the observed p95, and a circuit breaker that fails
+#   fast (serving any cached copy) while the API is unhealthy
+# -------------------------------------------------------------
+
+DEFAULT_BASE_URL = "http://api.openweathermap.org/data/2.5"
+
+
+class WeatherLookupError(Exception):
+    """Raised when OpenWeatherMap answers but has no data for the city."""
+
+
+class WeatherUnavailableError(requests.exceptions.RequestException):
+    """Raised without calling the API while the circuit breaker is open."""
+
+
+# failures worth retrying and counting against the circuit breaker
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def normalize_city(city: str) -> str:
+    return " ".join(city.split()).casefold()
+
+
+class WeatherClient:
+    def __init__(
+        self,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        ttl: float = 600.0,
+        stale_ttl: float = 3600.0,
+        timeout: float = 5.0,
+        pool_size: int = 10,
+        store: "weather_store.WeatherStore | None" = None,
+        deadline: float = 8.0,
+        retries: int = 2,
+        hedge: bool = False,
+        hedge_after: float = 1.0,
+        breaker: "resilience.CircuitBreaker | None" = None,
+    ):
+        """
+        Args:
+            api_key: OpenWeatherMap key; defaults to OPEN_WEATHER_MAP_API_KEY.
+            base_url: API root; defaults to OPEN_WEATHER_MAP_BASE_URL or the public API.
+                Point it at a local stand-in server (see weather_stub.py) for testing.
+            ttl: Seconds an entry is served without revalidation.
+            stale_ttl: Extra seconds a stale entry may be served while refreshing.
+            timeout: Per-request timeout in seconds.
+            pool_size: Max keep-alive connections kept in the session pool.
+            store: Shared on-disk store read on a memory miss and written after every fetch.
+            deadline: Upper bound in seconds for one fetch, retries and hedges included.
+            retries: Extra attempts after a timeout, connection error, 429 or 5xx.
+            hedge: Send a second request when the first is slower than the observed p95.
+            hedge_after: Hedge delay in seconds until enough latencies are recorded.
+            breaker: Circuit breaker; defaults to 5 consecutive failures / 30 s cooldown.
+        """
+        self.api_key = api_key
+        self.base_url = (base_url or os.getenv("OPEN_WEATHER_MAP_BASE_URL", DEFAULT_BASE_URL)).rstrip("/")
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.timeout = timeout
+        self.store = store
+        self.deadline = deadline
+        self.retries = retries
+        self.hedge = hedge
+        self.hedge_after = hedge_after
+        self.breaker = breaker or resilience.CircuitBreaker()
+        self.latency = resilience.LatencyTracker()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._cache: dict[str, tuple[dict, float]] = {}
+        self._lock = threading.Lock()
+        self._refreshing: set[str] = set()
+        self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="weather-refresh")
+        self._fetchers = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="weather-fetch")
+        # separate pool: hedged attempts must not queue behind get_many's lookups
+        self._attempts = ThreadPoolExecutor(max_workers=pool_size * 2, thread_name_prefix="weather-attempt")
+
+    def get(self, city: str) -> dict:
+        """Returns the OpenWeatherMap 'weather' payload for a city, using the cache when possible.
+
+        Raises:
+            WeatherLookupError: The API answered but has no data for the city.
+            requests.exceptions.RequestException: Network or HTTP failure.
+        """
+        key = normalize_city(city)
+        entry = self._lookup(key)
+        if entry is not None:
+            data, age = entry
+            if age < self.ttl:
+                return data
+            if age < self.ttl + self.stale_ttl:
+                self._schedule_refresh(key, city)
+                return data
+        try:
+            return self._fetch_and_store(key, city)
+        except requests.exceptions.RequestException:
+            # upstream down or open circuit: an old answer beats no answer
+            if entry is not None:
+                return entry[0]
+            raise
+
+    def refresh(self, city: str) -> dict:
+        """Fetches a city now and updates the memory cache and the shared store."""
+        return self._fetch_and_store(normalize_city(city), city)
+
+    def get_many(self, cities: list[str], deadline: float = 10.0) -> dict[str, dict | Exception]:
+        """Looks up several cities concurrently on a bounded thread pool.
+
+        Duplicate spellings of the same city share one lookup. Cities not
+        answered within `deadline` seconds get a TimeoutError; their fetch
+        keeps running and still fills the cache for the next call.
+
+        Returns:
+            dict: city (as given) -> weather payload or the exception raised.
+        """
+        futures = {}
+        by_key = {}
+        for city in cities:
+            key = normalize_city(city)
+            if key not in by_key:
+                by_key[key] = self._fetchers.submit(self.get, city)
+            futures[city] = by_key[key]
+
+        wait(set(by_key.values()), timeout=deadline)
+
+        results: dict[str, dict | Exception] = {}
+        for city, future in futures.items():
+            if not future.done():
+                results[city] = TimeoutError(f"No answer within {deadline:g} seconds.")
+            elif future.exception() is not None:
+                results[city] = future.exception()
+            else:
+                results[city] = future.result()
+        return results
+
+    def fetch(self, city: str) -> dict:
+        """Always calls the API (no cache read); raises like get().
+
+        Retries timeouts, connection errors, 429 and 5xx with jittered backoff
+        until `deadline` runs out. Raises WeatherUnavailableError without a
+        request while the circuit breaker is open.
+        """
+        if not self.breaker.allow():
+            raise WeatherUnavailableError(
+                f"Weather service unavailable; retrying in {self.breaker.retry_in():.0f} seconds."
+            )
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            try:
+                data = self._attempt(city, deadline)
+            except WeatherLookupError:
+                self.breaker.record_success()  # the API is healthy, the city is unknown
+                raise
+            except requests.exceptions.RequestException as e:
+                if not _is_retryable(e):
+                    self.breaker.record_success()
+                    raise
+                delay = resilience.backoff_delay(attempt)
+                if attempt >= self.retries or time.monotonic() + delay >= deadline:
+                    self.breaker.record_failure()
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            except Exception:
+                self.breaker.record_failure()  # e.g. a garbled body; also ends a half-open probe
+                raise
+            self.breaker.record_success()
+            return data
+
+    def stats(self) -> dict:
+        p95 = self.latency.percentile(95)
+        return {
+            "cached_cities": len(self._cache),
+            "p95_latency_ms": None if p95 is None else round(p95 * 1000, 1),
+            **self.breaker.stats(),
+        }
+
+    def _attempt(self, city: str, deadline: float) -> dict:
+        # one attempt, optionally hedged: if the first request is still running
+        # after the p95 latency, a second identical request races it
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise requests.exceptions.Timeout(f"Deadline of {self.deadline:g} seconds exceeded.")
+        if not self.hedge:
+            return self._request(city, min(self.timeout, remaining))
+
+        timeout = min(self.timeout, remaining)
+        pending = {self._attempts.submit(self._request, city, timeout)}
+        hedge_after = self.latency.percentile(95) or self.hedge_after
+        done, _ = wait(pending, timeout=min(hedge_after, remaining))
+        if not done:
+            pending.add(self._attempts.submit(self._request, city, min(self.timeout, deadline - time.monotonic())))
+
+        error: Exception | None = None
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        if error is not None and not pending:
+            raise error
+        raise requests.exceptions.Timeout(f"Deadline of {self.deadline:g} seconds exceeded.")
+
+    def _request(self, city: str, timeout: float) -> dict:
+        api_key = self.api_key or os.getenv("OPEN_WEATHER_MAP_API_KEY")
+        start = time.monotonic()
+        response = self.session.get(
+            f"{self.base_url}/weather",
+            params={"q": city, "appid": api_key, "units": "metric"},
+            timeout=timeout,
+        )
+        self.latency.record(time.monotonic() - start)
+        if response.status_code == 404:
+            raise WeatherLookupError(f"Weather information for '{city}' is not available.")
+        response.raise_for_status()
+        data = response.json()
+        if data.get("cod") != 200:
+            raise WeatherLookupError(f"Weather information for '{city}' is not available.")
+        return data
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def _lookup(self, key: str) -> tuple[dict, float] | None:
+        # (payload, age in seconds) from memory, or from the shared store
+        # when that copy is newer than ours
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(key)
+        age = now - entry[1] if entry is not None else None
+        if (age is None or age >= self.ttl) and self.store is not None:
+            try:
+                stored = self.store.get(key)
+            except sqlite3.Error:
+                stored = None
+            if stored is not None:
+                stored_age = max(0.0, time.time() - stored[1])
+                if age is None or stored_age < age:
+                    with self._lock:
+                        self._cache[key] = (stored[0], now - stored_age)
+                    return stored[0], stored_age
+        return None if entry is None else (entry[0], age)
+
+    def _fetch_and_store(self, key: str, city: str) -> dict:
+        data = self.fetch(city)
+        with self._lock:
+            self._cache[key] = (data, time.monotonic())
+        if self.store is not None:
+            try:
+                self.store.put(key, city, data)
+            except sqlite3.Error:
+                pass  # the store is a shared cache; a busy or read-only file must not fail the lookup
+        return data
+
+    def _schedule_refresh(self, key: str, city: str) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        self._refresher.submit(self._refresh, key, city)
+
+    def _refresh(self, key: str, city: str) -> None:
+        try:
+            self._fetch_and_store(key, city)
+        except (requests.exceptions.RequestException, WeatherLookupError, ValueError):
+            # keep serving the stale entry; the next call retries
+            pass
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+
+def _is_retryable(error: requests.exceptions.RequestException) -> bool:
+    if isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+        return True
+    response = getattr(error, "response", None)
+    return response is not None and response.status_code in _RETRYABLE_STATUS
+
+
+_client: WeatherClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> WeatherClient:
+    """Process-wide shared client (created on first use)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = WeatherClient(
+                    ttl=float(os.getenv("WEATHER_CACHE_TTL", "600")),
+                    stale_ttl=float(os.getenv("WEATHER_STALE_TTL", "3600")),
+                    timeout=float(os.getenv("WEATHER_TIMEOUT", "5")),
+                    store=weather_store.open_from_env(),
+                    deadline=float(os.getenv("WEATHER_DEADLINE", "8")),
+                    retries=int(os.getenv("WEATHER_RETRIES", "2")),
+                    hedge=os.getenv("WEATHER_HEDGE", "0") == "1",
+                    breaker=resilience.CircuitBreaker(
+                        failure_threshold=int(os.getenv("WEATHER_BREAKER_THRESHOLD", "5")),
+                        cooldown=float(os.getenv("WEATHER_BREAKER_COOLDOWN", "30")),
+                    ),
+                )
+    return _client
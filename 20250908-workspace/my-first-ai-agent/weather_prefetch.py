@@ -0,0 +1,183 @@
+import argparse
+import heapq
+import os
+import random
+import re
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+try:
+    from . import weather_client
+except ImportError:  # run as a script: python weather_prefetch.py
+    import weather_client
+
+# -------------------------------------------------------------
+# 🔥 Hot-city weather prefetcher
+# Refreshes a fixed list of frequently asked cities in the background
+# so get_weather never waits on the network for them:
+# - every city is refetched a little before its cache entry expires,
+#   with random jitter so refreshes do not line up
+# - calls are spaced to stay under the OpenWeatherMap rate limit
+# - results land in the client's memory cache and the shared SQLite
+#   store, so other processes reading the store see them too
+#
+# In the agent process: set WEATHER_HOT_CITIES="Taipei,Tokyo" or
+# WEATHER_HOT_CITIES_FILE=city.txt. As a standalone daemon:
+#
+#   python weather_prefetch.py --file ../../test_file_share_20250922/city.txt
+# -------------------------------------------------------------
+
+# OpenWeatherMap free tier allows 60 calls/minute; keep some headroom
+DEFAULT_RATE_PER_MINUTE = 50
+# Delay before retrying a city whose refresh failed
+RETRY_DELAY = 30.0
+
+_PARENS = re.compile(r"\(([^)]+)\)")
+_NUMBERING = re.compile(r"^\s*\d+[.)、]\s*")
+
+
+def parse_city_file(path: str | Path) -> list[str]:
+    """Reads one city per line; `city.txt`-style lines keep the English name.
+
+    "1. 台北 (Taipei) - 天氣: ..." -> "Taipei"
+    """
+    cities = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        line = _NUMBERING.sub("", line).split(" - ", 1)[0].strip()
+        if not line or line.startswith("#"):
+            continue
+        match = _PARENS.search(line)
+        cities.append(match.group(1).strip() if match else line)
+    return list(dict.fromkeys(cities))
+
+
+def hot_cities_from_env() -> list[str]:
+    cities = [c.strip() for c in os.getenv("WEATHER_HOT_CITIES", "").split(",") if c.strip()]
+    path = os.getenv("WEATHER_HOT_CITIES_FILE")
+    if path:
+        cities += parse_city_file(path)
+    return list(dict.fromkeys(cities))
+
+
+class Prefetcher:
+    def __init__(
+        self,
+        client: weather_client.WeatherClient,
+        cities: list[str],
+        interval: float | None = None,
+        rate_per_minute: float = DEFAULT_RATE_PER_MINUTE,
+        jitter: float = 0.1,
+    ):
+        """
+        Args:
+            client: Client whose cache (and store) the refreshes fill.
+            cities: Hot cities, English names as sent to the API.
+            interval: Seconds between refreshes of one city; defaults to 80% of the
+                client's TTL so an entry is renewed before it turns stale.
+            rate_per_minute: Upper bound on API calls made by the prefetcher.
+            jitter: Relative spread applied to every interval (0.1 = ±10%).
+        """
+        self.client = client
+        self.cities = list(dict.fromkeys(cities))
+        self.min_spacing = 60.0 / rate_per_minute
+        # cannot refresh every city more often than the rate limit allows
+        self.interval = max(interval or client.ttl * 0.8, self.min_spacing * len(self.cities))
+        self.jitter = jitter
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._status: dict[str, dict] = {c: {"refreshes": 0, "failures": 0, "last_error": None} for c in self.cities}
+
+    def start(self) -> "Prefetcher":
+        if self._thread is None and self.cities:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name="weather-prefetch", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def status(self) -> dict:
+        return {"interval_seconds": round(self.interval, 1), "cities": {c: dict(s) for c, s in self._status.items()}}
+
+    def run(self) -> None:
+        """Refresh loop; returns when stop() is called."""
+        now = time.monotonic()
+        # first pass spread over one spacing slot per city instead of a burst
+        queue = [(now + i * self.min_spacing, city) for i, city in enumerate(self.cities)]
+        heapq.heapify(queue)
+        last_call = -self.min_spacing
+        while queue:
+            due, city = queue[0]
+            start_at = max(due, last_call + self.min_spacing)
+            if self._stop.wait(max(0.0, start_at - time.monotonic())):
+                return
+            heapq.heappop(queue)
+            last_call = time.monotonic()
+            heapq.heappush(queue, (last_call + self._next_delay(self._refresh(city)), city))
+
+    def _refresh(self, city: str) -> bool:
+        status = self._status[city]
+        try:
+            self.client.refresh(city)
+        except (requests.exceptions.RequestException, weather_client.WeatherLookupError, ValueError) as e:
+            status["failures"] += 1
+            # the exception text contains the request URL, which includes the API key
+            status["last_error"] = type(e).__name__
+            return False
+        status["refreshes"] += 1
+        status["last_error"] = None
+        status["last_refresh"] = time.time()
+        return True
+
+    def _next_delay(self, ok: bool) -> float:
+        base = self.interval if ok else min(self.interval, RETRY_DELAY)
+        return base * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+_prefetcher: Prefetcher | None = None
+
+
+def start_from_env() -> Prefetcher | None:
+    """Starts the process-wide prefetcher when hot cities are configured."""
+    global _prefetcher
+    cities = hot_cities_from_env()
+    if _prefetcher is None and cities:
+        _prefetcher = Prefetcher(
+            weather_client.get_client(),
+            cities,
+            rate_per_minute=float(os.getenv("WEATHER_RATE_LIMIT", str(DEFAULT_RATE_PER_MINUTE))),
+        ).start()
+    return _prefetcher
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep hot cities' weather warm in the shared store.")
+    parser.add_argument("cities", nargs="*", help="city names (English)")
+    parser.add_argument("--file", help="city list, one per line (city.txt format accepted)")
+    parser.add_argument("--interval", type=float, help="seconds between refreshes of one city")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE_PER_MINUTE, help="max API calls per minute")
+    args = parser.parse_args()
+
+    cities = list(args.cities) + (parse_city_file(args.file) if args.file else []) or hot_cities_from_env()
+    if not cities:
+        parser.error("no cities given")
+    client = weather_client.get_client()
+    if client.store is None:
+        parser.error("WEATHER_STORE_PATH is empty; other processes could not see the results")
+    prefetcher = Prefetcher(client, cities, interval=args.interval, rate_per_minute=args.rate)
+    print(f"prefetching {len(prefetcher.cities)} cities every ~{prefetcher.interval:.0f}s into {client.store.path}")
+    try:
+        prefetcher.run()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
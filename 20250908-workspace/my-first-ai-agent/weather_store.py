@@ -0,0 +1,79 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# -------------------------------------------------------------
+# 🗄️ Shared on-disk weather store (SQLite)
+# One row per normalized city name with the raw OpenWeatherMap payload
+# and the wall-clock time it was fetched. WAL mode lets the agent, the
+# prefetcher and any MCP server read while another process writes.
+# Standard library only, so other projects can copy or import it as is.
+# -------------------------------------------------------------
+
+DEFAULT_PATH = Path(__file__).resolve().parent / ".weather_store.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS weather (
+    key        TEXT PRIMARY KEY,
+    city       TEXT NOT NULL,
+    payload    TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+)
+"""
+
+
+class WeatherStore:
+    def __init__(self, path: str | Path = DEFAULT_PATH, busy_timeout: float = 2.0):
+        """
+        Args:
+            path: SQLite file shared by every process that reads or writes weather.
+            busy_timeout: Seconds to wait for another process's write lock.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=busy_timeout, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def get(self, key: str) -> tuple[dict, float] | None:
+        """Returns (payload, fetched_at as a Unix timestamp) or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, fetched_at FROM weather WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def put(self, key: str, city: str, payload: dict, fetched_at: float | None = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO weather (key, city, payload, fetched_at) VALUES (?, ?, ?, ?)",
+                (key, city, json.dumps(payload, ensure_ascii=False), fetched_at or time.time()),
+            )
+            self._conn.commit()
+
+    def entries(self) -> list[dict]:
+        """All stored cities with their age in seconds (newest first)."""
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, city, fetched_at FROM weather ORDER BY fetched_at DESC"
+            ).fetchall()
+        return [{"key": k, "city": c, "age_seconds": round(now - t, 1)} for k, c, t in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def open_from_env() -> WeatherStore | None:
+    """Store at WEATHER_STORE_PATH (default next to this file); an empty value disables it."""
+    path = os.getenv("WEATHER_STORE_PATH", str(DEFAULT_PATH))
+    return WeatherStore(path) if path else None
@@ -0,0 +1,199 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# -------------------------------------------------------------
+# 🧪 Local OpenWeatherMap stand-in
+# Serves /data/2.5/weather with canned data so the weather client
+# can be exercised without network access or an API key:
+#
+#   python weather_stub.py 8765
+#   OPEN_WEATHER_MAP_BASE_URL=http://127.0.0.1:8765/data/2.5 adk web
+#
+# FaultyWeatherServer adds injected errors, delays and dropped
+# connections (python weather_stub.py 8765 --error-rate 0.3).
+# -------------------------------------------------------------
+
+SAMPLE_WEATHER = {
+    "taipei": ("overcast clouds", 29.02),
+    "tokyo": ("overcast clouds", 25.28),
+    "bangkok": ("few clouds", 32.08),
+    "new york": ("overcast clouds", 13.24),
+}
+
+
+class StubWeatherServer:
+    """Threaded HTTP server answering OpenWeatherMap-style requests.
+
+    Usable as a context manager; `base_url` points at the /data/2.5 root
+    and `request_count` counts the weather requests served.
+    """
+
+    def __init__(self, weather: dict | None = None, host: str = "127.0.0.1", port: int = 0):
+        self.weather = dict(weather or SAMPLE_WEATHER)
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/data/2.5"
+
+    def start(self) -> "StubWeatherServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def respond(self, handler: BaseHTTPRequestHandler, city: str) -> None:
+        entry = self.weather.get(" ".join(city.split()).casefold())
+        if entry is None:
+            self.send_json(handler, 404, {"cod": "404", "message": "city not found"})
+            return
+        description, temperature = entry
+        self.send_json(handler, 200, {
+            "cod": 200,
+            "name": city,
+            "weather": [{"main": description.split()[-1].title(), "description": description}],
+            "main": {"temp": temperature},
+        })
+
+    @staticmethod
+    def send_json(handler: BaseHTTPRequestHandler, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+            # headers and body go out as two writes; with Nagle on, the body waits
+            # for the client's delayed ACK and every response takes ~40 ms
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path.rstrip("/") != "/data/2.5/weather":
+                    stub.send_json(self, 404, {"cod": "404", "message": "not found"})
+                    return
+                with stub._count_lock:
+                    stub.request_count += 1
+                city = parse_qs(url.query).get("q", [""])[0]
+                stub.respond(self, city)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class FaultyWeatherServer(StubWeatherServer):
+    """Stub that injects upstream faults for resilience testing.
+
+    Each request draws one action: "ok", "slow" (answer after `delay`
+    seconds), "error" (HTTP `error_status`) or "drop" (close the
+    connection without answering). `script` fixes the next actions in
+    order; after it runs out the rates apply. Set `down = True` to fail
+    every request with `error_status`.
+    """
+
+    def __init__(
+        self,
+        weather: dict | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        delay: float = 0.0,
+        delay_rate: float = 0.0,
+        drop_rate: float = 0.0,
+        script: list[str] | None = None,
+        seed: int | None = None,
+    ):
+        super().__init__(weather, host, port)
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.delay = delay
+        self.delay_rate = delay_rate
+        self.drop_rate = drop_rate
+        self.script = list(script or [])
+        self.down = False
+        self.actions: list[str] = []
+        self._rng = random.Random(seed)
+        self._action_lock = threading.Lock()
+
+    def next_action(self) -> str:
+        with self._action_lock:
+            if self.down:
+                action = "error"
+            elif self.script:
+                action = self.script.pop(0)
+            else:
+                r = self._rng.random()
+                if r < self.error_rate:
+                    action = "error"
+                elif r < self.error_rate + self.drop_rate:
+                    action = "drop"
+                elif r < self.error_rate + self.drop_rate + self.delay_rate:
+                    action = "slow"
+                else:
+                    action = "ok"
+            self.actions.append(action)
+        return action
+
+    def respond(self, handler: BaseHTTPRequestHandler, city: str) -> None:
+        action = self.next_action()
+        if action == "error":
+            self.send_json(handler, self.error_status, {"cod": str(self.error_status), "message": "injected fault"})
+        elif action == "drop":
+            handler.close_connection = True
+        else:
+            if action == "slow":
+                time.sleep(self.delay)
+            super().respond(handler, city)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local OpenWeatherMap stand-in.")
+    parser.add_argument("port", nargs="?", type=int, default=8765)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with --error-status")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds a slow answer takes")
+    parser.add_argument("--delay-rate", type=float, default=0.0, help="share of slow answers")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="share of connections closed without answer")
+    args = parser.parse_args()
+
+    if args.error_rate or args.delay_rate or args.drop_rate:
+        server = FaultyWeatherServer(
+            port=args.port, error_rate=args.error_rate, error_status=args.error_status,
+            delay=args.delay, delay_rate=args.delay_rate, drop_rate=args.drop_rate,
+        )
+    else:
+        server = StubWeatherServer(port=args.port)
+    print(f"Stub OpenWeatherMap listening on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
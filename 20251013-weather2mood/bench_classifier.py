@@ -0,0 +1,97 @@
+"""
+天氣分類器 benchmark：舊版（每次呼叫重建 dict + 線性子字串掃描）vs Aho-Corasick。
+
+    python bench_classifier.py [--repeat 20000]
+"""
+import argparse
+import time
+
+import weather_classifier
+
+# 標註好的樣本：(輸入, 正確的標準 key)
+SAMPLES = [
+    ("晴", "clear"),
+    ("晴天", "clear"),
+    ("clear sky", "clear"),
+    ("多雲", "partly cloudy"),
+    ("晴時多雲", "partly cloudy"),
+    ("few clouds", "partly cloudy"),
+    ("scattered clouds", "partly cloudy"),
+    ("partly cloudy", "partly cloudy"),
+    ("陰天", "cloudy"),
+    ("broken clouds", "cloudy"),
+    ("小雨", "rain"),
+    ("陣雨", "rain"),
+    ("light rain", "rain"),
+    ("shower rain", "rain"),
+    ("雷雨", "thunderstorm"),
+    ("雷陣雨", "thunderstorm"),
+    ("thunderstorm with light rain", "thunderstorm"),
+    ("大雪", "snow"),
+    ("light snow", "snow"),
+    ("濃霧", "fog"),
+    ("haze", "fog"),
+    ("mist", "fog"),
+    ("陰雲密布", "overcast clouds"),
+    ("overcast clouds", "overcast clouds"),
+]
+
+
+def legacy_classify(weather_status: str) -> str | None:
+    """舊版 get_mood 的分類流程（原樣保留，只用來比較）。"""
+    text_templates_keys = [
+        "clear", "rain", "cloudy", "thunderstorm", "snow", "fog", "partly cloudy", "overcast clouds",
+    ]
+    zh_alias = dict(weather_classifier.ZH_ALIAS)
+    weather_alias = dict(weather_classifier.EN_ALIAS)
+
+    key = weather_status.strip().lower()
+    for zh, en in zh_alias.items():
+        if zh in key:
+            key = en
+            break
+
+    normalized_key = weather_alias.get(key, key)
+    return next((k for k in text_templates_keys if k in normalized_key), None)
+
+
+def accuracy(fn) -> float:
+    return sum(fn(text) == label for text, label in SAMPLES) / len(SAMPLES)
+
+
+def per_call_us(fn, repeat: int) -> float:
+    inputs = [text for text, _ in SAMPLES]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in inputs:
+            fn(text)
+    return (time.perf_counter() - start) / (repeat * len(inputs)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+
+    legacy_us = per_call_us(legacy_classify, args.repeat)
+    new_us = per_call_us(weather_classifier.classify, args.repeat)
+
+    inputs = [text for text, _ in SAMPLES] * args.repeat
+    start = time.perf_counter()
+    weather_classifier.classify_many(inputs)
+    batch_us = (time.perf_counter() - start) / len(inputs) * 1e6
+
+    print(f"{'':16}{'accuracy':>10}{'µs/call':>10}")
+    print(f"{'legacy':16}{accuracy(legacy_classify):>10.0%}{legacy_us:>10.2f}")
+    print(f"{'aho-corasick':16}{accuracy(weather_classifier.classify):>10.0%}{new_us:>10.2f}")
+    print(f"{'classify_many':16}{'':>10}{batch_us:>10.2f}")
+    print(f"speedup: {legacy_us / new_us:.1f}x per call")
+
+    for text, label in SAMPLES:
+        old = legacy_classify(text)
+        if old != label:
+            print(f"  legacy 判錯：{text!r} → {old}（應為 {label}）")
+
+
+if __name__ == "__main__":
+    main()
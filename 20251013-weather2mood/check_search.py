@@ -0,0 +1,84 @@
+"""
+檢查 search_files 背後的倒排索引（斷詞、增量更新、持久化）。
+
+    python check_search.py
+
+每個情境都在新的暫存資料夾建立 SearchIndex，印出 PASS/FAIL 與查詢結果。
+"""
+import tempfile
+import time
+from pathlib import Path
+
+import search_index
+
+
+def make_index(files: dict[str, str]) -> search_index.SearchIndex:
+    root = Path(tempfile.mkdtemp())
+    for name, text in files.items():
+        (root / name).write_text(text, encoding="utf-8")
+    return search_index.SearchIndex(root, root / ".index" / "index.json")
+
+
+def single_cjk_char_matches_inside_a_word():
+    # 「霧」只出現在「濃霧」裡；舊的子字串搜尋找得到，索引也要找得到
+    idx = make_index({"fog.txt": "今天早上濃霧特報", "sun.txt": "晴朗無雲"})
+    hits = [h["path"] for h in idx.search("霧")]
+    return hits == ["fog.txt"], hits
+
+
+def cjk_phrase_uses_bigrams():
+    # 兩字以上只比對 bigram：「濃霧」不應因為單字「霧」命中「霧峰」
+    idx = make_index({"fog.txt": "今天早上濃霧特報", "place.txt": "台中霧峰區"})
+    hits = [h["path"] for h in idx.search("濃霧")]
+    return hits == ["fog.txt"], hits
+
+
+def english_words_are_case_insensitive():
+    idx = make_index({"a.txt": "Heavy RAIN expected", "b.txt": "clear sky"})
+    hits = [h["path"] for h in idx.search("rain")]
+    return hits == ["a.txt"], hits
+
+
+def changed_and_removed_files_are_reindexed():
+    idx = make_index({"a.txt": "颱風警報", "b.txt": "晴天"})
+    idx.search("颱風")
+    time.sleep(0.01)  # 讓 mtime 不同
+    (idx.root / "a.txt").write_text("陣雨", encoding="utf-8")
+    (idx.root / "b.txt").unlink()
+    idx.mark_dirty()
+    hits = [h["path"] for h in idx.search("陣雨")], [h["path"] for h in idx.search("颱風")]
+    return hits == (["a.txt"], []) and "b.txt" not in idx.docs, hits
+
+
+def saved_index_is_reused():
+    idx = make_index({"a.txt": "午後雷陣雨"})
+    idx.search("雷")
+    reloaded = search_index.SearchIndex(idx.root, idx.index_path)
+    stats = reloaded.refresh(force=True)
+    hits = [h["path"] for h in reloaded.search("雷")]
+    return stats == {"added": 0, "updated": 0, "removed": 0} and hits == ["a.txt"], (stats, hits)
+
+
+SCENARIOS = [
+    single_cjk_char_matches_inside_a_word,
+    cjk_phrase_uses_bigrams,
+    english_words_are_case_insensitive,
+    changed_and_removed_files_are_reindexed,
+    saved_index_is_reused,
+]
+
+
+def main():
+    failed = 0
+    for scenario in SCENARIOS:
+        try:
+            ok, detail = scenario()
+        except Exception as e:
+            ok, detail = False, f"{type(e).__name__}: {e}"
+        failed += not ok
+        print(f"{'PASS' if ok else 'FAIL'}  {scenario.__name__:45} {detail}")
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import mmap
+import os
+import stat
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# 📂 共享資料夾檔案操作
+# - 所有路徑都限制在 SHARE_DIR 內（預設為 repo 的 test_file_share_20250922）
+# - 讀取支援 byte / 行數範圍與分段讀取；大檔用 mmap，不整份讀進記憶體
+# - 列目錄分頁，背後是帶 mtime 檢查的 stat 快照
+# - 寫入為原子操作（暫存檔 + rename），另支援 append
+
+SHARE_DIR = Path(
+    os.getenv("SHARE_DIR", Path(__file__).resolve().parent.parent / "test_file_share_20250922")
+).resolve()
+
+# 超過此大小的檔案改用 mmap 讀取
+MMAP_THRESHOLD = 1 << 20
+# 單次讀取回傳的 byte 上限（避免一次塞爆 LLM context）
+MAX_READ_BYTES = 64 * 1024
+# 目錄快照最長沿用秒數（外部修改檔案內容不會改變目錄 mtime）
+SNAPSHOT_TTL = 2.0
+
+
+def resolve_path(path: str, root: Path = SHARE_DIR) -> Path:
+    """把相對（或絕對）路徑解析到共享資料夾內；跳出範圍則拋 PermissionError。"""
+    p = Path(path)
+    # agent 指令裡給的是共享資料夾的絕對路徑（可能是另一台機器的），只取資料夾之後的部分
+    if p.is_absolute() and not p.is_relative_to(root) and root.name in p.parts:
+        p = Path(*p.parts[p.parts.index(root.name) + 1:])
+    candidate = (root / p).resolve()
+    if candidate != root and not candidate.is_relative_to(root):
+        raise PermissionError(f"路徑 {path!r} 不在共享資料夾內。")
+    return candidate
+
+
+# -------------------------------------------------
+# 讀取
+# -------------------------------------------------
+def read_range(path: Path, offset: int = 0, length: int = MAX_READ_BYTES) -> tuple[bytes, int, int]:
+    """
+    讀取 [offset, offset+length) 的 bytes，並對齊到 UTF-8 字元邊界。
+    回傳 (資料, 實際起點, 實際終點)。
+    """
+    size = path.stat().st_size
+    offset = max(0, min(offset, size))
+    end = min(size, offset + max(0, min(length, MAX_READ_BYTES)))
+    if offset >= end:
+        return b"", offset, offset
+
+    with open(path, "rb") as f:
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                start = _align_utf8(mm, offset, size)
+                stop = _align_utf8(mm, end, size)
+                return mm[start:stop], start, stop
+        # 多讀 3 bytes 以便把終點對齊到完整字元
+        f.seek(offset)
+        buf = f.read(end - offset + 3)
+    start = _align_utf8(buf, 0, len(buf))
+    stop = _align_utf8(buf, end - offset, len(buf)) if end < size else len(buf)
+    return buf[start:stop], offset + start, offset + stop
+
+
+def read_lines(
+    path: Path, start_line: int = 1, end_line: int | None = None
+) -> tuple[bytes, int, int, bool]:
+    """
+    讀取第 start_line ~ end_line 行（1-based，含頭尾），超過 MAX_READ_BYTES 會提前截斷。
+    回傳 (資料, 實際讀到的最後一行, 下一段的 byte offset, 是否截斷在行中間)。
+    第一行本身就超過上限時只回前 MAX_READ_BYTES，其餘從回傳的 offset 依 byte 繼續讀。
+    """
+    start_line = max(1, start_line)
+    last_line = start_line - 1
+    size = path.stat().st_size
+    with open(path, "rb") as f:
+        if size == 0:
+            return b"", 0, 0, False
+        source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size >= MMAP_THRESHOLD else f.read()
+        try:
+            pos = 0
+            for _ in range(start_line - 1):
+                nl = source.find(b"\n", pos)
+                if nl < 0:
+                    return b"", last_line, size, False
+                pos = nl + 1
+            begin = pos
+            while pos < size and (end_line is None or last_line < end_line):
+                nl = source.find(b"\n", pos)
+                nxt = size if nl < 0 else nl + 1
+                if nxt - begin > MAX_READ_BYTES:
+                    if last_line >= start_line:
+                        break
+                    # 單一行就超過上限：切在字元邊界，不把整行從 mmap 複製出來
+                    cut = _align_utf8(source, begin + MAX_READ_BYTES, size)
+                    return source[begin:cut], start_line, cut, True
+                pos = nxt
+                last_line += 1
+            return source[begin:pos], last_line, pos, False
+        finally:
+            if isinstance(source, mmap.mmap):
+                source.close()
+
+
+def _align_utf8(buf, pos: int, size: int) -> int:
+    # UTF-8 延續位元組為 0b10xxxxxx；往後挪到下一個字元開頭
+    while pos < size and (buf[pos] & 0xC0) == 0x80:
+        pos += 1
+    return pos
+
+
+# -------------------------------------------------
+# 列目錄（stat 快照 + 分頁）
+# -------------------------------------------------
+_snapshots: dict[Path, tuple[int, float, list[dict]]] = {}
+_snapshot_lock = threading.Lock()
+
+
+def snapshot(directory: Path) -> list[dict]:
+    """回傳目錄內容的 stat 快照；目錄 mtime 沒變且未過期時直接沿用。"""
+    dir_mtime = directory.stat().st_mtime_ns
+    now = time.monotonic()
+    with _snapshot_lock:
+        cached = _snapshots.get(directory)
+        if cached and cached[0] == dir_mtime and now - cached[1] < SNAPSHOT_TTL:
+            return cached[2]
+
+    entries = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            st = entry.stat()
+            entries.append({
+                "name": entry.name,
+                "type": "directory" if entry.is_dir() else "file",
+                "size": st.st_size,
+                "modified": st.st_mtime,
+            })
+    entries.sort(key=lambda e: (e["type"] != "directory", e["name"]))
+
+    with _snapshot_lock:
+        _snapshots[directory] = (dir_mtime, now, entries)
+    return entries
+
+
+def invalidate(directory: Path) -> None:
+    with _snapshot_lock:
+        _snapshots.pop(directory, None)
+
+
+# -------------------------------------------------
+# 寫入
+# -------------------------------------------------
+def atomic_write(path: Path, data: bytes) -> None:
+    """先寫同目錄暫存檔再 os.replace，讀者永遠看不到寫一半的檔案。"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        # mkstemp 建立的是 0600；沿用原檔權限，新檔則給 0644
+        os.chmod(tmp, stat.S_IMODE(path.stat().st_mode) if path.exists() else 0o644)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    invalidate(path.parent)
+
+
+def append(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "ab") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    invalidate(path.parent)
@@ -0,0 +1,216 @@
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+import file_tools
+
+# 🔎 共享資料夾全文檢索
+# - 斷詞：中日韓文字索引單字與相鄰兩字（bigram），英數取小寫單字；
+#   查詢時兩字以上只用 bigram（較精準），單字查詢則比對單字索引
+# - 倒排索引：token → {檔案: 出現次數}，依 BM25 排序
+# - 以 (mtime, size) 判斷檔案是否變更，只重新索引有變動的檔案
+# - 每個檔案的 token 統計存成 JSON，重啟後不必全部重建
+
+INDEX_PATH = Path(os.getenv("SEARCH_INDEX_PATH", Path(__file__).with_name(".search_index.json")))
+INDEX_VERSION = 2
+
+# 超過此大小的檔案不索引
+MAX_INDEX_BYTES = 5 * 1024 * 1024
+# 兩次掃描資料夾之間的最短間隔（秒）
+REFRESH_INTERVAL = 2.0
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_CJK = "\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\u3040-\u30ff\uac00-\ud7af"  # 中日韓文字
+_TOKEN_RE = re.compile(rf"[{_CJK}]+|[a-z0-9]+")
+
+
+def tokenize(text: str, query: bool = False) -> list[str]:
+    """文件斷詞（query=False）同時產生 CJK 單字與 bigram；查詢斷詞只在單字時用單字。"""
+    tokens = []
+    for run in _TOKEN_RE.findall(text.lower()):
+        if run[0].isascii() or len(run) == 1:
+            tokens.append(run)
+            continue
+        if not query:
+            tokens.extend(run)
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+class SearchIndex:
+    def __init__(self, root: Path, index_path: Path):
+        self.root = root
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        # 檔案（相對路徑）→ {"mtime", "size", "length", "tokens": {token: 次數}}
+        self.docs: dict[str, dict] = {}
+        # token → {檔案: 次數}
+        self.postings: dict[str, dict[str, int]] = {}
+        self._total_length = 0
+        self._next_refresh = 0.0
+        self._load()
+
+    # -------------------------------------------------
+    # 增量更新
+    # -------------------------------------------------
+    def refresh(self, force: bool = False) -> dict:
+        """掃描資料夾，只重新索引新增 / 變更的檔案並移除已刪除的檔案。"""
+        now = time.monotonic()
+        if not force and now < self._next_refresh:
+            return {"added": 0, "updated": 0, "removed": 0}
+        with self._lock:
+            self._next_refresh = now + REFRESH_INTERVAL
+            seen = set()
+            added = updated = 0
+            for path, st in self._walk():
+                rel = path.relative_to(self.root).as_posix()
+                seen.add(rel)
+                doc = self.docs.get(rel)
+                if doc and doc["mtime"] == st.st_mtime_ns and doc["size"] == st.st_size:
+                    continue
+                tokens = self._read_tokens(path)
+                if tokens is None:
+                    continue
+                if doc:
+                    self._remove(rel)
+                    updated += 1
+                else:
+                    added += 1
+                self._add(rel, {
+                    "mtime": st.st_mtime_ns,
+                    "size": st.st_size,
+                    "length": sum(tokens.values()),
+                    "tokens": dict(tokens),
+                })
+            removed = [rel for rel in self.docs if rel not in seen]
+            for rel in removed:
+                self._remove(rel)
+            if added or updated or removed:
+                self._save()
+            return {"added": added, "updated": updated, "removed": len(removed)}
+
+    def mark_dirty(self) -> None:
+        """下一次查詢前強制重新掃描（write_file 之後呼叫）。"""
+        self._next_refresh = 0.0
+
+    def _walk(self):
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            for name in filenames:
+                if name.startswith("."):
+                    continue
+                path = Path(dirpath) / name
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                if st.st_size <= MAX_INDEX_BYTES:
+                    yield path, st
+
+    @staticmethod
+    def _read_tokens(path: Path) -> Counter | None:
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        if b"\0" in data[:1024]:
+            return None  # 二進位檔
+        return Counter(tokenize(data.decode("utf-8", errors="ignore")))
+
+    def _add(self, rel: str, doc: dict) -> None:
+        self.docs[rel] = doc
+        self._total_length += doc["length"]
+        for token, count in doc["tokens"].items():
+            self.postings.setdefault(token, {})[rel] = count
+
+    def _remove(self, rel: str) -> None:
+        doc = self.docs.pop(rel)
+        self._total_length -= doc["length"]
+        for token in doc["tokens"]:
+            files = self.postings.get(token)
+            if files is not None:
+                files.pop(rel, None)
+                if not files:
+                    del self.postings[token]
+
+    # -------------------------------------------------
+    # 查詢
+    # -------------------------------------------------
+    def search(self, query: str, limit: int = 10, snippets: int = 3) -> list[dict]:
+        self.refresh()
+        terms = list(dict.fromkeys(tokenize(query, query=True)))
+        if not terms:
+            return []
+
+        with self._lock:
+            n_docs = len(self.docs)
+            avg_len = self._total_length / n_docs if n_docs else 0.0
+            scores: dict[str, float] = {}
+            for term in terms:
+                files = self.postings.get(term)
+                if not files:
+                    continue
+                idf = math.log(1 + (n_docs - len(files) + 0.5) / (len(files) + 0.5))
+                for rel, tf in files.items():
+                    norm = 1 - BM25_B + BM25_B * self.docs[rel]["length"] / (avg_len or 1)
+                    scores[rel] = scores.get(rel, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+
+        ranked = sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))[:limit]
+        return [
+            {"path": rel, "score": round(score, 4), "snippets": self._snippets(rel, query, terms, snippets)}
+            for rel, score in ranked
+        ]
+
+    def _snippets(self, rel: str, query: str, terms: list[str], limit: int) -> list[dict]:
+        # 只讀排名前幾名的檔案；整句命中的行優先，其次依命中 token 數
+        needle = query.strip().lower()
+        hits = []
+        try:
+            with open(self.root / rel, encoding="utf-8", errors="ignore") as f:
+                for lineno, line in enumerate(f, 1):
+                    lowered = line.lower()
+                    matched = sum(term in lowered for term in terms)
+                    if matched:
+                        hits.append((needle in lowered, matched, -lineno, line.strip()))
+        except OSError:
+            return []
+        hits.sort(reverse=True)
+        return [{"line": -neg_line, "text": text[:200]} for _, _, neg_line, text in hits[:limit]]
+
+    # -------------------------------------------------
+    # 持久化
+    # -------------------------------------------------
+    def _load(self) -> None:
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != INDEX_VERSION or data.get("root") != str(self.root):
+            return
+        for rel, doc in data.get("docs", {}).items():
+            self._add(rel, doc)
+
+    def _save(self) -> None:
+        payload = {"version": INDEX_VERSION, "root": str(self.root), "docs": self.docs}
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.index_path.parent, prefix=".search_index.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(tmp, self.index_path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+
+index = SearchIndex(file_tools.SHARE_DIR, INDEX_PATH)
@@ -1,10 +1,55 @@
-from fastmcp import FastMCP
-import random
+import os
+import sys
+from pathlib import Path
 
-mcp = FastMCP("weather2mood")
+import file_tools
+import mood_generator
+import search_index
 
+# 共用的工具量測（repo 根目錄 shared/tool_metrics.py）：呼叫次數、延遲、payload 大小、錯誤類別
+# 預設關閉，TOOL_METRICS=1 才會包裝工具
+sys.path.append(str(Path(__file__).resolve().parent.parent / "shared"))
+import tool_metrics  # noqa: E402
 
-@mcp.tool()
+# -------------------------------------------------------------
+# 工具先登記成一般函式，FastMCP 等到真的要提供服務時才 import 並建立
+# （光 import fastmcp 就要一秒多）。agent 以 in-process 模式直接呼叫
+# 這些函式時就不必付這筆啟動成本；server.mcp 仍可取得 FastMCP 物件（第一次存取時建立）。
+# -------------------------------------------------------------
+_TOOLS = []
+
+
+def tool(fn):
+    fn = tool_metrics.instrument(fn)
+    _TOOLS.append(fn)
+    return fn
+
+
+def build_server():
+    from fastmcp import FastMCP
+
+    server = FastMCP("weather2mood")
+    for fn in _TOOLS:
+        server.tool(fn)
+
+    # SSE / HTTP 模式下給 Prometheus 抓的量測端點（stdio 模式請用 get_tool_metrics 工具）
+    @server.custom_route("/metrics", methods=["GET"])
+    async def metrics(request):
+        from starlette.responses import PlainTextResponse
+
+        return PlainTextResponse(tool_metrics.render(), media_type=tool_metrics.CONTENT_TYPE)
+
+    return server
+
+
+def __getattr__(name):
+    if name == "mcp":
+        server = globals()["mcp"] = build_server()
+        return server
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@tool
 def get_mood(
     weather_status: str,
     city: str = "桃園",
@@ -12,156 +57,144 @@ def get_mood(
     temperature: float | None = None,
 ) -> str:
     """根據天氣、地點與氣溫回傳帶有情緒感的回覆。"""
-
-    # 🧩 防呆：空值處理
-    if not weather_status:
-        return f"{city}的天氣資料好像迷路了，但{landmark or '這裡'}依然值得去看看。"
-
-    # Normalize input
-    city_name = city.strip() if city and city.strip() else "這裡"
-    destination = (
-        landmark.strip()
-        if landmark and landmark.strip()
-        else ("中央大學" if city_name == "桃園" else city_name)
-    )
-
-    # 🌤 Step 1: 天氣 -> 情緒
-    emotion_map = {
-        "clear": "愉快又充滿活力",
-        "partly cloudy": "慵懶而平靜",
-        "cloudy": "安靜與沉思",
-        "rain": "微微憂鬱但浪漫",
-        "thunderstorm": "有點煩躁又壓抑",
-        "snow": "浪漫與驚喜",
-        "fog": "神祕與夢幻",
-        "overcast clouds": "有點懶、有點放空",
+    return mood_generator.compose_mood(weather_status, city, landmark, temperature)
+
+
+# -------------------------------------------------
+# 📂 共享資料夾檔案工具
+# -------------------------------------------------
+def _relative(path) -> str:
+    return path.relative_to(file_tools.SHARE_DIR).as_posix() or "."
+
+
+def _file_error(e: Exception) -> dict:
+    return {"status": "error", "error_message": f"檔案操作失敗：{e}"}
+
+
+@tool
+def read_file(
+    path: str,
+    offset: int | None = None,
+    length: int | None = None,
+    start_line: int | None = None,
+    end_line: int | None = None,
+) -> dict:
+    """
+    讀取共享資料夾內的文字檔。
+
+    - 指定 start_line / end_line（從 1 開始）時依行數讀取
+    - 否則依 byte 範圍讀取：offset（預設 0）、length（預設且最多 64KB）
+    回傳 next_offset 時表示還有內容，可再以該 offset 繼續讀下一段。
+    依行讀取時若單一行超過 64KB，只回該行開頭並標 truncated=True：
+    該行其餘部分以 next_offset 依 byte 續讀，next_line 則跳到下一行。
+    """
+    try:
+        target = file_tools.resolve_path(path)
+        size = target.stat().st_size
+        if start_line is not None or end_line is not None:
+            data, last_line, stop, truncated = file_tools.read_lines(target, start_line or 1, end_line)
+            result = {
+                "start_line": start_line or 1,
+                "end_line": last_line,
+                "next_line": None if stop >= size else last_line + 1,
+                "truncated": truncated,
+            }
+        else:
+            data, start, stop = file_tools.read_range(
+                target, offset or 0, length or file_tools.MAX_READ_BYTES
+            )
+            result = {"start": start, "end": stop}
+        return {
+            "status": "success",
+            "path": _relative(target),
+            "size": size,
+            "content": data.decode("utf-8", errors="replace"),
+            **result,
+            "eof": stop >= size,
+            "next_offset": None if stop >= size else stop,
+        }
+    except (OSError, ValueError) as e:
+        return _file_error(e)
+
+
+@tool
+def write_file(path: str, content: str, mode: str = "overwrite") -> dict:
+    """
+    寫入共享資料夾內的檔案（UTF-8）。
+    mode="overwrite" 以原子方式整檔取代；mode="append" 則接在檔尾。
+    """
+    if mode not in ("overwrite", "append"):
+        return {"status": "error", "error_message": "mode 只能是 overwrite 或 append。"}
+    try:
+        target = file_tools.resolve_path(path)
+        data = content.encode("utf-8")
+        if mode == "append":
+            file_tools.append(target, data)
+        else:
+            file_tools.atomic_write(target, data)
+        search_index.index.mark_dirty()
+        return {
+            "status": "success",
+            "path": _relative(target),
+            "mode": mode,
+            "bytes_written": len(data),
+        }
+    except (OSError, ValueError) as e:
+        return _file_error(e)
+
+
+@tool
+def list_directory(path: str = ".", page: int = 1, page_size: int = 50) -> dict:
+    """列出共享資料夾（或其子資料夾）的檔案，依 page / page_size 分頁。"""
+    try:
+        target = file_tools.resolve_path(path)
+        entries = file_tools.snapshot(target)
+        page = max(1, page)
+        page_size = max(1, min(page_size, 500))
+        begin = (page - 1) * page_size
+        return {
+            "status": "success",
+            "path": _relative(target),
+            "entries": entries[begin:begin + page_size],
+            "page": page,
+            "page_size": page_size,
+            "total": len(entries),
+            "has_more": begin + page_size < len(entries),
+        }
+    except (OSError, ValueError) as e:
+        return _file_error(e)
+
+
+
+@tool
+def search_files(query: str, limit: int = 10) -> dict:
+    """
+    在共享資料夾中全文搜尋（中文以兩字詞、英文以單字比對），
+    依相關度排序，並附上命中的行號與內容片段。
+    """
+    try:
+        results = search_index.index.search(query, limit=max(1, min(limit, 50)))
+    except OSError as e:
+        return _file_error(e)
+    return {
+        "status": "success",
+        "query": query,
+        "results": results,
+        "indexed_files": len(search_index.index.docs),
     }
 
-    # 🌈 Step 2: 天氣 -> 句型
-    text_templates = {
-        "clear": [
-            "{city}今天天氣晴朗，我整個人都亮起來，超想去{destination}走走！",
-            "太陽在{city}閃耀，心情也跟著發光，{destination}等我！",
-        ],
-        "rain": [
-            "{city}的雨滴打在傘上，好像在唱慢歌。想去{destination}找杯熱可可。",
-            "下雨的{city}讓人變得柔軟，{destination}的景色一定也多了一點詩意。",
-        ],
-        "cloudy": [
-            "{city}天空灰灰的，反而讓人想靜靜地去{destination}發呆。",
-        ],
-        "thunderstorm": [
-            "{city}的雷聲讓我有點焦躁，只想趕快躲進{destination}的角落冷靜一下。",
-        ],
-        "snow": [
-            "{city}居然飄雪了！整個世界都變溫柔，{destination}一定美翻天。",
-        ],
-        "fog": [
-            "{city}籠罩在霧中，{destination}看起來像仙境，忍不住想去探險。",
-        ],
-        "partly cloudy": [
-            "{city}微陰的天空讓人慵懶又平靜，{destination}最適合散步放空。",
-        ],
-        "overcast clouds": [
-            "{city}的厚厚雲層讓人懶洋洋的，乾脆去{destination}喝杯咖啡。",
-        ],
-    }
-
-    # 🌏 中文天氣關鍵字對應（強化版）
-    zh_alias = {
-        "晴": "clear",
-        "晴朗": "clear",
-        "大晴": "clear",
-        "晴天": "clear",
-        "多雲": "partly cloudy",
-        "少雲": "partly cloudy",
-        "零星多雲": "partly cloudy",
-        "晴時多雲": "partly cloudy",
-        "陰": "cloudy",
-        "陰天": "cloudy",
-        "陰有雲": "cloudy",
-        "陰多雲": "cloudy",
-        "小雨": "rain",
-        "中雨": "rain",
-        "大雨": "rain",
-        "陣雨": "rain",
-        "雨": "rain",
-        "下雨": "rain",
-        "陰有雨": "rain",
-        "雷雨": "thunderstorm",
-        "雷陣雨": "thunderstorm",
-        "雪": "snow",
-        "小雪": "snow",
-        "大雪": "snow",
-        "霧": "fog",
-        "濃霧": "fog",
-        "薄霧": "fog",
-        "陰霾": "fog",
-        "煙霧": "fog",
-        "霾": "fog",
-        "陰雲": "overcast clouds",
-        "厚雲": "overcast clouds",
-    }
-
-    # 🌦️ 英文別名 -> 標準 key
-    weather_alias = {
-        "few clouds": "partly cloudy",
-        "scattered clouds": "partly cloudy",
-        "broken clouds": "cloudy",
-        "clouds": "cloudy",
-        "mist": "fog",
-        "haze": "fog",
-        "smoke": "fog",
-        "drizzle": "rain",
-        "light rain": "rain",
-        "moderate rain": "rain",
-        "heavy rain": "rain",
-        "overcast": "overcast clouds",
-    }
 
-    # 🧠 Step 3: 中文轉英文 + 模糊比對
-    key = weather_status.strip().lower()
-    for zh, en in zh_alias.items():
-        if zh in key:
-            key = en
-            break
-
-    normalized_key = weather_alias.get(key, key)
-    matched_key = next((k for k in text_templates.keys() if k in normalized_key), None)
-
-    # Step 4: 根據天氣產生文字
-    templates = text_templates.get(matched_key or normalized_key)
-    template = (
-        random.choice(templates)
-        if templates
-        else "{city}的天氣有點難以形容，但{destination}永遠讓人開心。"
-    )
-
-    emotion = emotion_map.get(matched_key or normalized_key, "平靜中帶點期待")
-
-    # 🎭 尾句
-    mood_tails = [
-        "希望你的今天也一樣順心。",
-        "這樣的天氣真讓人有故事感呢。",
-        "要不要一起去感受這份氛圍？",
-        "天氣左右心情，但心情也能改變天氣喔。",
-    ]
-    tail = random.choice(mood_tails)
-
-    # 🌡️ Step 5: 加上天氣描述與溫度
-    temp_text = f"，氣溫為攝氏 {temperature:.1f} 度" if temperature is not None else ""
-    weather_intro = f"{city_name}目前天氣是{weather_status}{temp_text}。"
-
-    # ✨ 組合最終輸出
-    result = (
-        f"{weather_intro}\n感覺今天的氣氛是「{emotion}」。"
-        + template.format(city=city_name, destination=destination)
-        + " "
-        + tail
-    )
-
-    return result
+@tool
+def get_tool_metrics() -> dict:
+    """回傳每個工具的呼叫次數、執行中數量、錯誤類別、延遲（ms）與 payload 大小（SSE 模式也可抓 /metrics）。"""
+    return tool_metrics.snapshot()
 
 
 if __name__ == "__main__":
-    mcp.run(transport="stdio")
\ No newline at end of file
+    # 預設 stdio；MCP_TRANSPORT=sse 時改為常駐 HTTP 服務（供 agent 的伺服器行程池連線）
+    transport = os.getenv("MCP_TRANSPORT", "stdio")
+    mcp = build_server()
+    if transport == "stdio":
+        mcp.run(transport="stdio")
+    else:
+        mcp.run(transport=transport, host=os.getenv("MCP_HOST", "127.0.0.1"), port=int(os.getenv("MCP_PORT", "5003")))
\ No newline at end of file
@@ -0,0 +1,150 @@
+from collections import deque
+
+# 🌦️ 天氣描述 → 標準天氣 key
+# 啟動時把所有中英文別名編譯成一台 Aho-Corasick 自動機，
+# 一次掃描輸入字串，取「最長」的命中關鍵字（同長度取最先出現者），
+# 所以「雷雨」會判成 thunderstorm，而不是被「雨」搶先判成 rain。
+
+CONDITIONS = [
+    "clear",
+    "partly cloudy",
+    "cloudy",
+    "rain",
+    "thunderstorm",
+    "snow",
+    "fog",
+    "overcast clouds",
+]
+
+# 🌏 中文天氣關鍵字對應
+ZH_ALIAS = {
+    "晴": "clear",
+    "晴朗": "clear",
+    "大晴": "clear",
+    "晴天": "clear",
+    "多雲": "partly cloudy",
+    "少雲": "partly cloudy",
+    "零星多雲": "partly cloudy",
+    "晴時多雲": "partly cloudy",
+    "陰": "cloudy",
+    "陰天": "cloudy",
+    "陰有雲": "cloudy",
+    "陰多雲": "cloudy",
+    "小雨": "rain",
+    "中雨": "rain",
+    "大雨": "rain",
+    "陣雨": "rain",
+    "雨": "rain",
+    "下雨": "rain",
+    "陰有雨": "rain",
+    "雷雨": "thunderstorm",
+    "雷陣雨": "thunderstorm",
+    "雪": "snow",
+    "小雪": "snow",
+    "大雪": "snow",
+    "霧": "fog",
+    "濃霧": "fog",
+    "薄霧": "fog",
+    "陰霾": "fog",
+    "煙霧": "fog",
+    "霾": "fog",
+    "陰雲": "overcast clouds",
+    "厚雲": "overcast clouds",
+}
+
+# 🌦️ 英文別名（OpenWeatherMap description）
+EN_ALIAS = {
+    "few clouds": "partly cloudy",
+    "scattered clouds": "partly cloudy",
+    "broken clouds": "cloudy",
+    "clouds": "cloudy",
+    "mist": "fog",
+    "haze": "fog",
+    "smoke": "fog",
+    "drizzle": "rain",
+    "light rain": "rain",
+    "moderate rain": "rain",
+    "heavy rain": "rain",
+    "overcast": "overcast clouds",
+    "sunny": "clear",
+}
+
+
+class WeatherClassifier:
+    """Aho-Corasick 多關鍵字比對，longest-match 語意。"""
+
+    def __init__(self, aliases: dict[str, str]):
+        # trie：每個節點一個 dict（字元 → 子節點 index）
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        # 節點 → 以此結尾的最長關鍵字 (長度, 標準 key)
+        self._best: list[tuple[int, str] | None] = [None]
+
+        for pattern, label in aliases.items():
+            node = 0
+            for ch in pattern.lower():
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._best.append(None)
+                node = nxt
+            self._best[node] = (len(pattern), label)
+
+        # BFS 建 fail link；節點本身不是關鍵字時，沿用 fail 節點的最長輸出
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[child] = self._goto[f].get(ch, 0)
+                if self._best[child] is None:
+                    self._best[child] = self._best[self._fail[child]]
+                queue.append(child)
+
+    def classify(self, text: str) -> str | None:
+        """回傳最長命中的標準天氣 key；沒有命中則回傳 None。"""
+        goto, fail, best = self._goto, self._fail, self._best
+        node = 0
+        hit_len = 0
+        hit_label = None
+        for ch in text.lower():
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            out = best[node]
+            if out is not None and out[0] > hit_len:
+                hit_len, hit_label = out
+        return hit_label
+
+    def classify_many(self, texts: list[str]) -> list[str | None]:
+        """批次分類；重複出現的描述只掃描一次。"""
+        seen: dict[str, str | None] = {}
+        out = []
+        for t in texts:
+            if t not in seen:
+                seen[t] = self.classify(t)
+            out.append(seen[t])
+        return out
+
+
+def _all_aliases() -> dict[str, str]:
+    aliases = {c: c for c in CONDITIONS}
+    aliases.update(EN_ALIAS)
+    aliases.update(ZH_ALIAS)
+    return aliases
+
+
+classifier = WeatherClassifier(_all_aliases())
+
+
+def classify(text: str) -> str | None:
+    return classifier.classify(text)
+
+
+def classify_many(texts: list[str]) -> list[str | None]:
+    return classifier.classify_many(texts)
@@ -1,14 +1,282 @@
+import os
 import random
-from fastmcp import FastMCP
+import sys
+from itertools import product
+from pathlib import Path
+
+import budget_cache
+import price_registry
+from price_registry import ALLOCATION_KEYS, BUDGET_LEVELS, PRICE_LEVELS, PriceProfiles
+import budget_batch
+import budget_executor
+import budget_planner
+import budget_solver
+
+# 共用的工具量測（repo 根目錄 shared/tool_metrics.py）：呼叫次數、延遲、payload 大小、錯誤類別
+# 預設關閉，TOOL_METRICS=1 才會包裝工具
+sys.path.append(str(Path(__file__).resolve().parent.parent / "shared"))
+import tool_metrics  # noqa: E402
+
+# -------------------------------------------------------------
+# 工具先登記成一般函式，FastMCP 等到真的要提供服務時才 import 並建立
+# （光 import fastmcp 就要一秒多）。agent 以 in-process 模式直接呼叫
+# 這些函式時就不必付這筆啟動成本；app.mcp 仍可取得 FastMCP 物件（第一次存取時建立）。
+# -------------------------------------------------------------
+_TOOLS = []
+
+
+def tool(fn):
+    fn = tool_metrics.instrument(fn)
+    _TOOLS.append(fn)
+    return fn
+
+
+def build_server():
+    from fastmcp import FastMCP
+
+    server = FastMCP(name="budget_server")
+    for fn in _TOOLS:
+        server.tool(fn)
+
+    # SSE / HTTP 模式下給 Prometheus 抓的量測端點（stdio 模式請用 get_tool_metrics 工具）
+    @server.custom_route("/metrics", methods=["GET"])
+    async def metrics(request):
+        from starlette.responses import PlainTextResponse
+
+        return PlainTextResponse(tool_metrics.render(), media_type=tool_metrics.CONTENT_TYPE)
+
+    return server
+
+
+def __getattr__(name):
+    if name == "mcp":
+        server = globals()["mcp"] = build_server()
+        return server
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# -------------------------------------------------
+# 建議文字（依預算等級）
+# -------------------------------------------------
+SUGGESTION_TEXT = {
+    "extreme_low": (
+        "你的預算屬於地獄級，相當緊縮：\n"
+        "• 吃：以溫飽為目標，口味期待請降低\n"
+        "• 住：須考慮非常基本或共用空間\n"
+        "• 行：以步行＋大眾交通為主\n"
+        "• 景點：以免費景點為核心\n"
+        "建議：務必保留安全預備金，行程請務實規劃。"
+    ),
+    "low": (
+        "此預算較拮据但可維持基本品質：\n"
+        "• 吃：一般餐點為主，偶爾可小升級\n"
+        "• 住：經濟型旅宿或青年旅館\n"
+        "• 行：以大眾運輸搭配步行\n"
+        "• 景點：免費＋低價景點優先\n"
+        "建議：彈性安排、避免不必要的額外支出。"
+    ),
+    "mid": (
+        "你的預算屬於正常旅遊等級：\n"
+        "• 吃：多數餐廳皆能負擔\n"
+        "• 住：舒適乾淨的住宿品質\n"
+        "• 行：大眾運輸搭配偶爾計程車\n"
+        "• 景點：可安排付費景點\n"
+        "整體：能獲得穩定且愉快的旅遊體驗。"
+    ),
+    "high": (
+        "你的預算偏向舒適旅行：\n"
+        "• 吃：可享受較高品質餐點\n"
+        "• 住：舒適便利的飯店選擇\n"
+        "• 行：交通以節省時間為主\n"
+        "• 景點：多種類型體驗皆可納入\n"
+        "整體：能享受到完整且自在的旅程。"
+    ),
+    "luxury": (
+        "你的預算屬於豪華等級：\n"
+        "• 吃：高級料理、特色餐廳皆可嘗試\n"
+        "• 住：高星級或精品住宿\n"
+        "• 行：包車或專車接送\n"
+        "• 景點：私人導覽、高端體驗皆可安排\n"
+        "整體：建議好好規劃，享受高品質旅程。"
+    ),
+}
+
+# -------------------------------------------------
+# 結果快取（BUDGET_CACHE_SIZE 筆、BUDGET_CACHE_TTL 秒；TTL 0 = 不過期）
+# -------------------------------------------------
+_budget_cache = budget_cache.ResultCache(
+    maxsize=int(os.getenv("BUDGET_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("BUDGET_CACHE_TTL", "0")),
+)
+_cache_profiles: PriceProfiles | None = None
+
+
+def _cached_core(profiles: PriceProfiles, key: tuple):
+    # 物價設定檔熱重載後，舊的快取結果全部作廢
+    global _cache_profiles
+    if profiles is not _cache_profiles:
+        _budget_cache.clear()
+        _cache_profiles = profiles
+    return _budget_cache.get(key)
+
+
+DISCLAIMER = "※ 本工具為預算建議模型，提供參考分配，不代表實際物價與必需支出。請依個人習慣、目的、節奏調整。"
+
+# formatted_result 結尾（整體建議 + 免責聲明）只與等級有關，啟動時先組好
+_FORMATTED_TAIL = {
+    level: "\n".join(["", "", "【整體建議】", text, "", DISCLAIMER])
+    for level, text in SUGGESTION_TEXT.items()
+}
+
+# -------------------------------------------------
+# 回傳模式
+# - full：完整結構 + 建議文字 + 格式化輸出（預設，與舊版相同）
+# - compact：等級代碼、四捨五入到整數的分配、啟用的 flag 與提醒
+# - numbers-only：等級代碼 + 數字（分配依 ALLOCATION_KEYS 順序）
+# 精簡模式下建議文字只在 include_suggestion=True 時附上
+# -------------------------------------------------
+RESPONSE_MODES = ("full", "compact", "numbers-only")
+
+
+def _new_flags() -> dict:
+    return {
+        "used_floor": False,
+        "used_rescue": False,
+        "used_normalize_down": False,
+        "used_normalize_up": False,
+    }
+
+
+def _invalid_result() -> dict:
+    """天數或人數不合法時的固定回傳。"""
+    return {
+        "daily_budget": 0,
+        "budget_level": "invalid",
+        "budget_level_label": "輸入錯誤",
+        "price_level": "unknown",
+        "price_level_label": "未知物價",
+        "needs": {"survival_per_day": 0, "basic_per_day": 0},
+        "minimum_need": {},
+        "allocation": {k: 0 for k in ALLOCATION_KEYS},
+        "flags": _new_flags(),
+        "warnings": ["天數或人數為 0，行程無法成立。請至少提供 1 天、1 人。"],
+        "suggestion": "請提供有效的天數與人數。",
+        "formatted_result": "輸入錯誤，無法計算。",
+    }
+
+
+def _render_result(
+    profiles: PriceProfiles,
+    country: str,
+    total_budget: float,
+    days: int,
+    num_people: int,
+    daily_budget: float,
+    level: str,
+    price: str,
+    allocation: dict,
+    flags: dict,
+    warnings: list[str],
+) -> dict:
+    """把計算完成的數值組成最終回傳（建議文字 + 格式化輸出）。"""
+    m = profiles.minimum[price]
+    survival_need = m["food_hard"] + m["transport_min"]
+    basic_need = m["food_soft"] + m["transport_min"] + m["accom_soft"]
+
+    suggestion = SUGGESTION_TEXT[level]
+
+    formatted_allocation = {k: round(float(v), 2) for k, v in allocation.items()}
+
+    level_label = profiles.level_labels[level]
+    price_label = profiles.price_labels[price]
+
+    formatted = [
+        f"目的地：{country}",
+        f"總預算：{total_budget} 元 / {days} 天 / {num_people} 人",
+        f"每人每日預算：{round(daily_budget,2)} 元",
+        f"預算等級：{level}（{level_label}）",
+        f"物價等級：{price}（{price_label}）",
+        "",
+        f"⚙ 生存需求：約 {survival_need} 元／日（最低）",
+        f"⚙ 舒適需求：約 {basic_need} 元／日",
+        "",
+        "【每日預算分配】",
+        f"- 餐飲：{formatted_allocation['food']} 元",
+        f"- 交通：{formatted_allocation['transport']} 元",
+        f"- 住宿：{formatted_allocation['accommodation']} 元",
+        f"- 景點：{formatted_allocation['attractions']} 元",
+        f"- 其他：{formatted_allocation['others']} 元",
+    ]
+
+    if warnings:
+        formatted.append("")
+        formatted.append("【提醒】")
+        for w in warnings:
+            formatted.append(f"- {w}")
+
+    formatted_text = "\n".join(formatted) + _FORMATTED_TAIL[level]
+
+    return {
+        "daily_budget": daily_budget,
+        "budget_level": level,
+        "budget_level_label": level_label,
+        "price_level": price,
+        "price_level_label": price_label,
+        "needs": {"survival_per_day": survival_need, "basic_per_day": basic_need},
+        "minimum_need": {
+            "food_soft": m["food_soft"],
+            "food_hard": m["food_hard"],
+            "transport_min": m["transport_min"],
+            "accommodation_soft": m["accom_soft"],
+            "accommodation_hard": m["accom_hard"],
+        },
+        "allocation": formatted_allocation,
+        "flags": flags,
+        "warnings": warnings,
+        "suggestion": suggestion,
+        "formatted_result": formatted_text,
+    }
 
-mcp = FastMCP(name="budget_server")
 
-@mcp.tool
+def _compact_result(
+    mode: str,
+    daily_budget: float,
+    level: str,
+    price: str,
+    allocation: dict,
+    flags: dict,
+    warnings: list[str],
+    include_suggestion: bool,
+) -> dict:
+    """compact / numbers-only 的回傳（不組格式化文字）。"""
+    if mode == "numbers-only":
+        result = {
+            "budget_level": level,
+            "daily_budget": round(daily_budget),
+            "allocation": [round(allocation[k]) for k in ALLOCATION_KEYS],
+        }
+    else:
+        result = {
+            "budget_level": level,
+            "price_level": price,
+            "daily_budget": round(daily_budget),
+            "allocation": {k: round(allocation[k]) for k in ALLOCATION_KEYS},
+            "flags": [name.removeprefix("used_") for name, on in flags.items() if on],
+            "warnings": warnings,
+        }
+    if include_suggestion:
+        result["suggestion"] = SUGGESTION_TEXT.get(level, "請提供有效的天數與人數。")
+    return result
+
+
+@tool
+@budget_executor.offload
 def calculate_budget(
     total_budget: float,
     days: int,
     country: str,
     num_people: int = 1,
+    mode: str = "full",
+    include_suggestion: bool = False,
 ) -> dict:
     """
     Hell-Snake Budget Calculator v5.1 — Final Polished Edition
@@ -21,35 +289,69 @@ def calculate_budget(
     - 算式一致、行為確定、不會隨機暴走
 
     單位：台幣 / 人 / 日
-    """
 
-    warnings: list[str] = []
-    flags = {
-        "used_floor": False,
-        "used_rescue": False,
-        "used_normalize_down": False,
-        "used_normalize_up": False,
-    }
+    mode：
+    - "full"（預設）：完整結構 + 建議文字 + formatted_result
+    - "compact"：只回等級代碼、整數分配、flags 與提醒
+    - "numbers-only"：只回等級代碼、每日預算與分配數字
+      （順序：food, transport, accommodation, attractions, others）
+    include_suggestion：精簡模式下是否附上整體建議文字
+    """
 
     # -------------------------------------------------
     # STEP 0 — sanity check
     # -------------------------------------------------
+    if mode not in RESPONSE_MODES:
+        return {"status": "error", "error_message": f"mode 必須是 {', '.join(RESPONSE_MODES)} 其中之一。"}
     if days <= 0 or num_people <= 0:
-        warnings.append("天數或人數為 0，行程無法成立。請至少提供 1 天、1 人。")
-        return {
-            "daily_budget": 0,
-            "budget_level": "invalid",
-            "budget_level_label": "輸入錯誤",
-            "price_level": "unknown",
-            "price_level_label": "未知物價",
-            "needs": {"survival_per_day": 0, "basic_per_day": 0},
-            "minimum_need": {},
-            "allocation": {k: 0 for k in ["food","transport","accommodation","attractions","others"]},
-            "flags": flags,
-            "warnings": warnings,
-            "suggestion": "請提供有效的天數與人數。",
-            "formatted_result": "輸入錯誤，無法計算。",
-        }
+        invalid = _invalid_result()
+        if mode == "full":
+            return invalid
+        return _compact_result(
+            mode, 0, invalid["budget_level"], invalid["price_level"], invalid["allocation"],
+            invalid["flags"], invalid["warnings"], include_suggestion,
+        )
+
+    # -------------------------------------------------
+    # STEP 1 — normalize city → country
+    # -------------------------------------------------
+    profiles = price_registry.current()
+    c = profiles.resolve_country(country)
+
+    # 相同 (國家, 預算, 天數, 人數) 直接取快取結果；預算以原值為 key，不四捨五入
+    key = (c, total_budget, days, num_people)
+    core = _cached_core(profiles, key)
+    if core is budget_cache.MISS:
+        core = _compute_budget(profiles, c, total_budget, days, num_people)
+        _budget_cache.put(key, core)
+
+    # -------------------------------------------------
+    # STEP 10–12 — suggestions / format / return
+    # -------------------------------------------------
+    daily_budget, level, price, allocation, flags, warnings = core
+    if mode != "full":
+        return _compact_result(
+            mode, daily_budget, level, price, allocation, flags, list(warnings), include_suggestion,
+        )
+    return _render_result(
+        profiles, country, total_budget, days, num_people, daily_budget,
+        level, price, dict(allocation), dict(flags), list(warnings),
+    )
+
+
+def _compute_budget(
+    profiles: PriceProfiles,
+    c: str,
+    total_budget: float,
+    days: int,
+    num_people: int,
+) -> tuple:
+    """
+    預算模型本體（STEP 0–9）。c 為已解析的國家 key。
+    回傳 (daily_budget, level, price, allocation, flags, warnings)。
+    """
+    warnings: list[str] = []
+    flags = _new_flags()
 
     if total_budget <= 0:
         warnings.append("預算為零或負數，系統將以『極低』方式處理。")
@@ -60,63 +362,15 @@ def calculate_budget(
     if 0 < daily_budget <= 200:
         warnings.append("每日預算極低，可能難以應付基本生活需求。")
 
-    # -------------------------------------------------
-    # STEP 1 — normalize city → country
-    # -------------------------------------------------
-    CITY_TO_COUNTRY = {
-        "tokyo":"japan","osaka":"japan","kyoto":"japan","sapporo":"japan","nagoya":"japan",
-        "fukuoka":"japan","kobe":"japan",
-        "seoul":"korea","busan":"korea","daegu":"korea","incheon":"korea",
-        "bangkok":"thailand","chiang mai":"thailand","phuket":"thailand","pattaya":"thailand",
-        "london":"uk","manchester":"uk","edinburgh":"uk","liverpool":"uk",
-        "new york":"usa","los angeles":"usa","san francisco":"usa","chicago":"usa",
-        "las vegas":"usa","boston":"usa",
-        "singapore":"singapore",
-        "taipei":"taiwan","kaohsiung":"taiwan","taichung":"taiwan","tainan":"taiwan",
-        "paris":"france","lyon":"france","nice":"france",
-        "sydney":"australia","melbourne":"australia","brisbane":"australia",
-    }
-
-    c_raw = country.strip().lower()
-    c = CITY_TO_COUNTRY.get(c_raw, c_raw)
-
     # -------------------------------------------------
     # STEP 2 — price level
     # -------------------------------------------------
-    VHIGH = {"switzerland","norway","denmark","iceland","luxembourg","singapore"}
-    HIGH = {"japan","uk","united kingdom","france","germany","australia","new zealand",
-            "usa","united states","hong kong","ireland","sweden"}
-    MID = {"taiwan","korea","south korea","spain","italy","portugal","greece",
-           "canada","netherlands","belgium","israel","chile"}
-    LOW = {"thailand","malaysia","turkey","mexico","brazil","argentina",
-           "china","poland","czech republic","hungary","philippines"}
-    VLOW = {"vietnam","indonesia","india","cambodia","laos","nepal",
-            "pakistan","bangladesh","kenya","tanzania","egypt","morocco"}
-
-    if c in VHIGH: price = "vhigh"
-    elif c in HIGH: price = "high"
-    elif c in MID: price = "mid"
-    elif c in LOW: price = "low"
-    elif c in VLOW: price = "vlow"
-    else: price = "mid"
-
-    price_label_map = {
-        "vhigh":"超高物價國家","high":"高物價國家","mid":"中等物價國家",
-        "low":"低物價國家","vlow":"超低物價國家"
-    }
+    price = profiles.price_level_of(c)
 
     # -------------------------------------------------
     # STEP 3 — minimum needs
     # -------------------------------------------------
-    minimum = {
-        "vhigh":{"food_soft":2100,"food_hard":1400,"transport_min":450,"accom_soft":5500,"accom_hard":4000},
-        "high":{"food_soft":1800,"food_hard":1100,"transport_min":350,"accom_soft":4200,"accom_hard":2800},
-        "mid":{"food_soft":900,"food_hard":600,"transport_min":250,"accom_soft":3300,"accom_hard":2100},
-        "low":{"food_soft":650,"food_hard":400,"transport_min":180,"accom_soft":2200,"accom_hard":1300},
-        "vlow":{"food_soft":450,"food_hard":250,"transport_min":120,"accom_soft":1300,"accom_hard":850},
-    }
-
-    m = minimum[price]
+    m = profiles.minimum[price]
 
     survival_need = m["food_hard"] + m["transport_min"]
     basic_need = m["food_soft"] + m["transport_min"] + m["accom_soft"]
@@ -124,8 +378,7 @@ def calculate_budget(
     # -------------------------------------------------
     # STEP 4 — determine budget level
     # -------------------------------------------------
-    difficulty = {"vhigh":1.20,"high":1.10,"mid":1.0,"low":0.9,"vlow":0.8}
-    D = difficulty[price]
+    D = profiles.difficulty[price]
 
     if daily_budget <= 0:
         level = "extreme_low"
@@ -140,30 +393,12 @@ def calculate_budget(
     else:
         level = "luxury"
 
-    level_label_map = {
-        "extreme_low":"異地求生等級",
-        "low":"可活但緊縮",
-        "mid":"中等旅行品質",
-        "high":"舒適旅行",
-        "luxury":"豪華旅遊",
-    }
-
     # -------------------------------------------------
     # STEP 5 — ratio distribution
     # -------------------------------------------------
-    base_ratios = {
-        "luxury":{"food":0.35,"transport":0.10,"accommodation":0.45},
-        "high":{"food":0.32,"transport":0.10,"accommodation":0.40},
-        "mid":{"food":0.36,"transport":0.14,"accommodation":0.35},
-        "low":{"food":0.42,"transport":0.20,"accommodation":0.25},
-        "extreme_low":{"food":0.70,"transport":0.30,"accommodation":0},
-    }
+    ratios = profiles.base_ratios[level].copy()
 
-    ratios = base_ratios[level].copy()
-
-    ratios["attractions"] = {
-        "luxury":0.20,"high":0.15,"mid":0.10,"low":0.05,"extreme_low":0,
-    }[level]
+    ratios["attractions"] = profiles.attraction_ratios[level]
 
     used = sum(ratios.values())
     ratios["others"] = max(0, 1 - used)
@@ -175,12 +410,8 @@ def calculate_budget(
     # -------------------------------------------------
     allocation = {k: daily_budget * v for k, v in ratios.items()}
 
-    transport_factor = {
-        "japan":1.3,"korea":1.2,"south korea":1.2,"singapore":1.1,
-        "thailand":0.9,"vietnam":0.7
-    }
     if level != "extreme_low":
-        tf = transport_factor.get(c, 1.0)
+        tf = profiles.transport_factor.get(c, 1.0)
         if tf > 1:
             warnings.append(f"當地交通成本較高，已自動套用 transport ×{tf}。")
         allocation["transport"] *= tf
@@ -188,24 +419,22 @@ def calculate_budget(
     # -------------------------------------------------
     # STEP 7 — floor + cap
     # -------------------------------------------------
-    min_attraction = {"luxury":500,"high":250,"mid":120,"low":0,"extreme_low":0}
     use_hard = (level == "extreme_low")
 
     floor_table = {
         "food": m["food_hard"] if use_hard else m["food_soft"],
         "transport": m["transport_min"],
         "accommodation": (m["accom_hard"] if use_hard else m["accom_soft"]) if level!="extreme_low" else 0,
-        "attractions": min_attraction[level],
+        "attractions": profiles.min_attraction[level],
         "others": 0,
     }
 
-    cap_scale = 2.7
     cap_table = {
-        "food": m["food_soft"] * cap_scale,
-        "transport": m["transport_min"] * cap_scale,
-        "accommodation": m["accom_soft"] * cap_scale,
-        "attractions": 4000,
-        "others": 3000,
+        "food": m["food_soft"] * profiles.cap_scale,
+        "transport": m["transport_min"] * profiles.cap_scale,
+        "accommodation": m["accom_soft"] * profiles.cap_scale,
+        "attractions": profiles.cap_attractions,
+        "others": profiles.cap_others,
     }
 
     for k in cap_table:
@@ -276,121 +505,237 @@ def calculate_budget(
             for k in ["attractions", "others"]:
                 allocation[k] = min(allocation[k], cap_table[k])
 
-    # -------------------------------------------------
-    # STEP 10 — suggestions
-    # -------------------------------------------------
-    if level == "extreme_low":
-        suggestion = (
-            "你的預算屬於地獄級，相當緊縮：\n"
-            "• 吃：以溫飽為目標，口味期待請降低\n"
-            "• 住：須考慮非常基本或共用空間\n"
-            "• 行：以步行＋大眾交通為主\n"
-            "• 景點：以免費景點為核心\n"
-            "建議：務必保留安全預備金，行程請務實規劃。"
-        )
-    elif level == "low":
-        suggestion = (
-            "此預算較拮据但可維持基本品質：\n"
-            "• 吃：一般餐點為主，偶爾可小升級\n"
-            "• 住：經濟型旅宿或青年旅館\n"
-            "• 行：以大眾運輸搭配步行\n"
-            "• 景點：免費＋低價景點優先\n"
-            "建議：彈性安排、避免不必要的額外支出。"
-        )
-    elif level == "mid":
-        suggestion = (
-            "你的預算屬於正常旅遊等級：\n"
-            "• 吃：多數餐廳皆能負擔\n"
-            "• 住：舒適乾淨的住宿品質\n"
-            "• 行：大眾運輸搭配偶爾計程車\n"
-            "• 景點：可安排付費景點\n"
-            "整體：能獲得穩定且愉快的旅遊體驗。"
-        )
-    elif level == "high":
-        suggestion = (
-            "你的預算偏向舒適旅行：\n"
-            "• 吃：可享受較高品質餐點\n"
-            "• 住：舒適便利的飯店選擇\n"
-            "• 行：交通以節省時間為主\n"
-            "• 景點：多種類型體驗皆可納入\n"
-            "整體：能享受到完整且自在的旅程。"
-        )
-    else:
-        suggestion = (
-            "你的預算屬於豪華等級：\n"
-            "• 吃：高級料理、特色餐廳皆可嘗試\n"
-            "• 住：高星級或精品住宿\n"
-            "• 行：包車或專車接送\n"
-            "• 景點：私人導覽、高端體驗皆可安排\n"
-            "整體：建議好好規劃，享受高品質旅程。"
+    return daily_budget, level, price, allocation, flags, warnings
+
+
+@tool
+@budget_executor.offload
+def calculate_budgets(
+    scenarios: list[dict] | None = None,
+    total_budgets: list[float] | None = None,
+    days: list[int] | None = None,
+    countries: list[str] | None = None,
+    num_people: list[int] | None = None,
+    detail: bool = False,
+) -> dict:
+    """
+    批次版預算計算：一次評估多組情境（NumPy 向量化），結果與 calculate_budget 逐筆一致。
+
+    兩種輸入方式可併用：
+    - scenarios：[{"total_budget", "days", "country", "num_people"}, ...]
+    - 網格：total_budgets × days × countries × num_people 的所有組合
+      （num_people 未提供時為 [1]）
+
+    detail=False 只回傳數值摘要；detail=True 則每筆回傳與 calculate_budget 完全相同的 dict。
+    """
+    error = _batch_input_error(scenarios, total_budgets, days, countries, num_people)
+    if error is not None:
+        return {"status": "error", "error_message": error}
+
+    rows: list[tuple] = []
+    for s in scenarios or []:
+        rows.append((s["total_budget"], s["days"], s["country"], s.get("num_people", 1)))
+    if total_budgets and days and countries:
+        for c, b, d, p in product(countries, total_budgets, days, num_people or [1]):
+            rows.append((b, d, c, p))
+
+    results = budget_rows(rows)
+    if not detail:
+        results = [_summary(row, r) for row, r in zip(rows, results)]
+    return {"count": len(results), "results": results}
+
+
+SCENARIO_KEYS = ("total_budget", "days", "country")
+
+
+def _batch_input_error(scenarios, total_budgets, days, countries, num_people) -> str | None:
+    """calculate_budgets 的輸入檢查；有問題時回傳錯誤訊息。"""
+    for i, s in enumerate(scenarios or []):
+        if not isinstance(s, dict):
+            return f"scenarios[{i}] 必須是物件（含 {'、'.join(SCENARIO_KEYS)}）。"
+        missing = [k for k in SCENARIO_KEYS if k not in s]
+        if missing:
+            return f"scenarios[{i}] 缺少 {'、'.join(missing)}。"
+    axes = {"total_budgets": total_budgets, "days": days, "countries": countries}
+    if any(v is not None for v in (*axes.values(), num_people)):
+        missing = [name for name, v in axes.items() if not v]
+        if missing:
+            return f"網格輸入需同時提供 total_budgets、days、countries，缺少：{'、'.join(missing)}。"
+    elif not scenarios:
+        return "請提供 scenarios，或 total_budgets、days、countries 網格。"
+    return None
+
+
+def budget_rows(rows: list[tuple]) -> list[dict]:
+    """
+    Python API：rows 為 (total_budget, days, country, num_people) 的序列，
+    回傳與逐筆呼叫 calculate_budget 相同的結果 list。
+    """
+    results: list[dict | None] = [None] * len(rows)
+    valid: list[int] = []
+    for i, (_, d, _, p) in enumerate(rows):
+        if d > 0 and p > 0:
+            valid.append(i)
+        else:
+            results[i] = _invalid_result()
+    if not valid:
+        return results
+
+    profiles = price_registry.current()
+    countries = [rows[i][2] for i in valid]
+    price_idx, tf = budget_batch.resolve_countries(profiles, countries)
+    out = budget_batch.evaluate(
+        profiles,
+        [rows[i][0] for i in valid],
+        [rows[i][1] for i in valid],
+        [rows[i][3] for i in valid],
+        price_idx,
+        tf,
+    )
+
+    for j, i in enumerate(valid):
+        total_budget, d, country, p = rows[i]
+        warnings: list[str] = []
+        if out["positive_budget"][j]:
+            daily_budget = float(out["daily_budget"][j])
+        else:
+            warnings.append("預算為零或負數，系統將以『極低』方式處理。")
+            daily_budget = 0
+        if 0 < daily_budget <= 200:
+            warnings.append("每日預算極低，可能難以應付基本生活需求。")
+        if out["tf_warning"][j]:
+            warnings.append(f"當地交通成本較高，已自動套用 transport ×{float(out['tf'][j])}。")
+        if out["used_rescue"][j]:
+            warnings.append("住宿費偏低，已從其他項目挪動預算補強。")
+
+        flags = {
+            "used_floor": bool(out["used_floor"][j]),
+            "used_rescue": bool(out["used_rescue"][j]),
+            "used_normalize_down": bool(out["used_normalize_down"][j]),
+            "used_normalize_up": bool(out["used_normalize_up"][j]),
+        }
+        results[i] = _render_result(
+            profiles, country, total_budget, d, p, daily_budget,
+            BUDGET_LEVELS[out["level"][j]],
+            PRICE_LEVELS[out["price_idx"][j]],
+            budget_batch.allocation_dict(out["allocation"][j]),
+            flags,
+            warnings,
         )
+    return results
 
-    # -------------------------------------------------
-    # STEP 11 — format output
-    # -------------------------------------------------
-    formatted_allocation = {k: round(float(v), 2) for k, v in allocation.items()}
 
-    level_label = level_label_map[level]
-    price_label = price_label_map[price]
+def _summary(row: tuple, result: dict) -> dict:
+    total_budget, d, country, p = row
+    return {
+        "country": country,
+        "total_budget": total_budget,
+        "days": d,
+        "num_people": p,
+        "daily_budget": round(result["daily_budget"], 2),
+        "budget_level": result["budget_level"],
+        "price_level": result["price_level"],
+        "allocation": result["allocation"],
+        "flags": result["flags"],
+    }
 
-    disclaimer = "※ 本工具為預算建議模型，提供參考分配，不代表實際物價與必需支出。請依個人習慣、目的、節奏調整。"
 
-    formatted = [
-        f"目的地：{country}",
-        f"總預算：{total_budget} 元 / {days} 天 / {num_people} 人",
-        f"每人每日預算：{round(daily_budget,2)} 元",
-        f"預算等級：{level}（{level_label}）",
-        f"物價等級：{price}（{price_label}）",
-        "",
-        f"⚙ 生存需求：約 {survival_need} 元／日（最低）",
-        f"⚙ 舒適需求：約 {basic_need} 元／日",
-        "",
-        "【每日預算分配】",
-        f"- 餐飲：{formatted_allocation['food']} 元",
-        f"- 交通：{formatted_allocation['transport']} 元",
-        f"- 住宿：{formatted_allocation['accommodation']} 元",
-        f"- 景點：{formatted_allocation['attractions']} 元",
-        f"- 其他：{formatted_allocation['others']} 元",
-    ]
 
-    if warnings:
-        formatted.append("")
-        formatted.append("【提醒】")
-        for w in warnings:
-            formatted.append(f"- {w}")
+@tool
+@budget_executor.offload
+def required_budget(
+    country: str,
+    days: int,
+    num_people: int = 1,
+    target_level: str = "mid",
+) -> dict:
+    """
+    反向計算：要達到指定預算等級（extreme_low / low / mid / high / luxury），
+    總預算（整數台幣）最少需要多少。
 
-    formatted.append("")
-    formatted.append("【整體建議】")
-    formatted.append(suggestion)
-    formatted.append("")
-    formatted.append(disclaimer)
+    同時回傳：
+    - thresholds：每個等級的每人每日門檻與對應總預算
+    - rescue_free_total_budget：從這個總預算起不再需要挪預算補住宿
+    - breakpoints：總預算區段 → 等級與 rescue / normalize 行為
+    """
+    if days <= 0 or num_people <= 0:
+        return {"status": "error", "error_message": "請至少提供 1 天、1 人。"}
+    if target_level not in BUDGET_LEVELS:
+        return {
+            "status": "error",
+            "error_message": f"target_level 必須是 {', '.join(BUDGET_LEVELS)} 其中之一。",
+        }
+    profiles = price_registry.current()
+    return {
+        "status": "success",
+        **budget_solver.solve(profiles, country, days, num_people, target_level),
+    }
 
-    formatted_text = "\n".join(formatted)
+@tool
+@budget_executor.offload
+def plan_itinerary(
+    total_budget: float,
+    num_people: int,
+    destinations: list[str],
+    total_days: int,
+    objective: str = "max_min_level",
+    budget_split: str = "by_days",
+    min_days: int = 1,
+    top: int = 3,
+) -> dict:
+    """
+    多國行程規劃：把總天數（與總預算）分給多個目的地，回傳最佳的幾種切法。
 
-    # -------------------------------------------------
-    # STEP 12 — return
-    # -------------------------------------------------
+    - objective："max_min_level" 讓最差的一站等級最高；"max_avg_level" 讓依天數加權的平均等級最高
+    - budget_split："by_days" 預算依天數比例分；"optimize" 連預算一起最佳化
+    - min_days：每個目的地至少待幾天
+    - top：回傳前幾名
+    """
+    error = budget_planner.invalid_input(total_budget, num_people, total_days)
+    if error is not None:
+        return {"status": "error", "error_message": error}
+    if not destinations:
+        return {"status": "error", "error_message": "請至少提供 1 人與 1 個目的地。"}
+    if total_days < len(destinations) * max(1, min_days):
+        return {"status": "error", "error_message": "總天數不足以讓每個目的地都待到 min_days 天。"}
+    if objective not in budget_planner.OBJECTIVES:
+        return {"status": "error", "error_message": f"objective 必須是 {', '.join(budget_planner.OBJECTIVES)} 其中之一。"}
+    if budget_split not in budget_planner.BUDGET_SPLITS:
+        return {"status": "error", "error_message": f"budget_split 必須是 {', '.join(budget_planner.BUDGET_SPLITS)} 其中之一。"}
+    if budget_planner.count_splits(total_days, len(destinations), max(1, min_days)) > budget_planner.MAX_CANDIDATES:
+        return {"status": "error", "error_message": "組合數過多，請減少目的地、縮短天數或提高 min_days。"}
+
+    profiles = price_registry.current()
     return {
-        "daily_budget": daily_budget,
-        "budget_level": level,
-        "budget_level_label": level_label,
-        "price_level": price,
-        "price_level_label": price_label,
-        "needs": {"survival_per_day": survival_need, "basic_per_day": basic_need},
-        "minimum_need": {
-            "food_soft": m["food_soft"],
-            "food_hard": m["food_hard"],
-            "transport_min": m["transport_min"],
-            "accommodation_soft": m["accom_soft"],
-            "accommodation_hard": m["accom_hard"],
-        },
-        "allocation": formatted_allocation,
-        "flags": flags,
-        "warnings": warnings,
-        "suggestion": suggestion,
-        "formatted_result": formatted_text,
+        "status": "success",
+        **budget_planner.plan(
+            profiles, total_budget, num_people, destinations, total_days,
+            objective=objective, budget_split=budget_split, min_days=max(1, min_days), top=max(1, top),
+        ),
     }
 
+@tool
+def budget_cache_stats() -> dict:
+    """
+    回傳 calculate_budget 快取的命中率與淘汰統計，以及工具執行池的狀態。
+    （process 模式下每個 worker 各有一份快取，這裡只看得到主行程的）
+    """
+    return {**_budget_cache.stats(), "executor": budget_executor.stats()}
+
+@tool
+def get_tool_metrics() -> dict:
+    """
+    回傳每個工具的呼叫次數、執行中數量、錯誤類別、延遲（ms）與 payload 大小。
+    （SSE 模式也可直接抓 /metrics 的 Prometheus 格式）
+    """
+    return tool_metrics.snapshot()
 
 if __name__ == "__main__":
-    mcp.run(transport="sse", port=5002)
\ No newline at end of file
+    budget_executor.prestart()
+    # 預設 SSE :5002；MCP_TRANSPORT=stdio 可改用 stdio，MCP_HOST / MCP_PORT 可改位址
+    transport = os.getenv("MCP_TRANSPORT", "sse")
+    mcp = build_server()
+    if transport == "stdio":
+        mcp.run(transport="stdio")
+    else:
+        mcp.run(transport=transport, host=os.getenv("MCP_HOST", "127.0.0.1"), port=int(os.getenv("MCP_PORT", "5002")))
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""
+calculate_budget 各回傳模式的序列化 benchmark：JSON 大小（bytes / 字元）與每次呼叫時間。
+
+    python bench_response_modes.py [--repeat 2000]
+
+時間包含「計算（走快取）+ 組回傳 + json.dumps」，也就是 MCP 每次回傳給 LLM 前的成本。
+"""
+import argparse
+import json
+import time
+
+import app
+
+# 涵蓋各預算等級、有 / 無提醒的情境：(total_budget, days, country, num_people)
+SCENARIOS = [
+    (3000, 5, "japan", 1),
+    (20000, 5, "tokyo", 2),
+    (60000, 7, "paris", 2),
+    (150000, 10, "london", 2),
+    (400000, 7, "switzerland", 2),
+    (8000, 5, "india", 1),
+    (30000, 6, "bangkok", 2),
+    (90000, 4, "korea", 3),
+]
+
+
+def measure(mode: str, include_suggestion: bool, repeat: int) -> tuple[float, float, float]:
+    payloads = [
+        json.dumps(app.calculate_budget(b, d, c, p, mode=mode, include_suggestion=include_suggestion),
+                   ensure_ascii=False)
+        for b, d, c, p in SCENARIOS
+    ]
+    avg_bytes = sum(len(s.encode("utf-8")) for s in payloads) / len(payloads)
+    avg_chars = sum(len(s) for s in payloads) / len(payloads)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for b, d, c, p in SCENARIOS:
+            json.dumps(app.calculate_budget(b, d, c, p, mode=mode, include_suggestion=include_suggestion),
+                       ensure_ascii=False)
+    us = (time.perf_counter() - start) / (repeat * len(SCENARIOS)) * 1e6
+    return avg_bytes, avg_chars, us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    rows = [
+        ("full", False),
+        ("compact", True),
+        ("compact", False),
+        ("numbers-only", False),
+    ]
+    full_bytes = None
+    print(f"{'mode':28}{'bytes':>8}{'chars':>8}{'µs/call':>10}{'vs full':>10}")
+    for mode, suggestion in rows:
+        avg_bytes, avg_chars, us = measure(mode, suggestion, args.repeat)
+        full_bytes = full_bytes or avg_bytes
+        label = mode + (" + suggestion" if suggestion else "")
+        print(f"{label:28}{avg_bytes:>8.0f}{avg_chars:>8.0f}{us:>10.2f}{avg_bytes / full_bytes:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import numpy as np
+
+from price_registry import ALLOCATION_KEYS, BUDGET_LEVELS, PRICE_LEVELS, PriceProfiles
+
+# -------------------------------------------------
+# 批次版預算模型（NumPy 向量化）
+# 每一步都與 app.calculate_budget 的單筆流程一一對應，
+# 運算順序刻意保持相同，浮點數結果才會逐位元一致。
+# -------------------------------------------------
+
+FOOD, TRANSPORT, ACCOM, ATTRACTIONS, OTHERS = range(5)
+
+EXTREME_LOW, LOW, MID, HIGH, LUXURY = range(5)
+
+
+class _Tables:
+    """把 PriceProfiles 轉成以等級 index 查詢的 NumPy 陣列。"""
+
+    def __init__(self, profiles: PriceProfiles):
+        self.profiles = profiles
+        # 物價等級 index → [food_soft, food_hard, transport_min, accom_soft, accom_hard]
+        self.minimum = np.array(
+            [
+                [profiles.minimum[p]["food_soft"], profiles.minimum[p]["food_hard"],
+                 profiles.minimum[p]["transport_min"], profiles.minimum[p]["accom_soft"],
+                 profiles.minimum[p]["accom_hard"]]
+                for p in PRICE_LEVELS
+            ],
+            dtype=np.float64,
+        )
+        self.difficulty = np.array([profiles.difficulty[p] for p in PRICE_LEVELS], dtype=np.float64)
+        # 預算等級 index → 比例 / 景點下限
+        self.base_ratios = np.array(
+            [
+                [profiles.base_ratios[lv]["food"], profiles.base_ratios[lv]["transport"],
+                 profiles.base_ratios[lv]["accommodation"]]
+                for lv in BUDGET_LEVELS
+            ],
+            dtype=np.float64,
+        )
+        self.attraction_ratios = np.array(
+            [profiles.attraction_ratios[lv] for lv in BUDGET_LEVELS], dtype=np.float64
+        )
+        self.min_attraction = np.array(
+            [profiles.min_attraction[lv] for lv in BUDGET_LEVELS], dtype=np.float64
+        )
+
+
+_tables: _Tables | None = None
+
+
+def _tables_for(profiles: PriceProfiles) -> _Tables:
+    # 設定檔熱重載後 profiles 物件會換新，此時才重建陣列
+    global _tables
+    if _tables is None or _tables.profiles is not profiles:
+        _tables = _Tables(profiles)
+    return _tables
+
+
+def resolve_countries(profiles: PriceProfiles, countries: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """國家字串 → (物價等級 index, 交通係數)；相同字串只解析一次。"""
+    lookup: dict[str, tuple[int, float]] = {}
+    price_idx = np.empty(len(countries), dtype=np.int64)
+    tf = np.empty(len(countries), dtype=np.float64)
+    for i, country in enumerate(countries):
+        hit = lookup.get(country)
+        if hit is None:
+            c = profiles.resolve_country(country)
+            hit = (PRICE_LEVELS.index(profiles.price_level_of(c)), profiles.transport_factor.get(c, 1.0))
+            lookup[country] = hit
+        price_idx[i], tf[i] = hit
+    return price_idx, tf
+
+
+def evaluate(
+    profiles: PriceProfiles,
+    total_budget: np.ndarray,
+    days: np.ndarray,
+    num_people: np.ndarray,
+    price_idx: np.ndarray,
+    tf: np.ndarray,
+) -> dict:
+    """
+    對整批情境一次跑完 level → 分配 → floor/cap → rescue → normalize。
+    呼叫端需先排除天數或人數 <= 0 的情境。
+
+    回傳 dict：daily_budget / level / allocation (n×5) / 各項 flags。
+    """
+    total_budget = np.asarray(total_budget, dtype=np.float64)
+    days = np.asarray(days, dtype=np.int64)
+    num_people = np.asarray(num_people, dtype=np.int64)
+    n = total_budget.shape[0]
+    t = _tables_for(profiles)
+
+    # STEP 0 — daily budget
+    positive = total_budget > 0
+    daily = np.where(positive, total_budget / days / num_people, 0.0)
+    has_budget = daily > 0
+
+    # STEP 3 — minimum needs
+    m = t.minimum[price_idx]
+    food_soft, food_hard, transport_min, accom_soft, accom_hard = m.T
+    survival_need = food_hard + transport_min
+    basic_need = food_soft + transport_min + accom_soft
+
+    # STEP 4 — budget level
+    D = t.difficulty[price_idx]
+    level = np.select(
+        [
+            ~has_budget,
+            daily < survival_need * D,
+            daily < basic_need * D,
+            daily < basic_need * 1.3 * D,
+            daily < basic_need * 2.0 * D,
+        ],
+        [EXTREME_LOW, EXTREME_LOW, LOW, MID, HIGH],
+        default=LUXURY,
+    )
+    extreme = level == EXTREME_LOW
+
+    # STEP 5 — ratio distribution
+    ratios = np.empty((n, 5), dtype=np.float64)
+    ratios[:, :3] = t.base_ratios[level]
+    ratios[:, ATTRACTIONS] = t.attraction_ratios[level]
+    used = ratios[:, FOOD] + ratios[:, TRANSPORT] + ratios[:, ACCOM] + ratios[:, ATTRACTIONS]
+    ratios[:, OTHERS] = np.maximum(0, 1 - used)
+    ratios[:, ACCOM] *= (1.05 - np.minimum(days * 0.02, 0.15))
+
+    # STEP 6 — initial allocation
+    alloc = daily[:, None] * ratios
+    applied_tf = np.where(extreme, 1.0, tf)
+    alloc[:, TRANSPORT] *= applied_tf
+    tf_warning = ~extreme & (tf > 1)
+
+    # STEP 7 — floor + cap
+    floor = np.empty((n, 5), dtype=np.float64)
+    floor[:, FOOD] = np.where(extreme, food_hard, food_soft)
+    floor[:, TRANSPORT] = transport_min
+    floor[:, ACCOM] = np.where(extreme, 0.0, accom_soft)
+    floor[:, ATTRACTIONS] = t.min_attraction[level]
+    floor[:, OTHERS] = 0.0
+
+    cap = np.empty((n, 5), dtype=np.float64)
+    cap[:, FOOD] = food_soft * profiles.cap_scale
+    cap[:, TRANSPORT] = transport_min * profiles.cap_scale
+    cap[:, ACCOM] = accom_soft * profiles.cap_scale
+    cap[:, ATTRACTIONS] = profiles.cap_attractions
+    cap[:, OTHERS] = profiles.cap_others
+    cap = np.where(has_budget[:, None], np.minimum(cap, (daily * 0.95)[:, None]), cap)
+
+    used_floor = ((alloc < floor) | (alloc > cap)).any(axis=1)
+    alloc = np.minimum(np.maximum(alloc, floor), cap)
+
+    # STEP 8 — accommodation rescue
+    used_rescue = ~extreme & (alloc[:, ACCOM] < accom_hard)
+    diff = np.where(used_rescue, accom_hard - alloc[:, ACCOM], 0.0)
+    adj_ratio = np.minimum(0.5, np.maximum(0.1, np.where(has_budget, daily / 20000, 0.1)))
+    for k in (OTHERS, ATTRACTIONS, TRANSPORT, FOOD):
+        room = np.maximum(0, alloc[:, k] - floor[:, k])
+        active = used_rescue & (diff > 0) & (room > 0)
+        take = np.where(active, np.minimum(diff, room * adj_ratio), 0.0)
+        alloc[:, k] = np.where(active, alloc[:, k] - take, alloc[:, k])
+        alloc[:, ACCOM] = np.where(active, alloc[:, ACCOM] + take, alloc[:, ACCOM])
+        diff = np.where(active, diff - take, diff)
+
+    # STEP 9 — normalize
+    total_now = _row_sum(alloc)
+    needs_fix = has_budget & (np.abs(total_now - daily) > 1)
+    down = needs_fix & (total_now > daily)
+    up = needs_fix & ~(total_now > daily)
+
+    # normalize down：先從景點／其他／交通等比例扣，仍超過就整體縮放
+    reducible = (ATTRACTIONS, OTHERS, TRANSPORT)
+    rooms = {k: np.maximum(0, alloc[:, k] - floor[:, k]) for k in reducible}
+    max_reducible = rooms[ATTRACTIONS] + rooms[OTHERS] + rooms[TRANSPORT]
+    can_reduce = down & (max_reducible > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = np.minimum(1, (total_now - daily) / max_reducible)
+    for k in reducible:
+        alloc[:, k] = np.where(can_reduce, alloc[:, k] - rooms[k] * rate, alloc[:, k])
+
+    total_after = _row_sum(alloc)
+    rescale = down & (total_after > daily)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factor = daily / total_after
+    alloc = np.where(rescale[:, None], alloc * factor[:, None], alloc)
+
+    # normalize up：剩餘預算分給景點／其他，再套上限
+    remaining = daily - total_now
+    spread = up & (remaining > 0)
+    generous = spread & ((level == LUXURY) | (level == HIGH))
+    plain = spread & ~generous
+    alloc[:, ATTRACTIONS] = np.where(generous, alloc[:, ATTRACTIONS] + remaining * 0.6, alloc[:, ATTRACTIONS])
+    alloc[:, OTHERS] = np.where(generous, alloc[:, OTHERS] + remaining * 0.4, alloc[:, OTHERS])
+    alloc[:, OTHERS] = np.where(plain, alloc[:, OTHERS] + remaining, alloc[:, OTHERS])
+    for k in (ATTRACTIONS, OTHERS):
+        alloc[:, k] = np.where(up, np.minimum(alloc[:, k], cap[:, k]), alloc[:, k])
+
+    return {
+        "daily_budget": daily,
+        "positive_budget": positive,
+        "level": level,
+        "price_idx": price_idx,
+        "tf": tf,
+        "tf_warning": tf_warning,
+        "allocation": alloc,
+        "used_floor": used_floor,
+        "used_rescue": used_rescue,
+        "used_normalize_down": down,
+        "used_normalize_up": up,
+    }
+
+
+def _row_sum(alloc: np.ndarray) -> np.ndarray:
+    # 依 food → others 的順序逐欄相加，與 Python sum(dict.values()) 完全相同
+    return alloc[:, FOOD] + alloc[:, TRANSPORT] + alloc[:, ACCOM] + alloc[:, ATTRACTIONS] + alloc[:, OTHERS]
+
+
+def allocation_dict(row: np.ndarray) -> dict:
+    return {k: float(row[i]) for i, k in enumerate(ALLOCATION_KEYS)}
@@ -0,0 +1,70 @@
+import threading
+import time
+from collections import OrderedDict
+
+# -------------------------------------------------
+# calculate_budget 結果快取
+# - 容量上限 + LRU 淘汰
+# - 可選 TTL（秒）；0 或 None 代表永不過期
+# - 統計 hit / miss / eviction / expiration
+# -------------------------------------------------
+
+MISS = object()
+
+
+class ResultCache:
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None):
+        if maxsize <= 0:
+            raise ValueError("maxsize 必須大於 0")
+        self.maxsize = maxsize
+        self.ttl = ttl or None
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """命中回傳快取值，否則回傳 MISS。"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISS
+            value, expires_at = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return MISS
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,150 @@
+import asyncio
+import functools
+import importlib
+import multiprocessing
+import os
+import sys
+import threading
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+# -------------------------------------------------
+# 工具本體的執行方式（BUDGET_EXECUTOR）
+# - inline ：直接交給 FastMCP（預設，行為與以前相同）
+# - thread ：固定大小的 ThreadPoolExecutor（NumPy 批次運算會釋放 GIL）
+# - process：固定大小的 ProcessPoolExecutor，CPU-bound 的單筆計算也能平行
+#
+# back-pressure：同時排隊 + 執行中的呼叫最多 BUDGET_MAX_PENDING 個，
+# 超過就等待空位；等超過 BUDGET_QUEUE_TIMEOUT 秒仍沒有空位則直接回傳忙碌錯誤，
+# 不讓請求在伺服器裡無限堆積。
+# -------------------------------------------------
+
+EXECUTOR_MODES = ("inline", "thread", "process")
+
+MODE = os.getenv("BUDGET_EXECUTOR", "inline")
+WORKERS = int(os.getenv("BUDGET_WORKERS", str(os.cpu_count() or 2)))
+MAX_PENDING = int(os.getenv("BUDGET_MAX_PENDING", str(WORKERS * 4)))
+QUEUE_TIMEOUT = float(os.getenv("BUDGET_QUEUE_TIMEOUT", "5"))
+
+if MODE not in EXECUTOR_MODES:
+    raise ValueError(f"BUDGET_EXECUTOR 必須是 {', '.join(EXECUTOR_MODES)} 其中之一，收到 {MODE!r}")
+
+# 工具名稱 → 原始（同步）函式；子行程也靠它找到要執行的函式
+_functions: dict[str, Callable] = {}
+# 工具名稱 → 所在模組（子行程依此 import）
+_modules: dict[str, str] = {}
+
+_executor: Executor | None = None
+_executor_lock = threading.Lock()
+_slots: asyncio.Semaphore | None = None
+_stats = {"in_flight": 0, "completed": 0, "failed": 0, "rejected": 0}
+
+
+def offload(fn):
+    """
+    把同步工具包成 async：在 thread / process pool 中執行，並受 MAX_PENDING 限流。
+    inline 模式下原樣回傳 fn。
+    """
+    _functions[fn.__name__] = fn
+    if MODE == "inline":
+        return fn
+
+    module = _modules[fn.__name__] = _module_name(fn)
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await submit(module, fn.__name__, args, kwargs)
+
+    return wrapper
+
+
+async def submit(module: str, name: str, args: tuple, kwargs: dict):
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(MAX_PENDING)
+    try:
+        await asyncio.wait_for(_slots.acquire(), QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        _stats["rejected"] += 1
+        return {
+            "status": "error",
+            "error_message": f"伺服器忙碌中（{MAX_PENDING} 個請求處理中），請稍後再試。",
+        }
+
+    _stats["in_flight"] += 1
+    try:
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            _get_executor(), functools.partial(_invoke, module, name, args, kwargs)
+        )
+        _stats["completed"] += 1
+        return result
+    except Exception:
+        _stats["failed"] += 1
+        raise
+    finally:
+        _stats["in_flight"] -= 1
+        _slots.release()
+
+
+def stats() -> dict:
+    return {
+        "mode": MODE,
+        "workers": WORKERS if MODE != "inline" else None,
+        "max_pending": MAX_PENDING if MODE != "inline" else None,
+        **_stats,
+    }
+
+
+def prestart() -> None:
+    """預先啟動所有 worker 並 import 工具模組（process 模式下子行程要載入 numpy，約需數百毫秒）。"""
+    if MODE == "inline":
+        return
+    executor = _get_executor()
+    modules = sorted(set(_modules.values()))
+    for f in [executor.submit(_import_all, modules) for _ in range(WORKERS)]:
+        f.result()
+
+
+def shutdown() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _get_executor() -> Executor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            if MODE == "process":
+                # spawn：不把父行程的 event loop / 執行緒狀態 fork 進子行程
+                _executor = ProcessPoolExecutor(
+                    max_workers=WORKERS, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                _executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="budget")
+        return _executor
+
+
+def _invoke(module: str, name: str, args: tuple, kwargs: dict):
+    # 子行程第一次執行時 import 工具所在模組，讓 @offload 把原始函式登記進 _functions
+    if name not in _functions:
+        importlib.import_module(module)
+    return _functions[name](*args, **kwargs)
+
+
+def _import_all(modules: list[str]) -> int:
+    for module in modules:
+        importlib.import_module(module)
+    return os.getpid()
+
+
+def _module_name(fn) -> str:
+    # 以 `python app.py` 啟動時模組名是 __main__，子行程改用檔名 import
+    if fn.__module__ in ("__main__", "__mp_main__"):
+        main_file = getattr(sys.modules[fn.__module__], "__file__", None)
+        if main_file:
+            return os.path.splitext(os.path.basename(main_file))[0]
+    return fn.__module__
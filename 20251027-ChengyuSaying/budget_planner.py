@@ -0,0 +1,303 @@
+from itertools import combinations, product
+from math import comb
+
+import numpy as np
+
+import budget_batch
+import budget_solver
+from price_registry import BUDGET_LEVELS, PRICE_LEVELS, PriceProfiles
+
+# -------------------------------------------------
+# 多國行程規劃：一筆總預算、總天數，分給多個目的地
+# - 天數切法：把 total_days 切成每段至少 min_days 的所有組合（一次產生成矩陣）
+# - 預算切法：
+#     by_days  → 依天數比例分配
+#     optimize → 依各等級門檻（budget_solver）挑出最佳等級組合，剩餘預算再依天數分配
+# - 所有候選一次丟進 budget_batch.evaluate 向量化評估，不逐筆呼叫 calculate_budget
+# -------------------------------------------------
+
+OBJECTIVES = ("max_min_level", "max_avg_level")
+BUDGET_SPLITS = ("by_days", "optimize")
+
+# 候選天數切法上限（約 6 國 × 30 天）
+MAX_CANDIDATES = 200_000
+# optimize 模式每批精確求解的「切法 × 等級組合」格數，控制記憶體用量
+OPTIMIZE_CHUNK_CELLS = 1_000_000
+# 上界與目前第 top 名同分時，最多再多看幾種切法（用來比 rescue / 購買力等次要條件）
+TIE_EXPLORE = 2048
+
+
+def day_splits(total_days: int, k: int, min_days: int = 1) -> np.ndarray:
+    """所有把 total_days 切成 k 段、每段 >= min_days 的組合，shape = (n, k)。"""
+    free = total_days - k * min_days
+    if free < 0:
+        return np.empty((0, k), dtype=np.int64)
+    if k == 1:
+        return np.array([[total_days]], dtype=np.int64)
+    # stars and bars：在 free + k - 1 個位置中選 k - 1 個隔板
+    cuts = np.array(list(combinations(range(free + k - 1), k - 1)), dtype=np.int64)
+    edges = np.hstack([
+        np.full((len(cuts), 1), -1, dtype=np.int64),
+        cuts,
+        np.full((len(cuts), 1), free + k - 1, dtype=np.int64),
+    ])
+    return np.diff(edges, axis=1) - 1 + min_days
+
+
+def count_splits(total_days: int, k: int, min_days: int = 1) -> int:
+    free = total_days - k * min_days
+    return comb(free + k - 1, k - 1) if free >= 0 else 0
+
+
+def split_by_days(total_budget: int | np.ndarray, days: np.ndarray) -> np.ndarray:
+    """
+    依天數比例切預算（整數），零頭補給天數最多的目的地，每列總和恰為 total_budget。
+    total_budget 可以是單一數字，或每種切法各自一個數字。
+    """
+    total_budget = np.broadcast_to(np.asarray(total_budget, dtype=np.int64), (len(days),))
+    total_days = days.sum(axis=1, keepdims=True)
+    budgets = total_budget[:, None] * days // total_days
+    rest = total_budget - budgets.sum(axis=1)
+    budgets[np.arange(len(days)), days.argmax(axis=1)] += rest
+    return budgets
+
+
+def level_costs(
+    profiles: PriceProfiles,
+    destinations: list[str],
+    max_days: int,
+    num_people: int,
+) -> np.ndarray:
+    """cost[i, d, lv] = 目的地 i 待 d 天要達到等級 lv 的最小整數總預算。"""
+    cost = np.zeros((len(destinations), max_days + 1, len(BUDGET_LEVELS)), dtype=np.int64)
+    for i, country in enumerate(destinations):
+        price = profiles.price_level_of(profiles.resolve_country(country))
+        thresholds = budget_solver.level_thresholds(profiles, price)
+        for d in range(1, max_days + 1):
+            for lv, name in enumerate(BUDGET_LEVELS):
+                cost[i, d, lv] = budget_solver.min_total_for_daily(thresholds[name], d, num_people)
+    return cost
+
+
+def _combo_key(combos: np.ndarray, days: np.ndarray, objective: str) -> np.ndarray:
+    # 等級組合的目標值（越大越好），shape = (n_splits, n_combos)
+    min_level = combos.min(axis=1)
+    weighted = days @ combos.T  # 依天數加權的等級總和
+    return _key(min_level[None, :], weighted, days.sum(axis=1, keepdims=True), objective)
+
+
+def _key(min_level, weighted, total_days, objective: str):
+    if objective == "max_min_level":
+        return min_level * (total_days * (len(BUDGET_LEVELS) - 1) + 1) + weighted
+    return weighted * len(BUDGET_LEVELS) + min_level
+
+
+def _upper_bounds(
+    total_budget: int,
+    days: np.ndarray,
+    cost: np.ndarray,
+    base_level: np.ndarray,
+    objective: str,
+) -> np.ndarray:
+    """
+    每種天數切法目標值的上界（LP 鬆弛）：
+    所有目的地先站上 base_level，剩餘預算依「每升一級每天多花多少」由便宜到貴
+    連續地買升級（用上凸包，可以買到小數）。實際的整數解不可能比它好。
+    """
+    n, k = days.shape
+    bound = np.empty(n, dtype=np.float64)
+    for lb in np.unique(base_level):
+        sel = base_level == lb
+        d = days[sel]
+        # 多給一點預算吸收門檻取整數造成的誤差，上界只會更寬鬆
+        surplus = total_budget - sum(cost[i, d[:, i], lb] for i in range(k)) + k * len(BUDGET_LEVELS)
+        # 升級步驟：(目的地, 每天成本差, 升幾級)；門檻成本與天數成正比，取最長天數換算成每天
+        steps = []
+        max_days = cost.shape[1] - 1
+        for i in range(k):
+            per_day = cost[i, max_days, :] / max_days
+            level, hull = int(lb), []
+            while level < len(BUDGET_LEVELS) - 1:
+                # 上凸包：從目前等級往上，挑每級成本最低的下一個點
+                nxt = min(range(level + 1, len(BUDGET_LEVELS)),
+                          key=lambda j: (per_day[j] - per_day[level]) / (j - level))
+                hull.append((i, per_day[nxt] - per_day[level], nxt - level))
+                level = nxt
+            steps.extend(hull)
+        steps.sort(key=lambda st: st[1] / st[2])
+
+        weighted = lb * d.sum(axis=1).astype(np.float64)
+        left = surplus.astype(np.float64)
+        for i, dcost, dlevel in steps:
+            step_cost = d[:, i] * dcost
+            frac = np.clip(np.divide(left, step_cost, out=np.ones_like(left), where=step_cost > 0), 0, 1)
+            weighted += frac * d[:, i] * dlevel
+            left -= frac * step_cost
+        min_ub = np.full(len(d), lb) if objective == "max_min_level" else len(BUDGET_LEVELS) - 1
+        bound[sel] = _key(min_ub, np.floor(weighted + 1e-9), d.sum(axis=1), objective)
+    return bound
+
+
+def _solve_exact(total_budget: int, days: np.ndarray, cost: np.ndarray, base_level: np.ndarray, objective: str):
+    """逐一列舉等級組合，回傳 (最佳目標值, 各目的地的門檻預算)。"""
+    n, k = days.shape
+    combos = np.array(list(product(range(len(BUDGET_LEVELS)), repeat=k)), dtype=np.int64)
+    combos = combos[combos.min(axis=1) >= base_level.min()]
+    # 這批切法裡連最少天數都買不起的等級組合直接剪掉
+    cheapest = sum(cost[i, days[:, i].min(), combos[:, i]] for i in range(k))
+    combos = combos[cheapest <= total_budget]
+
+    need = np.zeros((n, len(combos)), dtype=np.int64)
+    for i in range(k):
+        need += cost[i][:, combos[:, i]][days[:, i]]
+    ok = (need <= total_budget) & (combos.min(axis=1)[None, :] >= base_level[:, None])
+    key = np.where(ok, _combo_key(combos, days, objective), -1)
+    best = key.argmax(axis=1)
+    rows = np.arange(n)
+    base = np.stack([cost[i][days[:, i], combos[best, i]] for i in range(k)], axis=1)
+    return key[rows, best], base
+
+
+def optimize_budgets(
+    total_budget: int,
+    days: np.ndarray,
+    cost: np.ndarray,
+    objective: str,
+    top: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    連預算一起最佳化：每種天數切法在「各目的地門檻總和 <= 總預算」下挑最佳等級組合，
+    門檻以外的剩餘預算再依天數比例分配。
+
+    branch and bound：先用 _upper_bounds 算每種切法的上界並由高到低排序，
+    一批一批精確求解，直到剩下的上界都不可能擠進前 top 名為止。
+    回傳 (精確求解過的切法 index, 對應的各目的地預算)。
+    """
+    n, k = days.shape
+    # 全體至少能站上的等級（max_min_level 的主目標，可直接精確算出）
+    need_by_level = sum(cost[i][days[:, i]] for i in range(k))
+    floor_level = (need_by_level <= total_budget).sum(axis=1) - 1
+    base_level = floor_level if objective == "max_min_level" else np.zeros(n, dtype=np.int64)
+
+    bound = _upper_bounds(total_budget, days, cost, base_level, objective)
+    order = np.argsort(-bound, kind="stable")
+    batch = max(1, OPTIMIZE_CHUNK_CELLS // len(BUDGET_LEVELS) ** k)
+
+    solved_idx, solved_key, solved_base = [], [], []
+    kth_best = -np.inf
+    for s in range(0, n, batch):
+        idx = order[s:s + batch]
+        if bound[idx[0]] < kth_best or (bound[idx[0]] == kth_best and s >= TIE_EXPLORE):
+            break
+        key, base = _solve_exact(total_budget, days[idx], cost, base_level[idx], objective)
+        solved_idx.append(idx)
+        solved_key.append(key)
+        solved_base.append(base)
+        keys = np.concatenate(solved_key)
+        if len(keys) >= top:
+            kth_best = np.partition(keys, len(keys) - top)[len(keys) - top]
+
+    idx = np.concatenate(solved_idx)
+    base = np.concatenate(solved_base)
+    return idx, base + split_by_days(total_budget - base.sum(axis=1), days[idx])
+
+
+def invalid_input(total_budget: float, num_people: int, total_days: int) -> str | None:
+    """輸入不合法時回傳錯誤訊息（與 calculate_budget 相同的檢查），否則 None。"""
+    if not total_budget > 0:
+        return "總預算必須大於 0。"
+    if total_days < 1 or num_people < 1:
+        return "請至少提供 1 天、1 人。"
+    return None
+
+
+def plan(
+    profiles: PriceProfiles,
+    total_budget: float,
+    num_people: int,
+    destinations: list[str],
+    total_days: int,
+    objective: str = "max_min_level",
+    budget_split: str = "by_days",
+    min_days: int = 1,
+    top: int = 3,
+) -> dict:
+    error = invalid_input(total_budget, num_people, total_days)
+    if error is not None:
+        return {"status": "error", "error_message": error}
+    k = len(destinations)
+    total_budget = int(round(total_budget))
+    days = day_splits(total_days, k, min_days)
+    n = len(days)
+
+    if budget_split == "optimize":
+        cost = level_costs(profiles, destinations, total_days, num_people)
+        solved, budgets = optimize_budgets(total_budget, days, cost, objective, top)
+        days = days[solved]
+    else:
+        budgets = split_by_days(total_budget, days)
+    n_total, n = n, len(days)
+
+    # 所有 (切法, 目的地) 攤平成 n × k 筆，一次向量化評估
+    price_idx, tf = budget_batch.resolve_countries(profiles, destinations)
+    out = budget_batch.evaluate(
+        profiles,
+        budgets.ravel(),
+        days.ravel(),
+        np.full(n * k, num_people),
+        np.tile(price_idx, n),
+        np.tile(tf, n),
+    )
+    levels = out["level"].reshape(n, k)
+    price_idx_nk = out["price_idx"].reshape(n, k)
+    rescue = out["used_rescue"].reshape(n, k)
+    # 以物價難度換算的每人每日購買力，用來在等級相同時分高下
+    difficulty = np.array([profiles.difficulty[PRICE_LEVELS[p]] for p in price_idx])
+    power = out["daily_budget"].reshape(n, k) / difficulty
+
+    min_level = levels.min(axis=1)
+    avg_level = (levels * days).sum(axis=1) / total_days
+    primary, secondary = (min_level, avg_level) if objective == "max_min_level" else (avg_level, min_level)
+    # lexsort：最後一個 key 最優先
+    order = np.lexsort((-power.min(axis=1), rescue.sum(axis=1), -secondary, -primary))[:top]
+
+    # 查不到物價的目的地照樣以預設等級規劃，但要明確回報，不能默默當成中等物價
+    unresolved = [d for d in destinations if not profiles.is_known(profiles.resolve_country(d))]
+    result = {
+        "total_budget": total_budget,
+        "num_people": num_people,
+        "total_days": total_days,
+        "objective": objective,
+        "budget_split": budget_split,
+        "candidates_total": n_total,
+        "candidates_evaluated": n,
+        "unresolved_destinations": unresolved,
+    }
+    if unresolved:
+        result["warning"] = (
+            f"查無物價資料：{'、'.join(unresolved)}，已暫以預設物價（{profiles.default_price}）計算，結果僅供參考。"
+        )
+    return {
+        **result,
+        "plans": [_plan_dict(profiles, destinations, days[j], budgets[j], levels[j], rescue[j],
+                             price_idx_nk[j], num_people) for j in order],
+    }
+
+
+def _plan_dict(profiles, destinations, days, budgets, levels, rescue, price_idx, num_people) -> dict:
+    stops = []
+    for i, country in enumerate(destinations):
+        stops.append({
+            "country": country,
+            "days": int(days[i]),
+            "total_budget": int(budgets[i]),
+            "daily_budget": round(float(budgets[i]) / int(days[i]) / num_people, 2),
+            "budget_level": BUDGET_LEVELS[levels[i]],
+            "price_level": PRICE_LEVELS[price_idx[i]],
+            "used_rescue": bool(rescue[i]),
+        })
+    return {
+        "min_level": BUDGET_LEVELS[levels.min()],
+        "avg_level": round(float((levels * days).sum() / days.sum()), 2),
+        "stops": stops,
+    }
@@ -0,0 +1,160 @@
+import math
+
+import numpy as np
+
+import budget_batch
+from price_registry import BUDGET_LEVELS, PRICE_LEVELS, PriceProfiles
+
+# -------------------------------------------------
+# 反向求解：要達到某個預算等級，總預算至少要多少？
+# - 等級門檻直接由 survival_need / basic_need × D 算出
+# - rescue / normalize 的行為轉折點，用向量化模型掃描整數總預算找出
+# 總預算一律以「整數台幣」計（與 calculate_budget 的快取 key 一致）
+# -------------------------------------------------
+
+# 粗掃描的點數；轉折點再以向量化二分法精確定位到 1 元
+COARSE_POINTS = 4096
+REFINE_POINTS = 1024
+# 掃描上限 = 豪華門檻 × 此倍數（之後行為不再變化）
+SCAN_FACTOR = 3
+
+
+def level_thresholds(profiles: PriceProfiles, price: str) -> dict[str, float]:
+    """各預算等級的每人每日最低預算（與 calculate_budget STEP 4 同一組算式）。"""
+    m = profiles.minimum[price]
+    D = profiles.difficulty[price]
+    survival_need = m["food_hard"] + m["transport_min"]
+    basic_need = m["food_soft"] + m["transport_min"] + m["accom_soft"]
+    return {
+        "extreme_low": 0.0,
+        "low": survival_need * D,
+        "mid": basic_need * D,
+        "high": basic_need * 1.3 * D,
+        "luxury": basic_need * 2.0 * D,
+    }
+
+
+def min_total_for_daily(threshold: float, days: int, num_people: int) -> int:
+    """最小的整數總預算 T，使 T / days / num_people >= threshold（逐位元同模型的浮點運算）。"""
+    if threshold <= 0:
+        return 0
+    total = max(1, math.ceil(threshold * days * num_people) - 2)
+    while total / days / num_people < threshold:
+        total += 1
+    while total > 1 and (total - 1) / days / num_people >= threshold:
+        total -= 1
+    return total
+
+
+def solve(
+    profiles: PriceProfiles,
+    country: str,
+    days: int,
+    num_people: int,
+    target_level: str,
+) -> dict:
+    """回傳達到 target_level 所需的最小整數總預算，以及各等級門檻與行為轉折點。"""
+    c = profiles.resolve_country(country)
+    price = profiles.price_level_of(c)
+    thresholds = level_thresholds(profiles, price)
+
+    totals = {lv: min_total_for_daily(t, days, num_people) for lv, t in thresholds.items()}
+    rescue_free_daily = profiles.minimum[price]["accom_hard"] / 0.95
+
+    return {
+        "country": country,
+        "price_level": price,
+        "days": days,
+        "num_people": num_people,
+        "target_level": target_level,
+        "required_total_budget": totals[target_level],
+        "required_daily_budget": round(thresholds[target_level], 2),
+        "thresholds": {
+            lv: {"daily_per_person": round(thresholds[lv], 2), "total_budget": totals[lv]}
+            for lv in BUDGET_LEVELS
+        },
+        # 非極低等級下，每人每日預算 × 0.95 低於住宿硬下限就會觸發 rescue
+        "rescue_free_total_budget": min_total_for_daily(rescue_free_daily, days, num_people),
+        "breakpoints": breakpoints(
+            profiles, c, days, num_people,
+            scan_to=totals["luxury"] * SCAN_FACTOR,
+            anchors=list(totals.values()),
+        ),
+    }
+
+
+# -------------------------------------------------
+# 轉折點掃描
+# -------------------------------------------------
+def breakpoints(
+    profiles: PriceProfiles,
+    c: str,
+    days: int,
+    num_people: int,
+    scan_to: int,
+    anchors: list[int] = (),
+) -> list[dict]:
+    """
+    把總預算 1 ~ scan_to 切成「等級與 rescue / normalize 旗標都相同」的區段。
+    最後一段的 total_budget_to 為 None（代表以上皆同）。
+    """
+    price_idx = PRICE_LEVELS.index(profiles.price_level_of(c))
+    tf = profiles.transport_factor.get(c, 1.0)
+
+    def signature(points: np.ndarray) -> np.ndarray:
+        n = len(points)
+        out = budget_batch.evaluate(
+            profiles,
+            points.astype(np.float64),
+            np.full(n, days),
+            np.full(n, num_people),
+            np.full(n, price_idx),
+            np.full(n, tf),
+        )
+        return (
+            out["level"] * 8
+            + out["used_rescue"] * 4
+            + out["used_normalize_down"] * 2
+            + out["used_normalize_up"]
+        )
+
+    def first_change(lo: int, hi: int, sig_lo: int) -> int:
+        # 已知 sig(lo) == sig_lo、sig(hi) != sig_lo，找出 (lo, hi] 中第一個不同的整數
+        while hi - lo > 1:
+            pts = np.unique(np.linspace(lo + 1, hi, min(REFINE_POINTS, hi - lo)).astype(np.int64))
+            sigs = signature(pts)
+            idx = int(np.argmax(sigs != sig_lo))
+            hi = int(pts[idx])
+            if idx > 0:
+                lo = int(pts[idx - 1])
+        return hi
+
+    scan_to = max(2, int(scan_to))
+    grid = np.unique(np.concatenate([
+        np.linspace(1, scan_to, COARSE_POINTS).astype(np.int64),
+        np.array([a for a in anchors if 1 <= a <= scan_to], dtype=np.int64),
+    ]))
+    grid_sigs = signature(grid)
+
+    segments = []
+    start, cur_sig, pos = int(grid[0]), int(grid_sigs[0]), int(grid[0])
+    for point, sig in zip(grid[1:].tolist(), grid_sigs[1:].tolist()):
+        while sig != cur_sig:
+            x = first_change(pos, point, cur_sig)
+            segments.append(_segment(start, x - 1, cur_sig))
+            start, pos = x, x
+            cur_sig = int(signature(np.array([x]))[0])
+        pos = point
+    segments.append(_segment(start, None, cur_sig))
+    return segments
+
+
+def _segment(start: int, end: int | None, sig: int) -> dict:
+    return {
+        "total_budget_from": start,
+        "total_budget_to": end,
+        "budget_level": BUDGET_LEVELS[sig // 8],
+        "used_rescue": bool(sig & 4),
+        "used_normalize_down": bool(sig & 2),
+        "used_normalize_up": bool(sig & 1),
+    }
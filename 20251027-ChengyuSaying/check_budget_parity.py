@@ -0,0 +1,96 @@
+"""
+檢查批次工具與逐筆工具的結果一致：calculate_budgets / budget_rows 的每一筆都要與 calculate_budget 完全相同。
+
+    python check_budget_parity.py               # 預設 5000 組隨機情境
+    python check_budget_parity.py --cases 20000 --seed 7
+
+情境涵蓋各物價等級的國家、城市與別名、未知地名、小數與負數預算、0 天 / 0 人；
+另外確認 calculate_budgets 對缺欄位或不完整網格回傳錯誤而不是例外。
+"""
+import argparse
+import os
+import random
+import sys
+
+# 逐筆工具直接呼叫，不經執行池
+os.environ["BUDGET_EXECUTOR"] = "inline"
+
+import app  # noqa: E402
+import price_registry  # noqa: E402
+
+
+def random_rows(n: int, rng: random.Random) -> list[tuple]:
+    profiles = price_registry.current()
+    places = [*profiles.price_of, *profiles.country_of, "Narnia", "  Tokyo ", "JAPAN"]
+    rows = []
+    for _ in range(n):
+        budget = rng.choice([
+            rng.uniform(-5000, 0),
+            rng.uniform(0, 3000),
+            rng.uniform(3000, 300000),
+            float(rng.randrange(1000, 200000, 500)),
+        ])
+        days = rng.choice([0, *range(1, 15)])
+        people = rng.choice([0, 1, 1, 2, 3, 4])
+        rows.append((budget, days, rng.choice(places), people))
+    return rows
+
+
+def check_parity(rows: list[tuple]) -> list[str]:
+    batch = app.budget_rows(rows)
+    mismatches = []
+    for row, got in zip(rows, batch):
+        total_budget, days, country, people = row
+        want = app.calculate_budget(total_budget, days, country, people)
+        if got != want:
+            mismatches.append(f"{row}: batch {got.get('budget_level')} / single {want.get('budget_level')}")
+    return mismatches
+
+
+def check_tool(rows: list[tuple]) -> list[str]:
+    # 工具本身：scenarios 的摘要要與 budget_rows 對得上
+    scenarios = [{"total_budget": b, "days": d, "country": c, "num_people": p} for b, d, c, p in rows]
+    detailed = app.calculate_budgets(scenarios=scenarios, detail=True)["results"]
+    return [f"{row}: detail=True differs" for row, got, want in zip(rows, detailed, app.budget_rows(rows)) if got != want]
+
+
+def check_errors() -> list[str]:
+    cases = {
+        "缺 country": {"scenarios": [{"total_budget": 1000, "days": 2}]},
+        "網格缺 days": {"total_budgets": [1000], "countries": ["japan"]},
+        "什麼都沒給": {},
+    }
+    failures = []
+    for label, kwargs in cases.items():
+        try:
+            result = app.calculate_budgets(**kwargs)
+        except Exception as e:
+            failures.append(f"{label}: raised {type(e).__name__}: {e}")
+            continue
+        if result.get("status") != "error":
+            failures.append(f"{label}: expected an error, got {result}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cases", type=int, default=5000, help="隨機情境數")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows = random_rows(args.cases, random.Random(args.seed))
+    failed = 0
+    for name, problems in (
+        ("budget_rows == calculate_budget", check_parity(rows)),
+        ("calculate_budgets(detail=True) == budget_rows", check_tool(rows[:500])),
+        ("calculate_budgets input errors", check_errors()),
+    ):
+        failed += bool(problems)
+        print(f"{'FAIL' if problems else 'PASS'}  {name}" + (f"  ({len(problems)} problems)" if problems else ""))
+        for line in problems[:10]:
+            print(f"      {line}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+檢查 price_profiles.json 熱重載：改檔後 RELOAD_CHECK_INTERVAL 內沿用舊設定、之後生效；
+壞掉的設定檔不會取代最後一份正確設定。
+
+    python check_price_reload.py
+
+每個情境都用暫存資料夾裡的設定檔副本建立新的 PriceRegistry（不動到 repo 裡的檔案），
+印出 PASS/FAIL 與耗時。
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 情境之間不必各等一秒
+INTERVAL = 0.2
+
+FOLDER = Path(__file__).resolve().parent
+# 端對端情境讓 app 讀暫存副本；必須在 import app 之前設定
+_APP_PROFILES = Path(tempfile.mkdtemp()) / "price_profiles.json"
+shutil.copy(FOLDER / "price_profiles.json", _APP_PROFILES)
+os.environ["BUDGET_PROFILES_PATH"] = str(_APP_PROFILES)
+os.environ["BUDGET_EXECUTOR"] = "inline"
+
+import price_registry  # noqa: E402
+
+price_registry.RELOAD_CHECK_INTERVAL = INTERVAL
+
+
+def make_registry() -> tuple[price_registry.PriceRegistry, Path]:
+    path = Path(tempfile.mkdtemp()) / "price_profiles.json"
+    shutil.copy(FOLDER / "price_profiles.json", path)
+    return price_registry.PriceRegistry(path), path
+
+
+def write(path: Path, text: str) -> None:
+    # 保證 mtime 一定變（有些檔案系統的時間解析度不夠細）
+    before = path.stat().st_mtime_ns if path.exists() else 0
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(before + 10_000_000, before + 10_000_000))
+
+
+def edit(path: Path, change) -> None:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    change(data)
+    write(path, json.dumps(data, ensure_ascii=False, indent=2))
+
+
+def set_japan(level: str):
+    def change(data):
+        data["countries"]["japan"]["price"] = level
+    return change
+
+
+def edits_apply_after_the_check_interval():
+    registry, path = make_registry()
+    registry.current()
+    edit(path, set_japan("vlow"))
+    before = registry.current().price_level_of("japan")
+    time.sleep(INTERVAL * 1.5)
+    after = registry.current().price_level_of("japan")
+    return (before, after) == ("high", "vlow"), {"before": before, "after": after}
+
+
+def malformed_json_keeps_last_good_profiles():
+    registry, path = make_registry()
+    good = registry.current()
+    write(path, path.read_text(encoding="utf-8")[:200])  # 截斷的 JSON
+    time.sleep(INTERVAL * 1.5)
+    return registry.current() is good and registry.last_error is not None, registry.last_error
+
+
+def invalid_values_keep_last_good_profiles():
+    registry, path = make_registry()
+    good = registry.current()
+    edit(path, set_japan("cheap"))  # 不存在的物價等級
+    time.sleep(INTERVAL * 1.5)
+    return registry.current() is good and registry.last_error is not None, registry.last_error
+
+
+def fixing_the_file_recovers():
+    registry, path = make_registry()
+    text = path.read_text(encoding="utf-8")
+    write(path, "{")
+    time.sleep(INTERVAL * 1.5)
+    registry.current()
+    broken_error = registry.last_error
+    data = json.loads(text)
+    set_japan("mid")(data)
+    write(path, json.dumps(data, ensure_ascii=False, indent=2))
+    time.sleep(INTERVAL * 1.5)
+    level = registry.current().price_level_of("japan")
+    ok = broken_error is not None and registry.last_error is None and level == "mid"
+    return ok, {"error while broken": broken_error, "japan after fix": level}
+
+
+def deleted_file_keeps_last_good_profiles():
+    registry, path = make_registry()
+    good = registry.current()
+    path.unlink()
+    time.sleep(INTERVAL * 1.5)
+    return registry.current() is good and registry.last_error is not None, registry.last_error
+
+
+def calculate_budget_sees_the_new_profiles():
+    # 經過 app：結果快取也要跟著設定檔作廢
+    import app
+
+    first = app.calculate_budget(30000, 3, "japan")["price_level"]
+    edit(_APP_PROFILES, set_japan("vlow"))
+    time.sleep(INTERVAL * 1.5)
+    second = app.calculate_budget(30000, 3, "japan")["price_level"]
+    return (first, second) == ("high", "vlow"), {"before": first, "after": second}
+
+
+SCENARIOS = [
+    edits_apply_after_the_check_interval,
+    malformed_json_keeps_last_good_profiles,
+    invalid_values_keep_last_good_profiles,
+    fixing_the_file_recovers,
+    deleted_file_keeps_last_good_profiles,
+    calculate_budget_sees_the_new_profiles,
+]
+
+
+def main():
+    failed = 0
+    for scenario in SCENARIOS:
+        start = time.monotonic()
+        try:
+            ok, detail = scenario()
+        except Exception as e:
+            ok, detail = False, f"{type(e).__name__}: {e}"
+        failed += not ok
+        elapsed = (time.monotonic() - start) * 1000
+        print(f"{'PASS' if ok else 'FAIL'}  {scenario.__name__:42}{elapsed:>6.0f} ms  {detail}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+budget_server 壓力測試：開 N 個同時連線的 MCP SSE client，回報吞吐量與 p50 / p95 / p99 延遲。
+
+    # 對已經在跑的 server
+    python load_test.py --clients 32 --requests 50
+
+    # 自動用指定的執行模式啟動 server，測完再關掉
+    python load_test.py --spawn process --workers 4 --clients 32 --requests 50
+
+    # 比較多種模式
+    python load_test.py --spawn inline thread process --tool plan_itinerary
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from fastmcp import Client
+
+HERE = Path(__file__).resolve().parent
+
+COUNTRIES = ["japan", "tokyo", "paris", "london", "india", "bangkok", "korea", "switzerland", "vietnam", "usa"]
+
+
+def make_arguments(tool: str, rng: random.Random) -> dict:
+    """每次呼叫隨機產生參數，避免全部打在結果快取上。"""
+    if tool == "calculate_budget":
+        return {
+            "total_budget": rng.randint(3_000, 400_000),
+            "days": rng.randint(1, 21),
+            "country": rng.choice(COUNTRIES),
+            "num_people": rng.randint(1, 4),
+        }
+    if tool == "required_budget":
+        return {
+            "country": rng.choice(COUNTRIES),
+            "days": rng.randint(1, 21),
+            "num_people": rng.randint(1, 4),
+            "target_level": rng.choice(["low", "mid", "high", "luxury"]),
+        }
+    if tool == "plan_itinerary":
+        return {
+            "total_budget": rng.randint(100_000, 600_000),
+            "num_people": rng.randint(1, 3),
+            "destinations": rng.sample(COUNTRIES, 4),
+            "total_days": rng.randint(8, 20),
+            "budget_split": "optimize",
+        }
+    raise SystemExit(f"不支援的工具：{tool}")
+
+
+async def run_client(url: str, tool: str, n_requests: int, seed: int, latencies: list, errors: list):
+    rng = random.Random(seed)
+    async with Client(url, timeout=60) as client:
+        for _ in range(n_requests):
+            start = time.perf_counter()
+            try:
+                result = await client.call_tool(tool, make_arguments(tool, rng), raise_on_error=False)
+                data = result.structured_content or {}
+                if result.is_error or data.get("status") == "error":
+                    errors.append(data.get("error_message", "tool error"))
+                    continue
+            except Exception as e:
+                errors.append(type(e).__name__)
+                continue
+            latencies.append(time.perf_counter() - start)
+
+
+async def load(url: str, tool: str, clients: int, n_requests: int, seed: int) -> dict:
+    latencies: list[float] = []
+    errors: list[str] = []
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        run_client(url, tool, n_requests, seed + i, latencies, errors) for i in range(clients)
+    ])
+    elapsed = time.perf_counter() - start
+    return summarize(latencies, errors, elapsed)
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    idx = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[idx]
+
+
+def summarize(latencies: list[float], errors: list[str], elapsed: float) -> dict:
+    lat = sorted(latencies)
+    return {
+        "ok": len(lat),
+        "errors": len(errors),
+        "seconds": elapsed,
+        "throughput": len(lat) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(lat, 50) * 1000,
+        "p95_ms": percentile(lat, 95) * 1000,
+        "p99_ms": percentile(lat, 99) * 1000,
+        "mean_ms": statistics.fmean(lat) * 1000 if lat else float("nan"),
+    }
+
+
+# -------------------------------------------------
+# 自動啟動 server（--spawn）
+# -------------------------------------------------
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def spawn_server(mode: str, workers: int | None, port: int) -> subprocess.Popen:
+    env = dict(os.environ, BUDGET_EXECUTOR=mode)
+    if workers:
+        env["BUDGET_WORKERS"] = str(workers)
+    # app.py 固定用 5002；這裡改用隨機 port 啟動同一個 mcp 物件
+    code = f"import app; app.budget_executor.prestart(); app.mcp.run(transport='sse', port={port}, show_banner=False)"
+    proc = subprocess.Popen(
+        [sys.executable, "-c", code], cwd=HERE, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"server 啟動失敗（mode={mode}）")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise SystemExit("server 啟動逾時")
+
+
+def print_row(label: str, r: dict) -> None:
+    print(
+        f"{label:10}{r['ok']:>7}{r['errors']:>7}{r['throughput']:>10.1f}"
+        f"{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:5002/sse")
+    parser.add_argument("--tool", default="calculate_budget",
+                        choices=["calculate_budget", "required_budget", "plan_itinerary"])
+    parser.add_argument("--clients", type=int, default=16, help="同時連線的 client 數")
+    parser.add_argument("--requests", type=int, default=50, help="每個 client 的呼叫次數")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--spawn", nargs="+", choices=["inline", "thread", "process"],
+                        help="自動用這些執行模式啟動 server 並逐一測試")
+    parser.add_argument("--workers", type=int, help="--spawn 時的 BUDGET_WORKERS")
+    args = parser.parse_args()
+
+    print(f"tool={args.tool} clients={args.clients} requests/client={args.requests}")
+    print(f"{'mode':10}{'ok':>7}{'errors':>7}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    if not args.spawn:
+        print_row("server", asyncio.run(load(args.url, args.tool, args.clients, args.requests, args.seed)))
+        return
+
+    for mode in args.spawn:
+        port = free_port()
+        proc = spawn_server(mode, args.workers, port)
+        try:
+            url = f"http://127.0.0.1:{port}/sse"
+            print_row(mode, asyncio.run(load(url, args.tool, args.clients, args.requests, args.seed)))
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+# -------------------------------------------------
+# 國家物價設定檔 registry
+# - 資料來源：price_profiles.json（可用 BUDGET_PROFILES_PATH 覆寫）
+# - 啟動時編譯成扁平查表，查詢皆為 O(1) dict lookup
+# - 設定檔變更時自動重新載入，不需重啟 SSE server
+# -------------------------------------------------
+
+PRICE_LEVELS = ["vhigh", "high", "mid", "low", "vlow"]
+BUDGET_LEVELS = ["extreme_low", "low", "mid", "high", "luxury"]
+ALLOCATION_KEYS = ["food", "transport", "accommodation", "attractions", "others"]
+
+DEFAULT_PATH = Path(__file__).with_name("price_profiles.json")
+
+# 檢查檔案 mtime 的最短間隔（秒），避免每次呼叫都 stat
+RELOAD_CHECK_INTERVAL = 1.0
+
+
+class PriceProfiles:
+    """一份已編譯的物價設定檔（唯讀；重新載入時整份替換）。"""
+
+    def __init__(self, data: dict):
+        self.version = data["version"]
+
+        price_levels = data["price_levels"]
+        budget_levels = data["budget_levels"]
+        missing = [p for p in PRICE_LEVELS if p not in price_levels]
+        missing += [lv for lv in BUDGET_LEVELS if lv not in budget_levels]
+        if missing:
+            raise ValueError(f"price profile 缺少等級設定：{missing}")
+
+        # 物價等級 → 參數
+        self.price_labels = {p: price_levels[p]["label"] for p in PRICE_LEVELS}
+        self.difficulty = {p: price_levels[p]["difficulty"] for p in PRICE_LEVELS}
+        self.minimum = {p: dict(price_levels[p]["minimum"]) for p in PRICE_LEVELS}
+
+        # 預算等級 → 參數
+        self.level_labels = {lv: budget_levels[lv]["label"] for lv in BUDGET_LEVELS}
+        self.base_ratios = {
+            lv: {k: budget_levels[lv]["ratios"][k] for k in ("food", "transport", "accommodation")}
+            for lv in BUDGET_LEVELS
+        }
+        self.attraction_ratios = {lv: budget_levels[lv]["ratios"]["attractions"] for lv in BUDGET_LEVELS}
+        self.min_attraction = {lv: budget_levels[lv]["min_attraction"] for lv in BUDGET_LEVELS}
+
+        caps = data["caps"]
+        self.cap_scale = caps["scale"]
+        self.cap_attractions = caps["attractions"]
+        self.cap_others = caps["others"]
+
+        self.default_price = data.get("default_price_level", "mid")
+
+        # 國家 / 別名 / 城市 → 國家 key，全部攤平成一張表
+        self.country_of: dict[str, str] = {}
+        self.price_of: dict[str, str] = {}
+        self.transport_factor: dict[str, float] = {}
+        for key, profile in data["countries"].items():
+            key = key.strip().lower()
+            price = profile["price"]
+            if price not in self.price_labels:
+                raise ValueError(f"{key} 的物價等級 {price!r} 不存在")
+            self.price_of[key] = price
+            if "transport_factor" in profile:
+                self.transport_factor[key] = profile["transport_factor"]
+            self.country_of[key] = key
+            for alias in profile.get("aliases", []):
+                self.country_of[alias.strip().lower()] = key
+        for city, country in data.get("cities", {}).items():
+            self.country_of[city.strip().lower()] = country.strip().lower()
+
+    def resolve_country(self, country: str) -> str:
+        """城市 / 國家 / 別名 → 國家 key；查不到則回傳小寫原字串。"""
+        c_raw = country.strip().lower()
+        return self.country_of.get(c_raw, c_raw)
+
+    def price_level_of(self, c: str) -> str:
+        return self.price_of.get(c, self.default_price)
+
+    def is_known(self, c: str) -> bool:
+        """國家 key 是否有物價設定（沒有的話 price_level_of 會回預設等級）。"""
+        return c in self.price_of
+
+
+class PriceRegistry:
+    """持有目前生效的 PriceProfiles，並在設定檔變更時熱重載。"""
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._mtime = self.path.stat().st_mtime_ns
+        self._profiles = load_profiles(self.path)
+        self._next_check = time.monotonic() + RELOAD_CHECK_INTERVAL
+        self.last_error: str | None = None
+
+    def current(self) -> PriceProfiles:
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + RELOAD_CHECK_INTERVAL
+            self.reload_if_changed()
+        return self._profiles
+
+    def reload_if_changed(self) -> bool:
+        """檔案 mtime 改變時重新載入；格式錯誤則保留舊設定並記錄錯誤。"""
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except OSError as e:
+            self.last_error = str(e)
+            return False
+        if mtime == self._mtime:
+            return False
+        with self._lock:
+            if mtime == self._mtime:
+                return False
+            try:
+                profiles = load_profiles(self.path)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                self.last_error = f"載入 {self.path.name} 失敗：{e}"
+                self._mtime = mtime
+                return False
+            self._profiles = profiles
+            self._mtime = mtime
+            self.last_error = None
+            return True
+
+
+def load_profiles(path: str | os.PathLike) -> PriceProfiles:
+    with open(path, encoding="utf-8") as f:
+        return PriceProfiles(json.load(f))
+
+
+# server 啟動時載入一次
+registry = PriceRegistry(os.getenv("BUDGET_PROFILES_PATH", DEFAULT_PATH))
+
+
+def current() -> PriceProfiles:
+    return registry.current()
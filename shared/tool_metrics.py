@@ -0,0 +1,357 @@
+"""
+Per-tool call metrics shared by the agent's local tools and the MCP servers.
+
+    @tool_metrics.instrument
+    def get_weather(city: str) -> dict: ...
+
+records, per tool: calls, calls in flight, errors by class (the exception
+type, or "error_result" for a returned {"status": "error"}), a latency
+histogram and request / response payload sizes (JSON bytes). Sizing means
+serializing the arguments and the result, which costs more than most of
+these tools do, so sizes are taken from every TOOL_METRICS_SIZE_EVERY-th
+call only. render() gives the Prometheus text format (served at /metrics),
+snapshot() a dict.
+
+Off by default: a few microseconds per call is a large share of tools that
+take five, so instrument() only wraps when TOOL_METRICS=1.
+
+Standard library only; the servers add this folder to sys.path, the agent
+loads it through local_tools, so in one process they share one registry.
+
+Environment:
+    TOOL_METRICS=1          record metrics (otherwise instrument() returns the function unchanged)
+    TOOL_METRICS_SIZE_EVERY payload sizes from one call in N per tool (default 16)
+    TOOL_METRICS_PORT       agent process: serve /metrics on this port
+    TOOL_PROFILE_RATE       fraction of calls run under the profiler (default 0)
+    TOOL_PROFILE_TOOLS      comma-separated tools to profile (default: all)
+    TOOL_PROFILE_DIR        where the default cProfile hook writes .prof files
+"""
+import bisect
+import cProfile
+import functools
+import inspect
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+                   2.5, 5.0, 10.0, float("inf"))
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, float("inf"))
+
+ERROR_RESULT = "error_result"
+
+
+def _on(value: str | None) -> bool:
+    return (value or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def payload_bytes(value) -> int:
+    """Size of value as the JSON an MCP client would receive."""
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+class Histogram:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-quantile (None when empty or in +Inf)."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return None if bound == float("inf") else bound
+        return None
+
+
+def _mean(h: Histogram, scale: float = 1.0, digits: int = 1) -> float | None:
+    return round(h.sum / h.count * scale, digits) if h.count else None
+
+
+class ToolStats:
+    def __init__(self):
+        # per tool, so concurrent calls to different tools do not contend
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.started = 0
+        self.in_flight = 0
+        self.errors: dict[str, int] = {}
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.request_bytes = Histogram(SIZE_BUCKETS)
+        self.response_bytes = Histogram(SIZE_BUCKETS)
+
+
+class Registry:
+    def __init__(
+        self, enabled: bool = True, size_every: int = 16, profile_rate: float = 0.0, profile_tools=None,
+        profiler=None,
+    ):
+        """
+        Args:
+            enabled: When False, instrument() returns functions unchanged.
+            size_every: Record payload sizes for one call in this many, per tool.
+            profile_rate: Fraction of calls (0-1) run inside profiler(tool_name).
+            profile_tools: Tool names eligible for profiling; None means all.
+            profiler: Callable taking the tool name and returning a context manager
+                wrapped around the call, e.g. a sampling profiler's session.
+                Defaults to cprofile_hook().
+        """
+        if size_every < 1:
+            raise ValueError("size_every must be at least 1")
+        self.enabled = enabled
+        self.size_every = size_every
+        self.profile_rate = profile_rate
+        self.profile_tools = set(profile_tools) if profile_tools else None
+        self.profiler = profiler or cprofile_hook()
+        self.profiled = 0
+        self._lock = threading.Lock()
+        self._tools: dict[str, ToolStats] = {}
+
+    # ---- 📈 Recording ----
+    def _stats(self, name: str) -> ToolStats:
+        stats = self._tools.get(name)
+        if stats is None:
+            stats = self._tools.setdefault(name, ToolStats())
+        return stats
+
+    def _start(self, name: str, args: tuple, kwargs: dict) -> tuple[ToolStats, float, int | None]:
+        """(stats, start time, request size or None when this call is not sized)."""
+        stats = self._stats(name)
+        with stats.lock:
+            stats.in_flight += 1
+            stats.started += 1
+            sized = stats.started % self.size_every == 0
+        return stats, time.perf_counter(), payload_bytes([list(args), kwargs]) if sized else None
+
+    def _finish(self, stats: ToolStats, start: float, request_size: int | None, result=None, error=None):
+        elapsed = time.perf_counter() - start
+        if error is None and isinstance(result, dict) and result.get("status") == "error":
+            error = ERROR_RESULT
+        response_size = None
+        if request_size is not None:
+            # a raised exception has no payload
+            response_size = 0 if error not in (None, ERROR_RESULT) else payload_bytes(result)
+        with stats.lock:
+            stats.in_flight -= 1
+            stats.calls += 1
+            stats.latency.observe(elapsed)
+            if request_size is not None:
+                stats.request_bytes.observe(request_size)
+                stats.response_bytes.observe(response_size)
+            if error is not None:
+                stats.errors[error] = stats.errors.get(error, 0) + 1
+
+    def _profiling(self, name: str):
+        if self.profile_rate <= 0 or self.profile_tools is not None and name not in self.profile_tools:
+            return None
+        if random.random() >= self.profile_rate:
+            return None
+        with self._lock:
+            self.profiled += 1
+        return self.profiler(name)
+
+    def instrument(self, fn=None, *, name: str | None = None):
+        """Decorator for sync or async tools; the signature and docstring are kept for schema generation."""
+        if fn is None:
+            return functools.partial(self.instrument, name=name)
+        if not self.enabled:
+            return fn
+        tool = name or fn.__name__
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                stats, start, size = self._start(tool, args, kwargs)
+                profile = self._profiling(tool)
+                try:
+                    if profile is None:
+                        result = await fn(*args, **kwargs)
+                    else:
+                        # a sync profiler around an await also sees other tasks on the loop
+                        with profile:
+                            result = await fn(*args, **kwargs)
+                except BaseException as e:
+                    self._finish(stats, start, size, error=type(e).__name__)
+                    raise
+                self._finish(stats, start, size, result)
+                return result
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            stats, start, size = self._start(tool, args, kwargs)
+            profile = self._profiling(tool)
+            try:
+                if profile is None:
+                    result = fn(*args, **kwargs)
+                else:
+                    with profile:
+                        result = fn(*args, **kwargs)
+            except BaseException as e:
+                self._finish(stats, start, size, error=type(e).__name__)
+                raise
+            self._finish(stats, start, size, result)
+            return result
+
+        return wrapper
+
+    # ---- 📤 Export ----
+    def snapshot(self) -> dict:
+        """Per-tool summary: counts, error classes, latency (ms) and payload sizes (bytes)."""
+        with self._lock:
+            tools = {}
+            for name, s in sorted(self._tools.items()):
+                errors = sum(s.errors.values())
+                quantile_ms = {
+                    f"p{int(q * 100)}": None if (v := s.latency.quantile(q)) is None else v * 1000
+                    for q in (0.5, 0.95, 0.99)
+                }
+                tools[name] = {
+                    "calls": s.calls,
+                    "in_flight": s.in_flight,
+                    "errors": dict(s.errors),
+                    "error_rate": round(errors / s.calls, 4) if s.calls else 0.0,
+                    "latency_ms": {
+                        "mean": _mean(s.latency, 1000, 3),
+                        **{k + "_le": v for k, v in quantile_ms.items()},
+                    },
+                    "request_bytes_mean": _mean(s.request_bytes),
+                    "response_bytes_mean": _mean(s.response_bytes),
+                }
+            return {"enabled": self.enabled, "profiled_calls": self.profiled, "tools": tools}
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        lines = []
+
+        def family(metric: str, kind: str, help_text: str):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+
+        def histogram(metric: str, tool: str, h: Histogram):
+            cumulative = 0
+            for bound, n in zip(h.buckets, h.counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(f'{metric}_bucket{{tool="{tool}",le="{le}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{tool="{tool}"}} {h.sum}')
+            lines.append(f'{metric}_count{{tool="{tool}"}} {h.count}')
+
+        with self._lock:
+            tools = sorted(self._tools.items())
+            family("tool_calls_total", "counter", "Completed tool calls.")
+            lines += [f'tool_calls_total{{tool="{t}"}} {s.calls}' for t, s in tools]
+            family("tool_errors_total", "counter", "Failed tool calls by error class.")
+            lines += [
+                f'tool_errors_total{{tool="{t}",error="{e}"}} {n}' for t, s in tools for e, n in sorted(s.errors.items())
+            ]
+            family("tool_in_flight", "gauge", "Tool calls currently running.")
+            lines += [f'tool_in_flight{{tool="{t}"}} {s.in_flight}' for t, s in tools]
+            for metric, attr, help_text in (
+                ("tool_latency_seconds", "latency", "Tool call latency."),
+                ("tool_request_bytes", "request_bytes", "JSON size of tool arguments."),
+                ("tool_response_bytes", "response_bytes", "JSON size of tool results."),
+            ):
+                family(metric, "histogram", help_text)
+                for t, s in tools:
+                    histogram(metric, t, getattr(s, attr))
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tools.clear()
+            self.profiled = 0
+
+
+# ---- 🔬 Profiler hooks ----
+def cprofile_hook(directory: str | os.PathLike | None = None):
+    """Profiler factory that cProfiles one call and writes <tool>-<ns>.prof into directory."""
+
+    @contextmanager
+    def profile(tool: str):
+        folder = Path(directory or os.getenv("TOOL_PROFILE_DIR", "profiles"))
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            folder.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(folder / f"{tool}-{time.time_ns()}.prof")
+
+    return profile
+
+
+# ---- 🌐 /metrics for processes without a web server of their own ----
+def serve(port: int, host: str = "127.0.0.1", registry: "Registry | None" = None) -> ThreadingHTTPServer:
+    """Serves GET /metrics (Prometheus text) and /metrics.json (snapshot) from a daemon thread."""
+    registry = registry or REGISTRY
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            if path == "/metrics":
+                body, content_type = registry.render().encode("utf-8"), CONTENT_TYPE
+            elif path == "/metrics.json":
+                body = json.dumps(registry.snapshot(), ensure_ascii=False).encode("utf-8")
+                content_type = "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    httpd = ThreadingHTTPServer((host, port), Handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, name="tool-metrics", daemon=True).start()
+    return httpd
+
+
+_server: ThreadingHTTPServer | None = None
+
+
+def serve_from_env() -> ThreadingHTTPServer | None:
+    """Starts serve() once when TOOL_METRICS_PORT is set."""
+    global _server
+    port = os.getenv("TOOL_METRICS_PORT")
+    if port and _server is None and REGISTRY.enabled:
+        _server = serve(int(port), os.getenv("TOOL_METRICS_HOST", "127.0.0.1"))
+    return _server
+
+
+REGISTRY = Registry(
+    enabled=_on(os.getenv("TOOL_METRICS")),
+    size_every=int(os.getenv("TOOL_METRICS_SIZE_EVERY", "16")),
+    profile_rate=float(os.getenv("TOOL_PROFILE_RATE", "0")),
+    profile_tools=[t.strip() for t in os.getenv("TOOL_PROFILE_TOOLS", "").split(",") if t.strip()] or None,
+)
+
+instrument = REGISTRY.instrument
+snapshot = REGISTRY.snapshot
+render = REGISTRY.render